@@ -0,0 +1,287 @@
+"""压力测试用的本地假服务：RSS源、Discord REST API、MyMemory翻译API和WebSub hub，全部在一个aiohttp应用中"""
+import asyncio
+import hashlib
+import hmac
+import random
+import secrets
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Dict, List, Tuple
+from xml.sax.saxutils import escape
+
+import aiohttp
+from aiohttp import web
+
+LOREM = ('Researchers released a new open model with improved reasoning and lower inference cost, '
+         'and shared benchmark results, training details and a technical report for developers. ')
+
+@dataclass
+class FeedOptions:
+    """假RSS源的行为"""
+    items: int = 10              # 每个RSS中的文章数
+    item_size: int = 600         # 每篇文章摘要的字节数
+    update_rate: float = 0.05    # 每次请求时RSS出现新文章的概率
+    latency: float = 0.05        # 响应延迟（秒）
+    jitter: float = 0.5          # 延迟的随机浮动比例
+    error_rate: float = 0.0      # 返回500的概率
+    hub: bool = False            # RSS中声明本地的WebSub hub
+
+@dataclass
+class DiscordOptions:
+    """假Discord的限流规则，与Discord的默认限制相近"""
+    channel_limit: int = 5       # 每个频道每个窗口的消息数
+    channel_window: float = 5.0
+    global_limit: int = 50       # 每秒全局请求数
+    latency: float = 0.03
+
+@dataclass
+class TranslateOptions:
+    latency: float = 0.05
+    error_rate: float = 0.0
+
+def feed_item(feed: int, generation: int) -> Tuple[str, str]:
+    """第feed个RSS的第generation篇文章的 (标题, 链接)，压测进程用它预先生成历史记录"""
+    return f"Feed {feed} article {generation}", f"http://loadtest.local/feed/{feed}/article/{generation}"
+
+def initial_items(feed: int, options: FeedOptions) -> List[Tuple[str, str]]:
+    """RSS第一次被请求时包含的文章"""
+    return [feed_item(feed, g) for g in range(options.items)]
+
+@dataclass
+class FeedState:
+    generation: int = 0          # 最新文章的序号
+    rng: random.Random = None
+    body: bytes = b''
+    etag: str = ''
+
+@dataclass
+class Stats:
+    feed_requests: int = 0
+    feed_not_modified: int = 0
+    feed_errors: int = 0
+    messages: int = 0
+    rate_limited: int = 0
+    too_long: int = 0
+    hub_verified: int = 0
+    hub_pushes: int = 0
+    translations: int = 0
+    message_channels: Dict[str, int] = field(default_factory=dict)
+
+class FakeServices:
+    def __init__(self, feed_options: FeedOptions, discord_options: DiscordOptions,
+                 translate_options: TranslateOptions):
+        self.feed_options = feed_options
+        self.discord_options = discord_options
+        self.translate_options = translate_options
+        self.feeds: Dict[int, FeedState] = {}
+        self.stats = Stats()
+        self._channel_sent: Dict[str, deque] = {}
+        self._global_sent: deque = deque()
+        # 由start()设置，RSS中的hub和self链接使用
+        self.base_url = ''
+        # hub的订阅：主题 -> {回调地址: secret}
+        self.hub_subscriptions: Dict[str, Dict[str, str]] = {}
+        self._hub_tasks: set = set()
+
+    def build_app(self) -> web.Application:
+        app = web.Application(client_max_size=1024 ** 2)
+        app.router.add_get('/feed/{feed}.xml', self.handle_feed)
+        app.router.add_post('/feed/{feed}/publish', self.handle_publish)
+        app.router.add_post('/hub', self.handle_hub)
+        app.router.add_post('/api/v10/channels/{channel}/messages', self.handle_message)
+        # webhook与REST API共用限流和统计，路径中的id当作频道
+        app.router.add_post('/api/webhooks/{channel}/{token}', self.handle_message)
+        app.router.add_get('/translate/get', self.handle_translate)
+        app.router.add_get('/stats', self.handle_stats)
+        app.router.add_post('/reset', self.handle_reset)
+        return app
+
+    async def _delay(self, latency: float, jitter: float = 0.5):
+        if latency > 0:
+            await asyncio.sleep(latency * (1 + random.uniform(-jitter, jitter)))
+
+    def _render(self, feed: int, state: FeedState) -> bytes:
+        options = self.feed_options
+        now = datetime.now(timezone.utc)
+        summary = escape((LOREM * (options.item_size // len(LOREM) + 1))[:options.item_size])
+        items = []
+        for generation in range(state.generation, -1, -1):
+            if len(items) >= options.items:
+                break
+            title, link = feed_item(feed, generation)
+            published = format_datetime(now - timedelta(minutes=state.generation - generation))
+            items.append(f"<item><title>{escape(title)}</title><link>{link}</link>"
+                         f"<pubDate>{published}</pubDate><description>{summary}</description></item>")
+        hub = ''
+        if options.hub:
+            hub = (f'<atom:link rel="hub" href="{self.base_url}/hub"/>'
+                   f'<atom:link rel="self" href="{self.base_url}/feed/{feed}.xml"/>')
+        # 第一次请求时文章序号为 0..items-1
+        return (f'<?xml version="1.0" encoding="UTF-8"?>'
+                f'<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom"><channel>'
+                f'<title>Feed {feed}</title><link>http://loadtest.local/feed/{feed}</link>{hub}'
+                f'{"".join(items)}</channel></rss>').encode()
+
+    async def handle_feed(self, request: web.Request) -> web.Response:
+        feed = int(request.match_info['feed'])
+        options = self.feed_options
+        self.stats.feed_requests += 1
+        await self._delay(options.latency, options.jitter)
+        state = self.feeds.get(feed)
+        if state is None:
+            state = self.feeds[feed] = FeedState(generation=options.items - 1, rng=random.Random(feed))
+        elif state.rng.random() < options.update_rate:
+            state.generation += 1
+            state.body = b''
+        if state.rng.random() < options.error_rate:
+            self.stats.feed_errors += 1
+            return web.Response(status=500, text='internal error')
+        if not state.body:
+            state.body = self._render(feed, state)
+            state.etag = f'"{hashlib.md5(state.body).hexdigest()}"'
+        if request.headers.get('If-None-Match') == state.etag:
+            self.stats.feed_not_modified += 1
+            return web.Response(status=304, headers={'ETag': state.etag})
+        return web.Response(body=state.body, content_type='application/rss+xml',
+                            headers={'ETag': state.etag})
+
+    def _prune(self, sent: deque, window: float, now: float):
+        while sent and now - sent[0] >= window:
+            sent.popleft()
+
+    async def handle_message(self, request: web.Request) -> web.Response:
+        options = self.discord_options
+        channel = request.match_info['channel']
+        await self._delay(options.latency)
+        now = time.monotonic()
+        self._prune(self._global_sent, 1.0, now)
+        if len(self._global_sent) >= options.global_limit:
+            self.stats.rate_limited += 1
+            retry_after = 1.0 - (now - self._global_sent[0])
+            return web.json_response({'message': 'You are being rate limited.', 'retry_after': retry_after,
+                                      'global': True}, status=429)
+        sent = self._channel_sent.setdefault(channel, deque())
+        self._prune(sent, options.channel_window, now)
+        if len(sent) >= options.channel_limit:
+            self.stats.rate_limited += 1
+            retry_after = options.channel_window - (now - sent[0])
+            return web.json_response({'message': 'You are being rate limited.', 'retry_after': retry_after,
+                                      'global': False}, status=429)
+        payload = await request.json()
+        if len(payload.get('content', '')) > 2000:
+            # 与Discord一样拒绝超过2000个字符的消息
+            self.stats.too_long += 1
+            return web.json_response({'message': 'Invalid Form Body', 'code': 50035}, status=400)
+        sent.append(now)
+        self._global_sent.append(now)
+        self.stats.messages += 1
+        self.stats.message_channels[channel] = self.stats.message_channels.get(channel, 0) + 1
+        remaining = options.channel_limit - len(sent)
+        reset_after = options.channel_window - (now - sent[0])
+        return web.json_response(
+            {'id': str(self.stats.messages), 'channel_id': channel, 'content': payload.get('content', '')},
+            headers={'X-RateLimit-Limit': str(options.channel_limit), 'X-RateLimit-Remaining': str(remaining),
+                     'X-RateLimit-Reset-After': f"{reset_after:.3f}"})
+
+    async def handle_translate(self, request: web.Request) -> web.Response:
+        options = self.translate_options
+        await self._delay(options.latency)
+        self.stats.translations += 1
+        if random.random() < options.error_rate:
+            return web.json_response({'responseData': {'translatedText': 'MYMEMORY WARNING: YOU USED ALL AVAILABLE FREE TRANSLATIONS'},
+                                      'responseStatus': 429, 'matches': []})
+        text = request.query.get('q', '')
+        return web.json_response({'responseData': {'translatedText': f"[译] {text}"}, 'responseStatus': 200,
+                                  'matches': []})
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._hub_tasks.add(task)
+        task.add_done_callback(self._hub_tasks.discard)
+
+    async def handle_hub(self, request: web.Request) -> web.Response:
+        """本地的WebSub hub：订阅和取消订阅先返回202再异步验证；publish时获取主题并推送给订阅者"""
+        form = await request.post()
+        mode = form.get('hub.mode')
+        if mode == 'publish':
+            topic = form.get('hub.url') or form.get('hub.topic')
+            if not topic:
+                return web.Response(status=400, text='hub.url is required')
+            self._spawn(self._distribute(topic))
+            return web.Response(status=204)
+        callback, topic = form.get('hub.callback'), form.get('hub.topic')
+        if mode not in ('subscribe', 'unsubscribe') or not callback or not topic:
+            return web.Response(status=400, text='bad request')
+        self._spawn(self._verify(mode, callback, topic, form.get('hub.secret', ''),
+                                 int(form.get('hub.lease_seconds') or 86400)))
+        return web.Response(status=202)
+
+    async def _verify(self, mode: str, callback: str, topic: str, secret: str, lease_seconds: int):
+        challenge = secrets.token_hex(8)
+        params = {'hub.mode': mode, 'hub.topic': topic, 'hub.challenge': challenge,
+                  'hub.lease_seconds': str(lease_seconds)}
+        async with aiohttp.ClientSession() as session:
+            async with session.get(callback, params=params) as response:
+                if response.status != 200 or await response.text() != challenge:
+                    return
+        self.stats.hub_verified += 1
+        subscribers = self.hub_subscriptions.setdefault(topic, {})
+        if mode == 'subscribe':
+            subscribers[callback] = secret
+        else:
+            subscribers.pop(callback, None)
+
+    async def _distribute(self, topic: str):
+        """获取主题的最新内容，带上HMAC签名推送给所有订阅者"""
+        async with aiohttp.ClientSession() as session:
+            async with session.get(topic) as response:
+                body = await response.read()
+                content_type = response.headers.get('Content-Type', 'application/rss+xml')
+            for callback, secret in list(self.hub_subscriptions.get(topic, {}).items()):
+                signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+                headers = {'Content-Type': content_type, 'X-Hub-Signature': f"sha256={signature}"}
+                async with session.post(callback, data=body, headers=headers) as response:
+                    self.stats.hub_pushes += 1
+                    if response.status == 410:
+                        self.hub_subscriptions[topic].pop(callback, None)
+
+    async def handle_publish(self, request: web.Request) -> web.Response:
+        """给某个RSS加一篇新文章并通过hub推送，用于测试WebSub"""
+        feed = int(request.match_info['feed'])
+        state = self.feeds.get(feed)
+        if state is None:
+            return web.Response(status=404)
+        state.generation += 1
+        state.body = b''
+        self._spawn(self._distribute(f"{self.base_url}/feed/{feed}.xml"))
+        return web.json_response({'generation': state.generation})
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        stats = self.stats
+        return web.json_response({
+            'feed_requests': stats.feed_requests, 'feed_not_modified': stats.feed_not_modified,
+            'feed_errors': stats.feed_errors, 'messages': stats.messages,
+            'rate_limited': stats.rate_limited, 'too_long': stats.too_long, 'translations': stats.translations,
+        })
+
+    async def handle_reset(self, request: web.Request) -> web.Response:
+        """每个规模的压测开始前重置状态"""
+        self.feeds.clear()
+        self.hub_subscriptions.clear()
+        self.stats = Stats()
+        self._channel_sent.clear()
+        self._global_sent.clear()
+        return web.json_response({'ok': True})
+
+async def start(services: FakeServices, host: str = '127.0.0.1', port: int = 0) -> Tuple[web.AppRunner, int]:
+    """启动假服务，port为0时自动选择端口，返回 (runner, 端口)"""
+    runner = web.AppRunner(services.build_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port, backlog=1024)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    services.base_url = f"http://{host}:{port}"
+    return runner, port
@@ -0,0 +1,131 @@
+"""基准测试用的RSS样本
+
+录制真实的RSS内容（需要网络）：
+    python benchmarks/fixtures.py record            # 录制config.json中所有启用的源
+    python benchmarks/fixtures.py record mit qbitai # 只录制指定的源
+    python benchmarks/fixtures.py record --env prod # 使用config.json中prod环境的代理
+
+下载和运行时一样经过代理池（config.json的proxies，没有配置时使用HTTP_PROXY环境变量或直连）。
+
+录制的文件保存在 benchmarks/fixtures/<键>.xml。没有录制文件的源使用按源生成的合成RSS，
+合成内容包含XML声明、CDATA、HTML实体、注释、未闭合标签、script等clean_xml要处理的情况，
+结果中会标记样本来源（recorded/synthetic），两者的结果不要混在一起比较。
+"""
+import asyncio
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+CONFIG_FILE = os.path.join(ROOT, 'config.json')
+
+# 内容以中文为主的源
+CHINESE_SOURCES = {'geekpark', 'qbitai', 'nvidia_cn', 'nvidia_dev'}
+
+EN_WORDS = ('model training inference agents research benchmark open source release dataset '
+            'transformer scaling reasoning multimodal safety alignment compute cluster GPU '
+            'language vision robotics developers announced today performance').split()
+ZH_WORDS = ('大模型 训练 推理 智能体 研究 基准 开源 发布 数据集 多模态 安全 对齐 算力 集群 '
+            '开发者 今天 宣布 性能 芯片 机器人 视觉 语言').split()
+
+def load_sources_config() -> Dict[str, Dict]:
+    with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f).get('sources', {})
+
+def fixture_path(key: str) -> str:
+    return os.path.join(FIXTURE_DIR, f"{key}.xml")
+
+def synthetic_feed(key: str, items: int = 30, paragraphs: int = 4) -> str:
+    """生成接近真实RSS的内容，同一个键每次生成的内容相同"""
+    rng = random.Random(key)
+    words = ZH_WORDS if key in CHINESE_SOURCES else EN_WORDS
+    sep = '' if key in CHINESE_SOURCES else ' '
+    now = datetime.now(timezone.utc)
+
+    def sentence(n: int) -> str:
+        return sep.join(rng.choice(words) for _ in range(n))
+
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">',
+             f'<channel><title>{key}</title><link>https://example.com/{key}</link>',
+             '<description>Synthetic fixture &amp; benchmark feed</description>']
+    for i in range(items):
+        body = ''.join(
+            f'<p class="p{j}" id="x{i}{j}">{sentence(40)} &nbsp;&hellip; &rsquo;{sentence(5)}&rsquo;'
+            f'<img src="https://example.com/{key}/{i}/{j}.png" alt="img"><br></p>'
+            for j in range(paragraphs)
+        )
+        body += f'<!-- tracking {i} --><script>var t{i} = 1;</script><iframe src="https://example.com/embed"></iframe>'
+        published = format_datetime(now - timedelta(hours=i))
+        parts.append(
+            f'<item><title>{sentence(8)} {i}</title>'
+            f'<link>https://example.com/{key}/article-{i}</link>'
+            f'<guid isPermaLink="false">{key}-{i}</guid>'
+            f'<pubDate>{published}</pubDate>'
+            f'<description><![CDATA[{body}]]></description>'
+            f'<content:encoded><![CDATA[{body}{body}]]></content:encoded>'
+            f'</item>'
+        )
+        # 少量非法控制字符
+        if i % 10 == 0:
+            parts.append('\x0b')
+    parts.append('</channel></rss>')
+    return '\n'.join(parts)
+
+def load_fixture(key: str) -> Tuple[str, str]:
+    """返回 (RSS内容, 来源)，来源为recorded或synthetic"""
+    path = fixture_path(key)
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return f.read().decode('utf-8', errors='replace'), 'recorded'
+    return synthetic_feed(key), 'synthetic'
+
+async def record(keys: Optional[List[str]] = None, env: str = 'dev'):
+    """下载RSS源当前的原始内容保存为样本"""
+    import run
+    from proxy_pool import proxy_pool
+    from rss_sources.base import BaseRSSSource
+    from rss_sources.loader import load_rss_sources, create_source
+
+    run.setup_proxies(env)
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    sources_config = load_sources_config()
+    if keys:
+        sources_config = {key: cfg for key, cfg in sources_config.items() if key in keys}
+    try:
+        for key, rss_class, source_config in load_rss_sources(sources_config):
+            source = create_source(key, rss_class, source_config)
+            try:
+                async with proxy_pool.get(source.url, headers=source.get_headers()) as response:
+                    if response.status != 200:
+                        print(f"{key}: HTTP {response.status}，跳过")
+                        continue
+                    body = await response.read()
+            except Exception as e:
+                print(f"{key}: 下载失败 {e}")
+                continue
+            with open(fixture_path(key), 'wb') as f:
+                f.write(body)
+            print(f"{key}: 已保存 {len(body)} 字节")
+    finally:
+        await BaseRSSSource.close_session()
+
+if __name__ == '__main__':
+    if len(sys.argv) >= 2 and sys.argv[1] == 'record':
+        args = sys.argv[2:]
+        env = 'dev'
+        if '--env' in args:
+            index = args.index('--env')
+            env = args[index + 1] if index + 1 < len(args) else env
+            del args[index:index + 2]
+        asyncio.run(record(args, env))
+    else:
+        print(__doc__)
@@ -0,0 +1,206 @@
+"""端到端压力测试：本地假RSS源、假Discord REST API（带限流）、假翻译API，运行真实的process_rss_feeds
+
+    python benchmarks/load_test.py --feeds 10,100,1000,10000 --output load.json
+
+父进程运行假服务；每个规模在独立的子进程中运行机器人，内存和CPU互不影响。
+默认预先把每个RSS的初始文章写入历史记录，模拟稳定运行时的状态：每轮只有按 --update-rate
+产生的新文章需要翻译和发送。加 --cold 则第一轮所有文章都是新的。
+--shared N 让每个RSS由N个源共用，各自推送到不同的频道；共用下载后每个频道都应该收到全部文章，
+各频道收到的消息数不一致时以状态码1退出。
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from fixtures import ROOT
+import fake_services
+
+def current_rss_mb() -> float:
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError):
+        return 0.0
+
+def cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+def source_keys(feed: int, shared: int) -> List[str]:
+    """共用同一个RSS的各个源的键"""
+    return [f"feed{feed}"] + [f"feed{feed}_{copy}" for copy in range(1, shared)]
+
+async def run_child(args) -> Dict:
+    """在子进程中运行机器人"""
+    os.chdir(ROOT)
+    os.environ['NO_PROXY'] = '127.0.0.1,localhost'
+    os.environ.pop('HTTP_PROXY', None)
+    from log_config import setup_logging
+    setup_logging({'level': args.log_level})
+
+    import run
+    from discord_rest import DiscordRESTSender
+    from rss_sources.base import BaseRSSSource
+    from rss_sources.config import RSSConfig
+    from rss_sources.generic import GenericRSSSource
+    from state_store import StateStore
+
+    base = f"http://127.0.0.1:{args.port}"
+    tmpdir = tempfile.mkdtemp(prefix='rss-load-')
+    BaseRSSSource.HISTORY_FILE = os.path.join(tmpdir, 'article_history.json')
+    feed_options = fake_services.FeedOptions(items=args.items)
+    if not args.cold:
+        history = {}
+        now = time.time()
+        for feed in range(args.feeds):
+            for title, link in fake_services.initial_items(feed, feed_options):
+                entry_id = hashlib.md5(f"{link}{title}".encode()).hexdigest()
+                for key in source_keys(feed, args.shared):
+                    history[f"{key}:{entry_id}"] = {'title': title, 'link': link, 'timestamp': now, 'source': key}
+        with open(BaseRSSSource.HISTORY_FILE, 'w', encoding='utf-8') as f:
+            json.dump(history, f)
+    store = None
+    if args.state == 'sqlite':
+        store = StateStore(os.path.join(tmpdir, 'state.db'))
+        store.import_history(BaseRSSSource.load_history())
+        BaseRSSSource.use_store(store)
+
+    config = RSSConfig()
+    for feed in range(args.feeds):
+        for copy, key in enumerate(source_keys(feed, args.shared)):
+            # 共用时第几个源就推送到第几个频道，每个频道都应收到所有RSS的全部文章
+            channel = copy if args.shared > 1 else feed % args.channels
+            config.add_source(GenericRSSSource(key, {
+                'url': f"{base}/feed/{feed}.xml",
+                'channel_ids': [str(1000 + channel)],
+            }))
+
+    run.get_translator().provider.base_url = f"{base}/translate/get"
+    sender = DiscordRESTSender('loadtest', f"{base}/api/v10")
+
+    rss_before = current_rss_mb()
+    cpu_before = cpu_seconds()
+    wall_before = time.perf_counter()
+    try:
+        rounds = await run.process_rss_feeds(config, send=sender.send, rounds=args.rounds, interval=args.interval)
+    finally:
+        await sender.close()
+        await BaseRSSSource.close_session()
+        if store is not None:
+            store.close()
+    wall = time.perf_counter() - wall_before
+    cpu = cpu_seconds() - cpu_before
+    processed = sum(r['processed'] for r in rounds)
+    busy = sum(r['elapsed'] for r in rounds)
+    return {
+        'feeds': args.feeds,
+        'rounds': [{k: r[k] for k in ('round', 'elapsed', 'total', 'processed', 'duplicate', 'expired')}
+                   for r in rounds],
+        'articles_sent': processed,
+        'articles_per_second': processed / busy if busy else 0.0,
+        'wall_seconds': wall,
+        'cpu_seconds': cpu,
+        'cpu_percent': cpu / wall * 100 if wall else 0.0,
+        'rss_mb_before': rss_before,
+        'rss_mb_after': current_rss_mb(),
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+async def run_parent(args) -> int:
+    services = fake_services.FakeServices(
+        fake_services.FeedOptions(items=args.items, item_size=args.item_size, update_rate=args.update_rate,
+                                  latency=args.feed_latency, error_rate=args.error_rate),
+        fake_services.DiscordOptions(channel_limit=args.channel_limit, global_limit=args.global_limit),
+        fake_services.TranslateOptions(latency=args.translate_latency),
+    )
+    runner, port = await fake_services.start(services)
+    print(f"假服务已启动: http://127.0.0.1:{port}", file=sys.stderr)
+    results = []
+    failed = False
+    try:
+        for feeds in [int(n) for n in args.feeds.split(',')]:
+            await services.handle_reset(None)
+            child_args = [sys.executable, os.path.abspath(__file__), '--child', '--port', str(port),
+                          '--feeds', str(feeds), '--items', str(args.items), '--rounds', str(args.rounds),
+                          '--interval', str(args.interval), '--channels', str(args.channels),
+                          '--shared', str(args.shared), '--state', args.state, '--log-level', args.log_level]
+            if args.cold:
+                child_args.append('--cold')
+            print(f"开始压测 {feeds} 个RSS源...", file=sys.stderr)
+            process = await asyncio.create_subprocess_exec(*child_args, stdout=asyncio.subprocess.PIPE)
+            stdout, _ = await process.communicate()
+            if process.returncode != 0:
+                print(f"{feeds} 个RSS源的压测失败，退出码 {process.returncode}", file=sys.stderr)
+                continue
+            result = json.loads(stdout.decode().strip().splitlines()[-1])
+            stats = services.stats
+            result['server'] = {
+                'feed_requests': stats.feed_requests, 'feed_not_modified': stats.feed_not_modified,
+                'feed_errors': stats.feed_errors, 'messages': stats.messages,
+                'rate_limited': stats.rate_limited, 'too_long': stats.too_long,
+                'translations': stats.translations, 'message_channels': dict(stats.message_channels),
+            }
+            results.append(result)
+            print_result(result)
+            counts = [stats.message_channels.get(str(1000 + copy), 0) for copy in range(args.shared)]
+            if args.shared > 1 and len(set(counts)) > 1:
+                print(f"  共用RSS的频道收到的消息数不一致: {stats.message_channels}", file=sys.stderr)
+                failed = True
+    finally:
+        await runner.cleanup()
+
+    output = {'options': vars(args), 'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(output, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(output, ensure_ascii=False, indent=2))
+    return 1 if failed else 0
+
+def print_result(result: Dict):
+    durations = ' '.join(f"{r['elapsed']:.1f}s" for r in result['rounds'])
+    server = result['server']
+    print(f"  RSS源={result['feeds']} 每轮耗时=[{durations}] 发送={result['articles_sent']} "
+          f"文章/秒={result['articles_per_second']:.1f} CPU={result['cpu_percent']:.0f}% "
+          f"内存峰值={result['peak_rss_mb']:.0f}MB 304={server['feed_not_modified']} "
+          f"429={server['rate_limited']} 超长={server['too_long']} 翻译请求={server['translations']}", file=sys.stderr)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='端到端压力测试')
+    parser.add_argument('--feeds', default='10,100,1000,10000', help='RSS源数量，逗号分隔')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--interval', type=float, default=0, help='两轮之间的间隔（秒）')
+    parser.add_argument('--items', type=int, default=5, help='每个RSS中的文章数')
+    parser.add_argument('--item-size', type=int, default=600, help='每篇文章摘要的字节数')
+    parser.add_argument('--update-rate', type=float, default=0.02, help='每次请求RSS出现新文章的概率')
+    parser.add_argument('--feed-latency', type=float, default=0.05, help='RSS响应延迟（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.01, help='RSS返回500的概率')
+    parser.add_argument('--translate-latency', type=float, default=0.05)
+    parser.add_argument('--channels', type=int, default=20, help='Discord频道数量')
+    parser.add_argument('--shared', type=int, default=1, help='共用同一个RSS的源数量，每个源推送到不同的频道')
+    parser.add_argument('--channel-limit', type=int, default=5, help='每个频道每5秒的消息数')
+    parser.add_argument('--global-limit', type=int, default=50, help='每秒全局请求数')
+    parser.add_argument('--state', choices=['json', 'sqlite'], default='json', help='历史记录的存储方式')
+    parser.add_argument('--cold', action='store_true', help='不预先写入历史记录，第一轮所有文章都是新的')
+    parser.add_argument('--log-level', default='CRITICAL', help='机器人的日志级别，默认只输出压测结果')
+    parser.add_argument('--output', help='结果JSON的保存路径，默认输出到标准输出')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        args.feeds = int(args.feeds)
+        print(json.dumps(asyncio.run(run_child(args))))
+        return 0
+    return asyncio.run(run_parent(args))
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""离线基准测试，不需要网络
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --compare baseline.json --threshold 0.2
+
+结果为JSON，每项记录单次调用耗时的中位数/最小值/平均值（秒）；
+--compare 时中位数比基准慢超过阈值的项目视为性能回退，进程以状态码1退出。
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from fixtures import ROOT, load_fixture, load_sources_config
+
+class Suite:
+    """收集各项基准的结果"""
+
+    def __init__(self, repeat: int = 5, min_time: float = 0.05):
+        self.repeat = repeat
+        self.min_time = min_time
+        self.results: Dict[str, Dict] = {}
+        self.errors: Dict[str, str] = {}
+
+    def measure(self, name: str, func: Callable[[], object], setup: Optional[Callable[[], None]] = None,
+                **extra):
+        """多次执行func，记录单次调用的耗时；setup在每次执行前调用，不计入耗时"""
+        try:
+            number = 1
+            if setup is None:
+                # 很快的项目一次执行多遍，减少计时误差；需要准备数据的项目每次只执行一遍
+                start = time.perf_counter()
+                func()
+                once = time.perf_counter() - start
+                if once < self.min_time:
+                    number = max(1, int(self.min_time / max(once, 1e-9)))
+            timings = []
+            for _ in range(self.repeat):
+                if setup is not None:
+                    setup()
+                start = time.perf_counter()
+                for _ in range(number):
+                    func()
+                timings.append((time.perf_counter() - start) / number)
+        except Exception as e:
+            self.errors[name] = f"{type(e).__name__}: {e}"
+            print(f"{name:<50} 出错: {self.errors[name]}", file=sys.stderr)
+            return
+        self.results[name] = {
+            'median_s': statistics.median(timings),
+            'min_s': min(timings),
+            'mean_s': statistics.fmean(timings),
+            'number': number,
+            'repeat': self.repeat,
+            **extra,
+        }
+        print(f"{name:<50} {self.results[name]['median_s'] * 1000:10.3f} ms", file=sys.stderr)
+
+def bench_sources(suite: Suite, keys: Optional[List[str]]):
+    """clean_xml、feedparser、parse_entries、parse_entry、get_entry_id"""
+    import feedparser
+    from rss_sources.entry import ParsedEntry
+    from rss_sources.loader import load_rss_sources, create_source
+
+    sources_config = load_sources_config()
+    if keys:
+        sources_config = {key: cfg for key, cfg in sources_config.items() if key in keys}
+    loop = asyncio.new_event_loop()
+    try:
+        for key, rss_class, source_config in load_rss_sources(sources_config):
+            source = create_source(key, rss_class, source_config)
+            content, origin = load_fixture(key)
+            info = {'fixture': origin, 'bytes': len(content.encode('utf-8'))}
+            suite.measure(f"clean_xml[{key}]", lambda: source.clean_xml(content), **info)
+            suite.measure(f"feedparser.parse[{key}]", lambda: feedparser.parse(content), **info)
+            suite.measure(f"parse_entries[{key}]", lambda: source.parse_entries(content), **info)
+
+            raw_entries = feedparser.parse(content).entries
+            if not raw_entries:
+                suite.errors[f"parse_entry[{key}]"] = "样本中没有文章"
+                continue
+            # 这两项按整个RSS的所有文章计时
+            info = {'fixture': origin, 'entries': len(raw_entries), 'unit': 'feed'}
+            entries = []
+
+            def fresh_entries():
+                # parse_entry会原地修改摘要，每次重新生成
+                entries[:] = [ParsedEntry.from_feed_entry(entry) for entry in raw_entries]
+
+            async def parse_all():
+                for entry in entries:
+                    await source.parse_entry(entry)
+
+            suite.measure(f"parse_entry[{key}]", lambda: loop.run_until_complete(parse_all()),
+                          setup=fresh_entries, **info)
+            fresh_entries()
+            suite.measure(f"get_entry_id[{key}]", lambda: [source.get_entry_id(entry) for entry in entries],
+                          **info)
+    finally:
+        loop.close()
+
+def bench_history(suite: Suite, size: int):
+    """历史记录的加载、保存和清理"""
+    from rss_sources.base import BaseRSSSource
+
+    tmpdir = tempfile.mkdtemp(prefix='rss-bench-')
+    old_file = BaseRSSSource.HISTORY_FILE
+    old_history = BaseRSSSource._shared_history
+    BaseRSSSource.HISTORY_FILE = os.path.join(tmpdir, 'article_history.json')
+    now = datetime.now().timestamp()
+    # 一半记录已过期
+    template = {
+        f"{i:032x}": {'title': f"Article {i}", 'link': f"https://example.com/{i}",
+                      'timestamp': now - (i % 2) * 30 * 24 * 3600, 'source': 'bench'}
+        for i in range(size)
+    }
+
+    def write_history():
+        BaseRSSSource._shared_history = {}
+        with open(BaseRSSSource.HISTORY_FILE, 'w', encoding='utf-8') as f:
+            json.dump(template, f, ensure_ascii=False, indent=2)
+
+    def reset_loaded():
+        write_history()
+        BaseRSSSource._shared_history = {}
+
+    def reset_in_memory():
+        BaseRSSSource._shared_history = {k: dict(v) for k, v in template.items()}
+
+    info = {'entries': size}
+    try:
+        write_history()
+        suite.measure('history.load', BaseRSSSource.load_history, setup=reset_loaded, **info)
+        suite.measure('history.save', BaseRSSSource.save_history, setup=reset_in_memory, **info)
+        suite.measure('history.clean', BaseRSSSource.clean_history, setup=reset_in_memory, **info)
+        reset_in_memory()
+        history = BaseRSSSource._shared_history
+        keys = list(template)
+        suite.measure('history.lookup', lambda: [key in history for key in keys], **info, unit='batch')
+    finally:
+        BaseRSSSource.HISTORY_FILE = old_file
+        BaseRSSSource._shared_history = old_history
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+def bench_language(suite: Suite):
+    """language.detect判断文章语言"""
+    from fixtures import EN_WORDS, ZH_WORDS
+    from language import detect
+
+    english = ' '.join(EN_WORDS * 40)
+    chinese = ''.join(ZH_WORDS * 40)
+    mixed = english + ' 中文'
+    for name, text in (('english', english), ('chinese', chinese), ('mixed_tail', mixed)):
+        suite.measure(f"detect_language[{name}]", lambda: detect(text), chars=len(text))
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """返回比基准慢超过阈值的项目"""
+    regressions = []
+    print(f"\n{'项目':<50} {'基准(ms)':>10} {'当前(ms)':>10} {'变化':>8}", file=sys.stderr)
+    for name, result in results['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            continue
+        # 样本或数据量不同的结果没有可比性
+        if any(base.get(k) != result.get(k) for k in ('fixture', 'bytes', 'entries', 'chars')):
+            continue
+        ratio = result['median_s'] / base['median_s'] if base['median_s'] else 1.0
+        flag = ''
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = '  <-- 回退'
+        print(f"{name:<50} {base['median_s'] * 1000:10.3f} {result['median_s'] * 1000:10.3f} "
+              f"{(ratio - 1) * 100:+7.1f}%{flag}", file=sys.stderr)
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='RSS处理的离线基准测试')
+    parser.add_argument('--output', help='结果JSON的保存路径，默认输出到标准输出')
+    parser.add_argument('--compare', help='与之前保存的结果比较')
+    parser.add_argument('--threshold', type=float, default=0.2, help='判定为回退的变慢比例，默认0.2')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--sources', help='只测试这些源，逗号分隔')
+    parser.add_argument('--history-size', type=int, default=10000, help='历史记录基准使用的记录数')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.CRITICAL)
+    os.chdir(ROOT)
+    suite = Suite(repeat=args.repeat)
+    bench_sources(suite, args.sources.split(',') if args.sources else None)
+    bench_history(suite, args.history_size)
+    bench_language(suite)
+
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+        },
+        'results': suite.results,
+        'errors': suite.errors,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} 项性能回退: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
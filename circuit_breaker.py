@@ -0,0 +1,148 @@
+import logging
+import random
+import time
+from typing import Dict, List, Optional
+import metrics
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_OPEN = metrics.registry.gauge('rss_circuit_open', '处于熔断状态的RSS源或主机', ['kind', 'key'])
+CIRCUIT_SKIPPED = metrics.registry.counter('rss_circuit_skipped_total', '因熔断跳过抓取的次数', ['source'])
+
+class CircuitBreaker:
+    """单个RSS源或主机的熔断器
+
+    closed：正常放行，连续失败达到阈值后进入open；
+    open：在退避时间内拒绝请求，退避时间每次打开翻倍并加上随机抖动；
+    half_open：退避到期后只放行一次探测，成功则关闭，失败则以更长的退避重新打开。
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, key: str, threshold: int = 3, base_delay: float = 300, max_delay: float = 6 * 3600,
+                 jitter: float = 0.2):
+        self.key = key
+        self.threshold = threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.state = self.CLOSED
+        self.failures = 0      # 连续失败次数
+        self.opened = 0        # 连续打开次数，决定退避时间
+        self.open_until = 0.0  # time.monotonic()
+
+    def ready(self, now: float) -> bool:
+        """是否会放行，不改变状态"""
+        return self.state == self.CLOSED or now >= self.open_until
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        now = time.monotonic() if now is None else now
+        if now >= self.open_until:
+            # 退避到期，放行一次探测；探测结果一直没有回来时，base_delay之后再探测一次
+            self.state = self.HALF_OPEN
+            self.open_until = now + self.base_delay
+            return True
+        return False
+
+    def success(self):
+        if self.state != self.CLOSED:
+            logger.info("熔断器 [%s] 已恢复", self.key)
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened = 0
+
+    def failure(self, now: Optional[float] = None):
+        self.failures += 1
+        # 已经打开时（打开前发出的并发请求陆续失败）不再延长退避
+        if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.threshold):
+            now = time.monotonic() if now is None else now
+            self.opened += 1
+            delay = min(self.max_delay, self.base_delay * 2 ** (self.opened - 1))
+            delay *= 1 + random.uniform(-self.jitter, self.jitter)
+            self.state = self.OPEN
+            self.open_until = now + delay
+            logger.warning("熔断器 [%s] 打开：连续失败 %d 次，%.0f 秒后重试", self.key, self.failures, delay)
+
+    def remaining(self, now: Optional[float] = None) -> float:
+        """距离下一次探测的秒数"""
+        now = time.monotonic() if now is None else now
+        return max(0.0, self.open_until - now) if self.state == self.OPEN else 0.0
+
+class BreakerRegistry:
+    """按RSS源和主机分别熔断：源的失败只影响这个源，主机不可达时这个主机上的所有源都会跳过"""
+
+    def __init__(self):
+        self.threshold = 3
+        self.base_delay = 300.0
+        self.max_delay = 6 * 3600.0
+        self.jitter = 0.2
+        self.sources: Dict[str, CircuitBreaker] = {}
+        self.hosts: Dict[str, CircuitBreaker] = {}
+
+    def configure(self, threshold: int = 3, base_delay: float = 300, max_delay: float = 6 * 3600,
+                  jitter: float = 0.2):
+        """设置之后新建的熔断器使用的参数"""
+        self.threshold = threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def _get(self, breakers: Dict[str, CircuitBreaker], key: str, label: str) -> CircuitBreaker:
+        breaker = breakers.get(key)
+        if breaker is None:
+            breaker = breakers[key] = CircuitBreaker(label, self.threshold, self.base_delay,
+                                                     self.max_delay, self.jitter)
+        return breaker
+
+    def allow(self, source_key: str, host: Optional[str]) -> bool:
+        """源和主机都没有熔断时才允许抓取"""
+        now = time.monotonic()
+        source = self._get(self.sources, source_key, f"源 {source_key}")
+        host_breaker = self._get(self.hosts, host, f"主机 {host}") if host else None
+        # 两个都放行时才改变状态，避免一方进入探测状态而请求却被另一方拦下
+        if not source.ready(now) or (host_breaker is not None and not host_breaker.ready(now)):
+            CIRCUIT_SKIPPED.inc(source=source_key)
+            return False
+        source.allow(now)
+        if host_breaker is not None:
+            host_breaker.allow(now)
+        return True
+
+    def success(self, source_key: Optional[str] = None, host: Optional[str] = None):
+        if source_key:
+            self._get(self.sources, source_key, f"源 {source_key}").success()
+        if host:
+            self._get(self.hosts, host, f"主机 {host}").success()
+
+    def failure(self, source_key: Optional[str] = None, host: Optional[str] = None):
+        now = time.monotonic()
+        if source_key:
+            self._get(self.sources, source_key, f"源 {source_key}").failure(now)
+        if host:
+            self._get(self.hosts, host, f"主机 {host}").failure(now)
+
+    def summary(self) -> List[str]:
+        """未关闭的熔断器，每个一行"""
+        now = time.monotonic()
+        lines = []
+        for breakers in (self.hosts, self.sources):
+            for breaker in breakers.values():
+                if breaker.state == CircuitBreaker.OPEN:
+                    lines.append(f"{breaker.key}: 连续失败 {breaker.failures} 次，"
+                                 f"{breaker.remaining(now):.0f} 秒后探测")
+                elif breaker.state == CircuitBreaker.HALF_OPEN:
+                    lines.append(f"{breaker.key}: 探测中")
+        return lines
+
+    def collect_metrics(self):
+        CIRCUIT_OPEN.clear()
+        for kind, breakers in (('host', self.hosts), ('source', self.sources)):
+            for key, breaker in breakers.items():
+                if breaker.state != CircuitBreaker.CLOSED:
+                    CIRCUIT_OPEN.set(1, kind=kind, key=key)
+
+breakers = BreakerRegistry()
+metrics.registry.add_collector(breakers.collect_metrics)
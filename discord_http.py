@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import ssl
+import aiohttp
+import discord
+from aiohttp import ClientTimeout
+from aiohttp.client_exceptions import ClientError, ClientConnectorError
+from discord.http import HTTPClient, Route
+from discord.errors import DiscordServerError
+from dns_resolver import dns_resolver, format_ip
+import metrics
+
+logger = logging.getLogger(__name__)
+
+class CustomHTTPClient(HTTPClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        
+        # 创建自定义SSL上下文
+        ssl_context = ssl.create_default_context()
+        ssl_context.check_hostname = False
+        ssl_context.verify_mode = ssl.CERT_NONE
+        
+        # 创建connector
+        self._connector = aiohttp.TCPConnector(
+            ssl=ssl_context,
+            force_close=False,
+            enable_cleanup_closed=True,
+            limit=10,
+            ttl_dns_cache=300,
+            use_dns_cache=True,
+            verify_ssl=False
+        )
+        
+        # 设置更长的超时时间
+        timeout = ClientTimeout(
+            total=120,
+            connect=30,
+            sock_connect=30,
+            sock_read=30
+        )
+        
+        # 创建session
+        self.__session = aiohttp.ClientSession(
+            connector=self._connector,
+            timeout=timeout
+        )
+
+    async def request(self, route: Route, **kwargs):
+        """重写请求方法，使用IP直接请求，失败时切换到其他健康的IP"""
+        retries = 3
+        last_error = None
+        
+        for attempt in range(retries):
+            discord_ip = None
+            try:
+                discord_ip = dns_resolver.get_discord_ip()
+                logger.debug("获取到Discord IP: %s", discord_ip)
+                
+                # 构建使用IP的URL
+                url = f"https://{format_ip(discord_ip)}/api/v10{route.path}"
+                logger.debug("发起请求: URL=%s, method=%s", url, route.method)
+                
+                # 添加必要的headers
+                headers = kwargs.get('headers', {}) or {}
+                headers['Host'] = 'discord.com'
+                headers['Connection'] = 'keep-alive'
+                kwargs['headers'] = headers
+                
+                # 直接使用session发起请求，而不是调用父类的request方法
+                async with self.__session.request(
+                    route.method, url, **kwargs
+                ) as response:
+                    # 读取响应内容
+                    data = await response.read()
+                    logger.debug("收到响应: status=%s", response.status)
+                    if response.status == 429:
+                        metrics.RATE_LIMITED.inc()
+                    
+                    # 检查响应状态
+                    if response.status >= 500:
+                        dns_resolver.report_failure(discord_ip)
+                        raise DiscordServerError(response, data)
+                    
+                    dns_resolver.report_success(discord_ip)
+                    return data
+                    
+            except asyncio.TimeoutError as e:
+                last_error = e
+                logger.warning(f"请求超时 (attempt {attempt + 1}/{retries}): {str(e)}")
+                await self._before_retry(discord_ip, attempt, retries)
+                continue
+            except (ClientError, ClientConnectorError) as e:
+                last_error = e
+                logger.warning(f"请求失败 (attempt {attempt + 1}/{retries}): {str(e)}")
+                await self._before_retry(discord_ip, attempt, retries)
+                continue
+            except Exception as e:
+                logger.error(f"未预期的错误: {str(e)}", exc_info=True)
+                raise
+        
+        logger.error(f"所有重试都失败了: {str(last_error)}")
+        raise last_error
+
+    async def _before_retry(self, discord_ip: str, attempt: int, retries: int):
+        """标记失败的IP；还有其他健康IP时立即重试，否则退避等待"""
+        if discord_ip:
+            dns_resolver.report_failure(discord_ip)
+        if attempt < retries - 1 and not dns_resolver.has_healthy_ip():
+            await asyncio.sleep(2 ** attempt)
+
+def install_http_client():
+    """修改Discord的HTTP类"""
+    discord.http.HTTPClient = CustomHTTPClient
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import ssl
+import time
+from typing import Dict, Optional
+import aiohttp
+import certifi
+import metrics
+from dns_resolver import dns_resolver
+
+logger = logging.getLogger(__name__)
+
+class DiscordRESTSender:
+    """不经过网关，直接调用Discord REST API发送消息
+
+    webhooks中配置了的频道通过webhook发送，不需要Bot Token；其他频道用Bot Token调用REST API。
+    按响应头 X-RateLimit-Remaining/Reset-After 主动等待，遇到429按retry_after等待后重试。
+    """
+    API_BASE = 'https://discord.com/api/v10'
+    MAX_RETRIES = 5
+
+    def __init__(self, token: Optional[str], api_base: Optional[str] = None,
+                 webhooks: Optional[Dict[str, str]] = None):
+        self.token = token
+        self.api_base = (api_base or self.API_BASE).rstrip('/')
+        # 频道 -> webhook地址
+        self.webhooks = {str(channel_id): url for channel_id, url in (webhooks or {}).items()}
+        self._session: Optional[aiohttp.ClientSession] = None
+        # 频道 -> 在此时间之前不能再发送（time.monotonic）
+        self._channel_until: Dict[str, float] = {}
+        self._global_until = 0.0
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                ssl=ssl.create_default_context(cafile=certifi.where()),
+                resolver=dns_resolver,
+                use_dns_cache=False,
+                limit=50
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self._session
+
+    async def _wait_for_bucket(self, channel_id: str):
+        until = max(self._global_until, self._channel_until.get(channel_id, 0.0))
+        delay = until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def send(self, channel_id, content: str) -> Dict:
+        """发送消息到频道，返回Discord返回的消息对象"""
+        channel_id = str(channel_id)
+        webhook = self.webhooks.get(channel_id)
+        if webhook:
+            # wait=true时返回消息对象，与REST API一致；webhook不带Bot Token
+            url, headers = f"{webhook}?wait=true", None
+        elif self.token:
+            url, headers = f"{self.api_base}/channels/{channel_id}/messages", {'Authorization': f'Bot {self.token}'}
+        else:
+            raise RuntimeError(f"频道 {channel_id} 没有配置webhook，也没有Bot Token")
+        for attempt in range(self.MAX_RETRIES):
+            await self._wait_for_bucket(channel_id)
+            with metrics.SEND_SECONDS.time():
+                async with self._get_session().post(url, json={'content': content}, headers=headers) as response:
+                    if response.status == 429:
+                        data = await response.json(content_type=None)
+                        retry_after = float(data.get('retry_after') or response.headers.get('Retry-After', 1))
+                        metrics.RATE_LIMITED.inc()
+                        if data.get('global'):
+                            self._global_until = time.monotonic() + retry_after
+                        else:
+                            self._channel_until[channel_id] = time.monotonic() + retry_after
+                        logger.debug("频道 %s 被限流，%.2f秒后重试", channel_id, retry_after)
+                        continue
+                    if response.status >= 500:
+                        logger.warning("Discord返回 %s (attempt %d/%d)", response.status, attempt + 1, self.MAX_RETRIES)
+                        await asyncio.sleep(2 ** attempt)
+                        continue
+                    if response.status >= 400:
+                        raise RuntimeError(f"发送到频道 {channel_id} 失败: HTTP {response.status} {await response.text()}")
+                    if response.headers.get('X-RateLimit-Remaining') == '0':
+                        reset_after = float(response.headers.get('X-RateLimit-Reset-After', 0))
+                        self._channel_until[channel_id] = time.monotonic() + reset_after
+                    return await response.json(content_type=None)
+        raise RuntimeError(f"发送到频道 {channel_id} 失败，重试 {self.MAX_RETRIES} 次后放弃")
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
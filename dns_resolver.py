@@ -1,26 +1,68 @@
 import asyncio
-import aiodns
 import logging
-from typing import List, Optional, Dict
+from aiohttp.abc import AbstractResolver
+import random
+from typing import List, Optional, Dict, Tuple, TYPE_CHECKING
 import socket
 import ssl
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 
+if TYPE_CHECKING:
+    import aiodns
+
 logger = logging.getLogger(__name__)
 
 @dataclass
 class ResolvedHost:
-    ip: str
+    ips: List[str]
     timestamp: datetime
     ttl: int = 300  # 默认TTL为5分钟
 
+    @property
+    def ip(self) -> Optional[str]:
+        """第一个解析到的IP，兼容旧接口"""
+        return self.ips[0] if self.ips else None
+
     @property
     def is_expired(self) -> bool:
         return datetime.now() > self.timestamp + timedelta(seconds=self.ttl)
 
-class DNSResolver:
+@dataclass
+class IPHealth:
+    """单个IP的健康状态和延迟评分"""
+    latency: Optional[float] = None  # 连接延迟的滑动平均（秒）
+    failures: int = 0
+    down_until: float = 0.0  # 在此时间点(monotonic)之前视为不可用
+
+    # 延迟滑动平均的权重
+    EWMA_ALPHA = 0.3
+    # 失败后的冷却时间（秒），连续失败时翻倍
+    FAILURE_COOLDOWN = 30
+    MAX_COOLDOWN = 600
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def record_latency(self, latency: float):
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency = self.EWMA_ALPHA * latency + (1 - self.EWMA_ALPHA) * self.latency
+
+    def record_success(self):
+        self.failures = 0
+        self.down_until = 0.0
+
+    def record_failure(self):
+        self.failures += 1
+        cooldown = min(self.FAILURE_COOLDOWN * 2 ** (self.failures - 1), self.MAX_COOLDOWN)
+        self.down_until = time.monotonic() + cooldown
+
+class DNSResolver(AbstractResolver):
+    """带TTL缓存的DNS解析器，Discord和RSS源的aiohttp会话共用同一份缓存"""
     # 可信的DNS服务器列表
     TRUSTED_DNS_SERVERS = [
         '1.1.1.1',        # Cloudflare
@@ -36,103 +78,358 @@ class DNSResolver:
         'media.discordapp.net'
     ]
     
+    # Discord API主机名
+    API_HOST = 'discord.com'
+    # 探测延迟时连接的端口和超时
+    PROBE_PORT = 443
+    PROBE_TIMEOUT = 3
+    # 尚未探测到延迟的IP使用的默认延迟（秒）
+    DEFAULT_LATENCY = 1.0
+
+    # TTL的上下限（秒），避免过于频繁或过久不刷新
+    MIN_TTL = 30
+    MAX_TTL = 3600
+    # 在TTL用掉这个比例时提前刷新
+    REFRESH_RATIO = 0.8
+    # 刷新失败后的重试间隔（秒）
+    REFRESH_RETRY_INTERVAL = 15
+    # 单次DNS查询超时（秒）
+    QUERY_TIMEOUT = 5
+
     def __init__(self):
-        self._resolver = None
+        self._resolvers: Dict[str, 'aiodns.DNSResolver'] = {}
         self._resolved_hosts = {}
-        self._current_dns_index = 0
+        self._ip_health: Dict[str, IPHealth] = {}
+        self._next_refresh: Dict[str, float] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+        # 安排了比后台任务当前等待的时间更早的刷新时唤醒它
+        self._wakeup = asyncio.Event()
+        self._sleep_until = float('inf')
+        self._current_dns_server = self.TRUSTED_DNS_SERVERS[0]
         self.last_resolved = None
     
-    async def _init_resolver(self):
-        """初始化DNS解析器"""
-        if self._resolver is None:
-            # 创建新的解析器实例
-            self._resolver = aiodns.DNSResolver()
-            # 设置nameservers
-            self._resolver.nameservers = [self.TRUSTED_DNS_SERVERS[self._current_dns_index]]
-            logger.info(f"使用DNS服务器: {self._resolver.nameservers[0]}")
+    def _get_resolver(self, dns_server: str) -> 'aiodns.DNSResolver':
+        """获取指定DNS服务器的解析器，每个服务器复用一个实例"""
+        resolver = self._resolvers.get(dns_server)
+        if resolver is None:
+            import aiodns
+
+            resolver = aiodns.DNSResolver(nameservers=[dns_server], timeout=self.QUERY_TIMEOUT)
+            self._resolvers[dns_server] = resolver
+        return resolver
     
-    async def _resolve_host(self, hostname: str) -> Optional[List[str]]:
-        """解析单个主机名"""
+    async def _query_server(self, dns_server: str, hostname: str) -> Tuple[List[str], int]:
+        """通过指定DNS服务器查询A和AAAA记录，返回(IP列表, TTL)"""
+        resolver = self._get_resolver(dns_server)
+        a_query = resolver.query(hostname, 'A')
+        aaaa_query = resolver.query(hostname, 'AAAA')
+        a_result, aaaa_result = await asyncio.gather(a_query, aaaa_query, return_exceptions=True)
+        if isinstance(a_result, Exception):
+            raise a_result
+        answers = list(a_result)
+        # 没有AAAA记录是正常情况
+        if not isinstance(aaaa_result, Exception):
+            answers.extend(aaaa_result)
+        if not answers:
+            raise RuntimeError(f"{dns_server} 未返回 {hostname} 的记录")
+        ttl = min(answer.ttl for answer in answers)
+        return [answer.host for answer in answers], ttl
+    
+    async def _resolve_host(self, hostname: str) -> Optional[Tuple[List[str], int]]:
+        """并发向所有可信DNS服务器查询，采用最先成功的结果"""
+        tasks = {
+            asyncio.ensure_future(self._query_server(dns_server, hostname)): dns_server
+            for dns_server in self.TRUSTED_DNS_SERVERS
+        }
+        pending = set(tasks)
         try:
-            await self._init_resolver()
-            response = await self._resolver.query(hostname, 'A')
-            return [answer.host for answer in response]
-        except Exception as e:
-            logger.error(f"解析 {hostname} 失败: {str(e)}")
-            # 如果当前DNS服务器失败，尝试下一个
-            self._current_dns_index = (self._current_dns_index + 1) % len(self.TRUSTED_DNS_SERVERS)
-            self._resolver = None  # 重置解析器，下次会使用新的DNS服务器
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self._current_dns_server = tasks[task]
+                        return task.result()
+                    logger.warning(f"使用DNS服务器 {tasks[task]} 解析 {hostname} 失败: {str(task.exception())}")
+        finally:
+            for task in pending:
+                task.cancel()
+        logger.error(f"解析 {hostname} 失败: 所有DNS服务器均不可用")
+        return None
+    
+    async def _refresh_host(self, hostname: str) -> Optional[List[str]]:
+        """解析主机名并更新缓存，同一主机名的并发请求共用一次查询"""
+        future = self._inflight.get(hostname)
+        if future is None:
+            future = asyncio.ensure_future(self._do_refresh_host(hostname))
+            self._inflight[hostname] = future
+            future.add_done_callback(lambda _: self._inflight.pop(hostname, None))
+        return await asyncio.shield(future)
+    
+    async def _do_refresh_host(self, hostname: str) -> Optional[List[str]]:
+        """解析主机名并更新缓存；失败时保留旧记录，稍后重试"""
+        result = await self._resolve_host(hostname)
+        if not result:
+            self._schedule_refresh(hostname, time.monotonic() + self.REFRESH_RETRY_INTERVAL)
             return None
+        ips, ttl = result
+        self._cache_ips(hostname, ips, ttl)
+        logger.info(f"已解析 {hostname} -> {ips} (TTL {ttl}s)")
+        return ips
+    
+    def _cache_ips(self, hostname: str, ips: List[str], ttl: int):
+        """写入缓存并安排下一次刷新"""
+        ttl = max(self.MIN_TTL, min(ttl, self.MAX_TTL))
+        self._resolved_hosts[hostname] = ResolvedHost(
+            ips=ips,
+            timestamp=datetime.now(),
+            ttl=ttl
+        )
+        self._schedule_refresh(hostname, time.monotonic() + ttl * self.REFRESH_RATIO)
+
+    def _schedule_refresh(self, hostname: str, at: float):
+        """安排主机名的下一次刷新，比后台任务当前等待的时间早时唤醒它"""
+        self._next_refresh[hostname] = at
+        if at < self._sleep_until:
+            self._wakeup.set()
     
     async def resolve_discord_hosts(self) -> dict:
-        """解析所有Discord相关域名"""
+        """并发解析所有Discord相关域名"""
         resolved = {}
+        to_resolve = []
         for hostname in self.DISCORD_HOSTS:
             # 检查缓存
             cached = self._resolved_hosts.get(hostname)
             if cached and not cached.is_expired:
-                resolved[hostname] = cached.ip
-                continue
-            
-            # 解析新的IP
-            ips = await self._resolve_host(hostname)
+                resolved[hostname] = cached.ips
+            else:
+                to_resolve.append(hostname)
+        
+        results = await asyncio.gather(*(self._refresh_host(hostname) for hostname in to_resolve))
+        for hostname, ips in zip(to_resolve, results):
             if ips:
-                # 使用第一个IP地址
-                resolved[hostname] = ips[0]
-                # 更新缓存
-                self._resolved_hosts[hostname] = ResolvedHost(
-                    ip=ips[0],
-                    timestamp=datetime.now()
-                )
-                logger.info(f"已解析 {hostname} -> {ips[0]}")
+                resolved[hostname] = ips
             else:
                 logger.warning(f"无法解析 {hostname}")
         
+        # 探测API主机各个IP的连接延迟
+        await self.probe_host(self.API_HOST)
+        
         self.last_resolved = datetime.now()
         return resolved
     
+    def start_refresh(self):
+        """启动后台刷新任务，在记录过期前重新解析"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+    
+    async def stop_refresh(self):
+        """停止后台刷新任务"""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+    
+    async def _refresh_loop(self):
+        """后台刷新循环"""
+        while True:
+            try:
+                # 新加入的主机名（热加载的RSS源、重定向的目标等）可能比当前最早的刷新时间还早，
+                # 安排刷新时会设置_wakeup，重新计算等待时间
+                self._wakeup.clear()
+                self._sleep_until = min(self._next_refresh.values(), default=float('inf'))
+                delay = self._sleep_until - time.monotonic()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=min(delay, self.MAX_TTL))
+                        continue
+                    except asyncio.TimeoutError:
+                        pass
+                self._sleep_until = float('inf')
+                
+                now = time.monotonic()
+                due = [hostname for hostname, at in self._next_refresh.items() if at <= now]
+                if not due:
+                    continue
+                logger.debug(f"后台刷新DNS: {due}")
+                await asyncio.gather(*(self._refresh_host(hostname) for hostname in due))
+                if self.API_HOST in due:
+                    await self.probe_host(self.API_HOST)
+                self.last_resolved = datetime.now()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"DNS后台刷新出错: {str(e)}", exc_info=True)
+                await asyncio.sleep(self.REFRESH_RETRY_INTERVAL)
+    
+    async def _probe_ip(self, ip: str) -> Optional[float]:
+        """测量到指定IP的TCP连接延迟，失败返回None"""
+        start = time.monotonic()
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(ip, self.PROBE_PORT),
+                timeout=self.PROBE_TIMEOUT
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            logger.warning(f"探测 {ip} 失败: {str(e)}")
+            return None
+        latency = time.monotonic() - start
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return latency
+    
+    async def probe_host(self, hostname: str):
+        """并发探测主机所有IP的连接延迟，并更新健康状态"""
+        cached = self._resolved_hosts.get(hostname)
+        if not cached or not cached.ips:
+            return
+        latencies = await asyncio.gather(*(self._probe_ip(ip) for ip in cached.ips))
+        for ip, latency in zip(cached.ips, latencies):
+            health = self._ip_health.setdefault(ip, IPHealth())
+            if latency is None:
+                health.record_failure()
+            else:
+                health.record_latency(latency)
+                health.record_success()
+        logger.info(
+            f"{hostname} IP延迟: "
+            + ", ".join(
+                f"{ip}={self._ip_health[ip].latency * 1000:.0f}ms"
+                if self._ip_health[ip].latency is not None else f"{ip}=不可用"
+                for ip in cached.ips
+            )
+        )
+    
+    def pick_ip(self, hostname: str) -> str:
+        """在健康的IP中按延迟加权随机选择一个，延迟越低被选中的概率越高"""
+        cached = self._resolved_hosts.get(hostname)
+        if not cached or not cached.ips:
+            raise RuntimeError(f"未找到 {hostname} 的IP地址")
+        
+        healthy = [ip for ip in cached.ips if self._ip_health.setdefault(ip, IPHealth()).healthy]
+        if not healthy:
+            # 全部不可用时，选择最早恢复的IP
+            return min(cached.ips, key=lambda ip: self._ip_health[ip].down_until)
+        if len(healthy) == 1:
+            return healthy[0]
+        
+        weights = [
+            1 / max(self._ip_health[ip].latency or self.DEFAULT_LATENCY, 0.001)
+            for ip in healthy
+        ]
+        return random.choices(healthy, weights=weights)[0]
+    
+    def report_success(self, ip: str):
+        """报告请求成功"""
+        self._ip_health.setdefault(ip, IPHealth()).record_success()
+    
+    def report_failure(self, ip: str):
+        """报告请求失败，该IP会立即被移出可用列表一段时间"""
+        health = self._ip_health.setdefault(ip, IPHealth())
+        health.record_failure()
+        logger.warning(f"IP {ip} 请求失败，暂停使用 {health.down_until - time.monotonic():.0f} 秒")
+    
+    def has_healthy_ip(self, hostname: str = API_HOST) -> bool:
+        """是否还有可用的IP"""
+        cached = self._resolved_hosts.get(hostname)
+        if not cached:
+            return False
+        return any(self._ip_health.setdefault(ip, IPHealth()).healthy for ip in cached.ips)
+    
     def get_discord_api_url(self, path: str = '') -> str:
         """获取Discord API的URL，使用解析后的IP"""
-        discord_ip = self._resolved_hosts.get('discord.com')
-        if discord_ip and not discord_ip.is_expired:
+        discord_host = self._resolved_hosts.get(self.API_HOST)
+        if discord_host and discord_host.ips and not discord_host.is_expired:
             # 使用IP但保持HTTPS和Host header
-            return f"https://{discord_ip.ip}{path}"
-        return f"https://discord.com{path}"
+            return f"https://{format_ip(self.pick_ip(self.API_HOST))}{path}"
+        return f"https://{self.API_HOST}{path}"
     
     @property
     def current_dns_server(self) -> str:
         """获取当前使用的DNS服务器"""
-        return self.TRUSTED_DNS_SERVERS[self._current_dns_index]
+        return self._current_dns_server
 
     def get_discord_ip(self) -> str:
-        """获取Discord的IP地址"""
+        """获取Discord的IP地址，在健康的IP之间分散请求"""
         if not self._resolved_hosts:
             raise RuntimeError("DNS解析尚未完成，请先调用resolve_discord_hosts()")
         
-        # 返回discord.com的IP地址
-        discord_host = self._resolved_hosts.get('discord.com')
-        if not discord_host:
-            raise RuntimeError("未找到Discord的IP地址")
-            
-        if isinstance(discord_host, ResolvedHost):
-            return discord_host.ip
-        return discord_host  # 如果已经是字符串形式的IP
+        return self.pick_ip(self.API_HOST)
         
     async def resolve_host(self, host: str) -> str:
         """解析单个主机名"""
-        for dns_server in self.TRUSTED_DNS_SERVERS:
-            try:
-                logging.info(f"使用DNS服务器: {dns_server}")
-                resolver = aiodns.DNSResolver(nameservers=[dns_server])
-                result = await resolver.query(host, 'A')
-                if result and result[0].host:
-                    ip = result[0].host
-                    logging.info(f"已解析 {host} -> {ip}")
-                    return ip
-            except Exception as e:
-                logging.warning(f"使用DNS服务器 {dns_server} 解析 {host} 失败: {str(e)}")
+        cached = self._resolved_hosts.get(host)
+        if cached and cached.ips and not cached.is_expired:
+            return cached.ips[0]
+        ips = await self._refresh_host(host)
+        if not ips:
+            raise RuntimeError(f"无法解析主机名: {host}")
+        return ips[0]
+    
+    async def prefetch(self, hostnames: List[str]) -> dict:
+        """并发预解析一组主机名，之后由后台任务按TTL刷新"""
+        hostnames = [h for h in dict.fromkeys(hostnames) if h and h not in self._resolved_hosts]
+        results = await asyncio.gather(*(self._refresh_host(hostname) for hostname in hostnames))
+        return {hostname: ips for hostname, ips in zip(hostnames, results) if ips}
+    
+    async def resolve(self, host: str, port: int = 0, family: int = socket.AF_INET) -> List[Dict]:
+        """aiohttp解析器接口，优先使用缓存，缓存中没有或已过期时才查询（并发的查询合并为一次）"""
+        cached = self._resolved_hosts.get(host)
+        if cached and cached.ips and not cached.is_expired:
+            ips = cached.ips
+        else:
+            ips = await self._refresh_host(host)
+        if not ips:
+            # 可信DNS服务器都失败时退回系统解析
+            return await self._resolve_with_system(host, port, family)
+        
+        hosts = []
+        for ip in ips:
+            ip_family = socket.AF_INET6 if ':' in ip else socket.AF_INET
+            if family not in (socket.AF_UNSPEC, ip_family):
                 continue
-        raise RuntimeError(f"无法解析主机名: {host}")
+            hosts.append({
+                'hostname': host,
+                'host': ip,
+                'port': port,
+                'family': ip_family,
+                'proto': 0,
+                'flags': socket.AI_NUMERICHOST | socket.AI_NUMERICSERV,
+            })
+        if not hosts:
+            raise OSError(f"DNS lookup failed: {host}")
+        return hosts
+    
+    async def _resolve_with_system(self, host: str, port: int, family: int) -> List[Dict]:
+        """使用系统解析器解析"""
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM, family=family)
+        # 系统解析拿不到TTL，按默认TTL缓存
+        self._cache_ips(host, list(dict.fromkeys(address[0] for *_, address in infos)), ResolvedHost.ttl)
+        return [
+            {
+                'hostname': host,
+                'host': address[0],
+                'port': address[1],
+                'family': info_family,
+                'proto': proto,
+                'flags': socket.AI_NUMERICHOST | socket.AI_NUMERICSERV,
+            }
+            for info_family, _, proto, _, address in infos
+        ]
+    
+    async def close(self) -> None:
+        """全局共享的解析器，不随connector关闭"""
+
+def format_ip(ip: str) -> str:
+    """格式化IP用于URL，IPv6地址需要加方括号"""
+    return f"[{ip}]" if ':' in ip else ip
 
 # 创建全局实例
 dns_resolver = DNSResolver() 
\ No newline at end of file
@@ -0,0 +1,30 @@
+import re
+
+ZH = 'zh'
+EN = 'en'
+
+# 按连续的字符段匹配，findall返回的段数远少于字符数
+CJK_RUN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+')
+LATIN_WORD = re.compile(r'[A-Za-z]+')
+# 平均两个汉字算一个词，与英文单词数比较
+CJK_CHARS_PER_WORD = 2
+# 中文词占比达到这个值时认为是中文
+ZH_RATIO = 0.3
+
+def detect(text: str) -> str:
+    """按汉字与英文单词的比例判断文本是中文还是英文
+
+    英文文章里出现一个中文人名不算中文；中文文章里夹杂英文术语仍然是中文。
+    """
+    runs = CJK_RUN.findall(text)
+    if not runs:
+        return EN
+    cjk_words = sum(map(len, runs)) / CJK_CHARS_PER_WORD
+    latin_words = len(LATIN_WORD.findall(text))
+    return ZH if cjk_words >= (cjk_words + latin_words) * ZH_RATIO else EN
+
+def entry_language(entry) -> str:
+    """整篇文章（标题和摘要）只判断一次，结果缓存在entry.lang中供之后的阶段使用"""
+    if entry.lang is None:
+        entry.lang = detect(f"{entry.title}\n{entry.summary}")
+    return entry.lang
@@ -0,0 +1,91 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+from typing import Dict, Optional
+
+DEFAULT_FORMAT = '%(asctime)s %(levelname)-8s [%(name)s] %(message)s'
+DEFAULT_DATEFMT = '%Y-%m-%d %H:%M:%S'
+
+# 未在配置中指定时各模块的默认级别，第三方库的调试日志量很大
+DEFAULT_LEVELS = {
+    'discord': 'WARNING',
+    'aiohttp': 'WARNING',
+    'asyncio': 'WARNING',
+}
+
+class JsonFormatter(logging.Formatter):
+    """每条日志输出为一行JSON，方便用工具检索"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'time': self.formatTime(record, self.datefmt),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+class RawQueueHandler(logging.handlers.QueueHandler):
+    """把原始日志记录放进队列，消息合并参数和异常堆栈都留给后台线程格式化
+
+    QueueHandler默认的prepare()会在调用方线程格式化消息和异常堆栈，队列只在本进程内使用，
+    不需要把记录变成可序列化的形式。参数在后台线程才合并进消息，记录日志后不要再修改传入的可变对象。
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def setup_logging(log_config: Optional[Dict] = None) -> logging.handlers.QueueListener:
+    """按config.json的logging配置日志
+
+    事件循环中只把原始日志记录放进队列，格式化（包括异常堆栈）和写入由后台线程完成。
+    配置项：
+        level: 根日志级别，默认INFO
+        levels: 按模块名设置级别，例如 {"rss_sources": "DEBUG", "dns_resolver": "WARNING"}
+        format: "text"（默认）或 "json"
+        file: 额外写入的日志文件
+    """
+    global _listener
+    log_config = log_config or {}
+    if _listener is not None:
+        _listener.stop()
+
+    if log_config.get('format') == 'json':
+        formatter = JsonFormatter(datefmt=DEFAULT_DATEFMT)
+    else:
+        formatter = logging.Formatter(DEFAULT_FORMAT, datefmt=DEFAULT_DATEFMT)
+    handlers = [logging.StreamHandler()]
+    if log_config.get('file'):
+        handlers.append(logging.FileHandler(log_config['file'], encoding='utf-8'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(RawQueueHandler(log_queue))
+    root.setLevel(log_config.get('level', 'INFO').upper())
+
+    levels = dict(DEFAULT_LEVELS)
+    levels.update(log_config.get('levels', {}))
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+def stop_logging():
+    """写完队列中剩余的日志"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
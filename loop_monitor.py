@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Dict, Optional
+import metrics
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG_SECONDS = metrics.registry.histogram(
+    'event_loop_lag_seconds', '事件循环心跳的延迟（秒）',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+LOOP_LAG_QUANTILE = metrics.registry.gauge(
+    'event_loop_lag_quantile_seconds', '最近心跳延迟的分位数（秒）', ['quantile'])
+LOOP_BLOCKED = metrics.registry.counter('event_loop_blocked_total', '事件循环阻塞超过阈值的次数')
+
+class LoopLagMonitor:
+    """测量事件循环延迟，阻塞超过阈值时由看门狗线程抓取事件循环线程的调用栈
+
+    心跳协程每隔interval醒来一次，实际醒来的时间比预期晚多少就是延迟。
+    看门狗线程发现心跳长时间没有更新时，用sys._current_frames()取得事件循环线程
+    正在执行的代码，此时阻塞还没有结束，抓到的就是阻塞的位置。
+    """
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.25, window: int = 3000):
+        self.interval = interval
+        self.threshold = threshold
+        self.samples = deque(maxlen=window)
+        self.blocked = 0
+        self.max_lag = 0.0
+        self._last_beat = 0.0
+        self._captured_beat = 0.0
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        """在事件循环中调用，启动心跳和看门狗"""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat(), name='loop-lag-heartbeat')
+        self._thread = threading.Thread(target=self._watchdog, name='loop-lag-watchdog', daemon=True)
+        self._thread.start()
+        metrics.registry.add_collector(self.collect_metrics)
+        logger.info(f"事件循环延迟监控已启动，阈值 {self.threshold * 1000:.0f}ms")
+
+    async def stop(self):
+        """停止监控"""
+        if not self.running:
+            return
+        self._stop.set()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        metrics.registry.remove_collector(self.collect_metrics)
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - expected)
+            self.samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            LOOP_LAG_SECONDS.observe(lag)
+            if lag >= self.threshold:
+                self.blocked += 1
+                LOOP_BLOCKED.inc()
+                logger.warning("事件循环阻塞了 %.0fms", lag * 1000)
+
+    def _watchdog(self):
+        while not self._stop.wait(self.threshold / 2):
+            beat = self._last_beat
+            if beat == self._captured_beat:
+                # 这次阻塞已经抓取过调用栈
+                continue
+            stalled = time.monotonic() - beat - self.interval
+            if stalled < self.threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._captured_beat = beat
+            stack = ''.join(traceback.format_stack(frame))
+            logger.warning("事件循环已阻塞 %.0fms，正在执行：\n%s", stalled * 1000, stack)
+
+    def percentiles(self) -> Dict[str, float]:
+        """最近心跳延迟的分位数（秒）"""
+        if not self.samples:
+            return {}
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return {name: ordered[round(q * last)] for name, q in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99))}
+
+    def collect_metrics(self):
+        quantiles = {'p50': '0.5', 'p90': '0.9', 'p99': '0.99'}
+        for name, value in self.percentiles().items():
+            LOOP_LAG_QUANTILE.set(value, quantile=quantiles[name])
+
+    def summary(self, reset: bool = False) -> str:
+        """生成一行延迟统计，reset为True时清空样本（每轮统计一次）"""
+        stats = self.percentiles()
+        line = (f"事件循环延迟：p50={stats.get('p50', 0) * 1000:.1f}ms p90={stats.get('p90', 0) * 1000:.1f}ms "
+                f"p99={stats.get('p99', 0) * 1000:.1f}ms 最大={self.max_lag * 1000:.1f}ms 阻塞次数={self.blocked}")
+        if reset:
+            self.samples.clear()
+            self.max_lag = 0.0
+            self.blocked = 0
+        return line
+
+loop_monitor = LoopLagMonitor()
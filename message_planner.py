@@ -0,0 +1,53 @@
+import re
+from typing import List
+
+# Discord单条消息的字符上限
+MESSAGE_LIMIT = 2000
+# 标题过长时截断到这个长度
+TITLE_LIMIT = 256
+# 截断时至少保留的比例，句子边界离上限太远时改为在单词边界截断
+MIN_KEEP = 0.5
+ELLIPSIS = '…'
+
+# 句子结尾：英文标点后面跟空白（允许引号、括号），中文标点后面可以直接接下一句
+SENTENCE_END = re.compile(r'[.!?]+["\'”’)）]*(?=\s)|[。！？]+["\'”’)）]*')
+
+def cut_at_sentence(text: str, limit: int) -> str:
+    """截断到不超过limit个字符，尽量在句子结尾处截断，其次在空白处截断并加上省略号"""
+    if len(text) <= limit:
+        return text
+    if limit <= 0:
+        return ''
+    # 多看一个字符，判断上限处的标点后面是不是空白
+    ends = [m.end() for m in SENTENCE_END.finditer(text, 0, limit + 1) if m.end() <= limit]
+    if ends and ends[-1] >= limit * MIN_KEEP:
+        return text[:ends[-1]]
+    head = text[:limit - 1]
+    space = head.rfind(' ')
+    if space >= limit * MIN_KEEP:
+        head = head[:space]
+    return head.rstrip() + ELLIPSIS
+
+def split_sentences(text: str, max_length: int) -> List[str]:
+    """按句子把文本分成不超过max_length的块，单个句子过长时才从中间切开"""
+    chunks = []
+    while len(text) > max_length:
+        chunk = cut_at_sentence(text, max_length)
+        if chunk.endswith(ELLIPSIS):
+            # 找不到句子边界，在空白处或直接切开，翻译时不加省略号
+            chunk = chunk[:-1].rstrip() or text[:max_length]
+        chunks.append(chunk)
+        text = text[len(chunk):].lstrip()
+    if text:
+        chunks.append(text)
+    return chunks
+
+def plan_summary(title: str, summary: str, link: str, title_translated: bool) -> str:
+    """在翻译之前按消息的布局算出摘要可用的字符数，截断原文
+
+    译文按与原文相同的长度预留；英文翻译成中文后通常更短，渲染时再按实际长度检查一次。
+    """
+    fixed = len(f"**{title}**\n\n") + len(f"链接: {link}") + len('\n\n')
+    if title_translated:
+        fixed += len(title) + len('\n')
+    return cut_at_sentence(summary, MESSAGE_LIMIT - fixed)
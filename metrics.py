@@ -0,0 +1,213 @@
+import bisect
+import logging
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 默认的耗时分桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric:
+    """指标基类，按标签值分别计数"""
+    TYPE = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def clear(self):
+        self._values.clear()
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        lines.extend(self.samples())
+        return lines
+
+class Counter(Metric):
+    """只增不减的计数器"""
+    TYPE = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+class Gauge(Metric):
+    """可增可减的当前值"""
+    TYPE = 'gauge'
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+class Histogram(Metric):
+    """分桶统计耗时等分布"""
+    TYPE = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        data = self._values.get(key)
+        if data is None:
+            # [各桶计数(最后一个是+Inf), 总和]
+            data = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        data[0][bisect.bisect_left(self.buckets, value)] += 1
+        data[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """统计with块的耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        data = self._values.get(self._key(labels))
+        return sum(data[0]) if data else 0
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(float(bound))}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class Registry:
+    """指标注册表，按Prometheus文本格式导出"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        # 导出前调用的回调，用于采集队列长度等只在导出时才需要的值
+        self._collectors: List[Callable[[], None]] = []
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, *args, **kwargs)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets)
+
+    def add_collector(self, collector: Callable[[], None]):
+        self._collectors.append(collector)
+
+    def remove_collector(self, collector: Callable[[], None]):
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def render(self) -> str:
+        """生成Prometheus文本格式"""
+        for collector in list(self._collectors):
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"采集指标出错: {str(e)}")
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+registry = Registry()
+
+# RSS抓取
+FETCH_SECONDS = registry.histogram('rss_fetch_seconds', 'RSS下载耗时（秒）', ['source'])
+FETCH_BYTES = registry.counter('rss_fetch_bytes_total', 'RSS下载的字节数', ['source'])
+FETCH_RESPONSES = registry.counter('rss_fetch_responses_total', 'RSS请求的HTTP状态码', ['source', 'status'])
+FETCH_NOT_MODIFIED = registry.counter('rss_fetch_not_modified_total', 'RSS返回304的次数', ['source'])
+FETCH_UNCHANGED = registry.counter('rss_fetch_unchanged_total', 'RSS内容与上次相同的次数', ['source'])
+FETCH_ERRORS = registry.counter('rss_fetch_errors_total', 'RSS下载失败次数', ['source'])
+FETCH_TOO_LARGE = registry.counter('rss_fetch_too_large_total', 'RSS响应超过大小上限被放弃的次数', ['source'])
+COALESCED = registry.counter('rss_coalesced_total', '与其他源共用下载或解析结果的次数', ['source', 'stage'])
+# 解析和清理
+PARSE_SECONDS = registry.histogram('rss_parse_seconds', 'feedparser解析耗时（秒）', ['source'])
+CLEAN_SECONDS = registry.histogram('rss_clean_seconds', 'parse_entry清理文章耗时（秒）', ['source'])
+ENTRIES = registry.counter('rss_entries_total', '文章去重结果（new/duplicate/expired/unrouted）', ['source', 'result'])
+DEDUP_HIT_RATIO = registry.gauge('rss_dedup_hit_ratio', '上一轮重复文章占比')
+# 翻译
+TRANSLATE_SECONDS = registry.histogram('translate_seconds', '单次翻译请求耗时（秒）')
+TRANSLATE_ERRORS = registry.counter('translate_errors_total', '翻译失败次数', ['reason'])
+SUMMARY_TRUNCATED = registry.counter('rss_summary_truncated_total', '翻译前按消息长度上限截断摘要的次数', ['source'])
+# Discord发送
+SEND_SECONDS = registry.histogram('discord_send_seconds', '发送一条Discord消息的耗时（秒）')
+SEND_ERRORS = registry.counter('discord_send_errors_total', 'Discord发送失败次数')
+RATE_LIMITED = registry.counter('discord_rate_limited_total', 'Discord返回429的次数')
+# 流水线
+STAGE_SECONDS = registry.histogram('pipeline_stage_seconds', '流水线各阶段处理单个条目的耗时（秒）', ['stage'])
+QUEUE_DEPTH = registry.gauge('pipeline_queue_depth', '流水线各阶段当前的队列长度', ['stage'])
+ROUND_SECONDS = registry.gauge('rss_round_seconds', '上一轮RSS处理的耗时（秒）')
+# 配置热加载
+CONFIG_RELOAD_ERRORS = registry.counter('rss_config_reload_errors_total', '配置变更时创建或重建RSS源失败的次数', ['source'])
+
+async def start_metrics_server(port: int, host: str = '127.0.0.1'):
+    """启动 /metrics HTTP端点，返回runner，退出时调用runner.cleanup()"""
+    from aiohttp import web
+
+    async def handle_metrics(request):
+        return web.Response(text=registry.render(), content_type='text/plain', charset='utf-8')
+
+    app = web.Application()
+    app.router.add_get('/metrics', handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    logger.info(f"指标端点已启动: http://{host}:{port}/metrics")
+    return runner
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable, List, Optional
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# 阶段处理函数：接收一个条目，返回要交给下一阶段的条目（None表示丢弃）
+StageHandler = Callable[[Any], Awaitable[Optional[Iterable[Any]]]]
+# 处理出错时的回调：接收出错的条目和异常
+ErrorHandler = Callable[[Any, Exception], None]
+
+@dataclass
+class StageStats:
+    """单个阶段的统计信息"""
+    processed: int = 0
+    emitted: int = 0
+    errors: int = 0
+    busy_time: float = 0.0  # 处理耗时总和（秒）
+    max_latency: float = 0.0
+    max_queue_depth: int = 0
+
+    @property
+    def avg_latency(self) -> float:
+        return self.busy_time / self.processed if self.processed else 0.0
+
+class Stage:
+    """流水线中的一个阶段，拥有自己的有界队列和worker"""
+
+    def __init__(self, name: str, handler: StageHandler, workers: int = 1, queue_size: int = 100,
+                 on_error: Optional[ErrorHandler] = None):
+        self.name = name
+        self.handler = handler
+        self.on_error = on_error
+        self.workers = max(1, workers)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.stats = StageStats()
+        self.next_stage: Optional['Stage'] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self, next_stage: Optional['Stage'] = None):
+        """启动worker"""
+        self.next_stage = next_stage
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"stage-{self.name}-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def put(self, item: Any):
+        """放入条目，队列满时等待（背压）"""
+        await self.queue.put(item)
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, self.queue.qsize())
+
+    async def stop(self):
+        """停止所有worker"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self):
+        while True:
+            item = await self.queue.get()
+            start = time.monotonic()
+            try:
+                results = await self.handler(item)
+                elapsed = time.monotonic() - start
+                self.stats.processed += 1
+                self.stats.busy_time += elapsed
+                self.stats.max_latency = max(self.stats.max_latency, elapsed)
+                metrics.STAGE_SECONDS.observe(elapsed, stage=self.name)
+                if results is not None and self.next_stage is not None:
+                    for result in results:
+                        self.stats.emitted += 1
+                        await self.next_stage.put(result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats.errors += 1
+                logger.error(f"流水线阶段 {self.name} 处理出错: {str(e)}", exc_info=True)
+                if self.on_error is not None:
+                    try:
+                        self.on_error(item, e)
+                    except Exception:
+                        logger.exception(f"流水线阶段 {self.name} 的出错回调失败")
+            finally:
+                self.queue.task_done()
+
+class Pipeline:
+    """由有界队列串联的多阶段流水线，慢的阶段只会限制自己"""
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = stages
+
+    def start(self):
+        """启动所有阶段"""
+        for stage, next_stage in zip(self.stages, self.stages[1:] + [None]):
+            stage.start(next_stage)
+
+    async def submit(self, item: Any):
+        """向第一个阶段提交条目"""
+        await self.stages[0].put(item)
+
+    async def submit_to(self, name: str, item: Any):
+        """向指定的阶段提交条目，跳过之前的阶段"""
+        for stage in self.stages:
+            if stage.name == name:
+                await stage.put(item)
+                return
+        raise KeyError(name)
+
+    async def drain(self, on_stage_done: Optional[Callable[[str], None]] = None):
+        """等待已提交的条目全部处理完毕，on_stage_done在每个阶段处理完时回调"""
+        # 上游阶段的task_done在向下游put之后才调用，依次join即可
+        for stage in self.stages:
+            await stage.queue.join()
+            if on_stage_done is not None:
+                on_stage_done(stage.name)
+
+    async def stop(self):
+        """停止流水线"""
+        for stage in self.stages:
+            await stage.stop()
+
+    def collect_metrics(self):
+        """导出指标时记录各阶段当前的队列长度"""
+        for stage in self.stages:
+            metrics.QUEUE_DEPTH.set(stage.queue.qsize(), stage=stage.name)
+
+    def reset_stats(self):
+        """重置各阶段统计"""
+        for stage in self.stages:
+            stage.stats = StageStats()
+
+    def report(self, elapsed: float) -> List[str]:
+        """生成各阶段吞吐量和延迟报告"""
+        lines = []
+        for stage in self.stages:
+            stats = stage.stats
+            throughput = stats.processed / elapsed if elapsed > 0 else 0.0
+            lines.append(
+                f"- [{stage.name}] workers={stage.workers} 处理={stats.processed} 输出={stats.emitted} "
+                f"错误={stats.errors} 吞吐={throughput:.2f}/s 平均延迟={stats.avg_latency * 1000:.0f}ms "
+                f"最大延迟={stats.max_latency * 1000:.0f}ms 最大队列={stats.max_queue_depth}"
+            )
+        return lines
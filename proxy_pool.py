@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import ssl
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Set
+from urllib.parse import urlparse
+import aiohttp
+import certifi
+import metrics
+from dns_resolver import dns_resolver
+
+logger = logging.getLogger(__name__)
+
+PROXY_HEALTHY = metrics.registry.gauge('rss_proxy_healthy', '代理是否健康（1/0）', ['proxy'])
+PROXY_LATENCY = metrics.registry.gauge('rss_proxy_latency_seconds', '代理的平滑延迟（秒）', ['proxy'])
+PROXY_REQUESTS = metrics.registry.counter('rss_proxy_requests_total', '经过代理的请求数', ['proxy', 'result'])
+
+# 在配置的代理列表中表示直连
+DIRECT = 'direct'
+
+class Proxy:
+    """代理池中的一个代理，每个代理有独立的会话和连接池"""
+    # 延迟的平滑系数
+    ALPHA = 0.3
+    # 还没有测量过延迟时使用的值（秒），估计得乐观一些，新代理会先被选中测量
+    DEFAULT_LATENCY = 0.05
+
+    def __init__(self, url: Optional[str]):
+        self.url = url  # None表示直连
+        parsed = urlparse(url) if url else None
+        # 日志和指标中不显示用户名密码
+        self.name = f"{parsed.hostname}:{parsed.port}" if parsed else DIRECT
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.healthy = True
+        self.latency: Optional[float] = None
+        self.failures = 0  # 连续失败次数
+        self.in_flight = 0
+
+    def get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                ssl=ssl.create_default_context(cafile=certifi.where()),
+                resolver=dns_resolver,
+                use_dns_cache=False,  # 由dns_resolver负责缓存
+                enable_cleanup_closed=True,
+                limit=50,
+                limit_per_host=10
+            )
+            self.session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=30))
+        return self.session
+
+    def score(self) -> float:
+        """越小越好：平滑延迟，按进行中的请求数和连续失败次数加权"""
+        latency = self.latency if self.latency is not None else self.DEFAULT_LATENCY
+        return latency * (1 + self.in_flight) * 2 ** min(self.failures, 5)
+
+    def record_success(self, latency: float):
+        self.latency = latency if self.latency is None else self.ALPHA * latency + (1 - self.ALPHA) * self.latency
+        self.failures = 0
+        if not self.healthy:
+            logger.info("代理 %s 已恢复", self.name)
+        self.healthy = True
+
+    def record_failure(self, unreachable: bool = False):
+        """unreachable为True表示连不上代理本身，立即标记为不可用，等健康检查恢复"""
+        self.failures += 1
+        if unreachable and self.healthy:
+            logger.warning("代理 %s 无法连接，暂停使用", self.name)
+            self.healthy = False
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+class ProxyPool:
+    """代理池：按延迟和负载选择代理，代理出错时换下一个重试，后台定期做健康检查
+
+    没有配置代理时只有一个直连的成员，行为与直接使用一个会话相同。
+    """
+    # 这些错误发生在收到响应之前，换一个代理重试是安全的
+    RETRY_ERRORS = (aiohttp.ClientConnectionError, aiohttp.ClientHttpProxyError, asyncio.TimeoutError)
+
+    def __init__(self):
+        self.proxies: List[Proxy] = []
+        self.max_attempts = 2
+        self.health_url = 'https://www.gstatic.com/generate_204'
+        self.health_interval = 60.0
+        self.health_timeout = 5.0
+        self._health_task: Optional[asyncio.Task] = None
+
+    def configure(self, urls: List[str], max_attempts: int = 2, health_url: Optional[str] = None,
+                  health_interval: float = 60, health_timeout: float = 5):
+        """设置代理列表，列表中的 "direct" 表示直连；列表为空时直连"""
+        self.proxies = [Proxy(None if url == DIRECT else url) for url in urls] or [Proxy(None)]
+        self.max_attempts = max(1, max_attempts)
+        if health_url:
+            self.health_url = health_url
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        logger.info("代理池: %s", ', '.join(proxy.name for proxy in self.proxies))
+
+    @property
+    def uses_proxies(self) -> bool:
+        return any(proxy.url for proxy in self.proxies)
+
+    def choose(self, exclude: Set[Proxy] = frozenset()) -> Optional[Proxy]:
+        """选择得分最低的健康代理；全部不健康时仍从中选择，总比不请求好"""
+        if not self.proxies:
+            self.proxies = [Proxy(None)]
+        candidates = [proxy for proxy in self.proxies if proxy not in exclude]
+        healthy = [proxy for proxy in candidates if proxy.healthy]
+        candidates = healthy or candidates
+        if not candidates:
+            return None
+        return min(candidates, key=Proxy.score)
+
+    def get(self, url: str, **kwargs):
+        """经过代理发送GET请求"""
+        return self.request('GET', url, **kwargs)
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs) -> AsyncIterator[aiohttp.ClientResponse]:
+        """经过代理发送请求；连接代理失败或超时时换一个代理重试，收到响应后不再重试"""
+        tried: Set[Proxy] = set()
+        while True:
+            proxy = self.choose(tried)
+            tried.add(proxy)
+            start = time.perf_counter()
+            proxy.in_flight += 1
+            try:
+                response = await proxy.get_session().request(method, url, proxy=proxy.url, **kwargs)
+            except self.RETRY_ERRORS as e:
+                proxy.in_flight -= 1
+                proxy.record_failure(unreachable=isinstance(e, aiohttp.ClientProxyConnectionError))
+                PROXY_REQUESTS.inc(proxy=proxy.name, result='error')
+                if len(tried) >= min(self.max_attempts, len(self.proxies)):
+                    raise
+                logger.warning("通过代理 %s 请求 %s 失败: %r，换一个代理重试", proxy.name, url, e)
+                continue
+            except BaseException:
+                proxy.in_flight -= 1
+                raise
+            # 以收到响应头的时间作为延迟
+            proxy.record_success(time.perf_counter() - start)
+            PROXY_REQUESTS.inc(proxy=proxy.name, result='ok')
+            try:
+                yield response
+            finally:
+                response.release()
+                proxy.in_flight -= 1
+            return
+
+    async def check(self, proxy: Proxy):
+        """请求health_url检查代理是否可用"""
+        start = time.perf_counter()
+        try:
+            async with proxy.get_session().get(self.health_url, proxy=proxy.url,
+                                               timeout=aiohttp.ClientTimeout(total=self.health_timeout)) as response:
+                if response.status >= 500:
+                    raise aiohttp.ClientResponseError(response.request_info, (), status=response.status)
+            proxy.record_success(time.perf_counter() - start)
+        except Exception as e:
+            if proxy.healthy:
+                logger.warning("代理 %s 健康检查失败: %r", proxy.name, e)
+            proxy.failures += 1
+            proxy.healthy = False
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.gather(*(self.check(proxy) for proxy in self.proxies if proxy.url))
+            await asyncio.sleep(self.health_interval)
+
+    def start_health_checks(self):
+        """启动后台健康检查，只有配置了代理时才需要"""
+        if self.uses_proxies and (self._health_task is None or self._health_task.done()):
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop_health_checks(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+    async def close(self):
+        """停止健康检查并关闭所有代理的会话"""
+        await self.stop_health_checks()
+        for proxy in self.proxies:
+            await proxy.close()
+
+    def summary(self) -> List[str]:
+        lines = []
+        for proxy in self.proxies:
+            latency = f"{proxy.latency * 1000:.0f}ms" if proxy.latency is not None else '-'
+            lines.append(f"{proxy.name}: {'正常' if proxy.healthy else '不可用'} 延迟={latency} "
+                         f"连续失败={proxy.failures}")
+        return lines
+
+    def collect_metrics(self):
+        for proxy in self.proxies:
+            PROXY_HEALTHY.set(1 if proxy.healthy else 0, proxy=proxy.name)
+            if proxy.latency is not None:
+                PROXY_LATENCY.set(proxy.latency, proxy=proxy.name)
+
+proxy_pool = ProxyPool()
+metrics.registry.add_collector(proxy_pool.collect_metrics)
@@ -1,2 +1,3 @@
 from .base import BaseRSSSource
-from .config import RSSConfig 
\ No newline at end of file
+from .config import RSSConfig 
+from .entry import ParsedEntry
@@ -1,18 +1,44 @@
 import aiohttp
-import feedparser
 from datetime import datetime
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, TYPE_CHECKING
 import logging
 import asyncio
-from bs4 import BeautifulSoup, CData
+import codecs
 import html
 import json
 import os
 import hashlib
+import time
 from pathlib import Path
 import re
-import ssl
-import certifi
+from state_store import StateStore, StoreHistory
+import metrics
+from tracing import tracer
+from circuit_breaker import breakers
+from proxy_pool import proxy_pool
+from urllib.parse import urlparse
+from .entry import ParsedEntry
+from .recorder import ResponseRecorder
+from .coalescer import SharedResponse, fetch_coalescer, fetch_key
+
+if TYPE_CHECKING:
+    import feedparser
+
+logger = logging.getLogger(__name__)
+
+# aiohttp装了brotli（或brotlicffi）才能解压br
+try:
+    import brotlicffi  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotli  # noqa: F401
+        ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        ACCEPT_ENCODING = 'gzip, deflate'
+
+class FeedParseError(ValueError):
+    """内容不是有效的RSS（例如错误页面），解析不出任何文章"""
 
 class BaseRSSSource:
     # 文章历史记录文件
@@ -21,34 +47,74 @@ class BaseRSSSource:
     HISTORY_KEEP_DAYS = 7
     # 共享的历史记录
     _shared_history = {}
+    # 多进程模式下共享的状态存储，设置后历史记录读写都走数据库
+    _store: Optional[StateStore] = None
+    # 设置后把每次获取到的新内容录制到磁盘，供重放使用
+    _recorder: Optional[ResponseRecorder] = None
+    # 默认请求头
+    DEFAULT_HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Accept': 'application/rss+xml, application/xml, application/atom+xml, application/json, text/xml',
+        'Accept-Encoding': ACCEPT_ENCODING
+    }
+    # 响应体（解压后）的默认大小上限，超过时放弃本次下载；可在config.json中按源设置max_bytes
+    MAX_BYTES = 5 * 1024 * 1024
+    # 分块读取响应体的块大小
+    CHUNK_SIZE = 64 * 1024
+    @classmethod
+    async def close_session(cls):
+        """关闭代理池的会话，RSS请求都经过代理池发送"""
+        await proxy_pool.close()
+    
+    @classmethod
+    def use_store(cls, store: StateStore):
+        """改用StateStore保存历史记录，供多个进程共享"""
+        BaseRSSSource._store = store
+        BaseRSSSource._shared_history = StoreHistory(store)
+    
+    @classmethod
+    def use_memory_history(cls):
+        """历史记录只保存在内存中，不读写文件（重放模式使用）"""
+        BaseRSSSource.HISTORY_FILE = None
+        BaseRSSSource._shared_history = {}
+    
+    @classmethod
+    def use_recorder(cls, recorder: Optional[ResponseRecorder]):
+        """录制获取到的原始响应，传入None停止录制"""
+        BaseRSSSource._recorder = recorder
     
     @classmethod
     def load_history(cls):
         """加载文章历史记录"""
         try:
-            if not cls._shared_history:
+            if BaseRSSSource._store is not None or cls.HISTORY_FILE is None:
+                return BaseRSSSource._shared_history
+            if not BaseRSSSource._shared_history:
                 if os.path.exists(cls.HISTORY_FILE):
                     with open(cls.HISTORY_FILE, 'r', encoding='utf-8') as f:
-                        cls._shared_history = json.load(f)
+                        BaseRSSSource._shared_history = json.load(f)
                 else:
-                    cls._shared_history = {}
-            return cls._shared_history
+                    BaseRSSSource._shared_history = {}
+            return BaseRSSSource._shared_history
         except Exception as e:
-            logging.error(f"加载历史记录出错: {str(e)}")
+            logger.error("加载历史记录出错: %s", e)
             return {}
             
     @classmethod
     def save_history(cls, history: Dict = None):
         """保存文章历史记录"""
+        if BaseRSSSource._store is not None or cls.HISTORY_FILE is None:
+            # 数据库模式下每次写入都会立即持久化，内存模式下不保存
+            return
         try:
-            if history is not None:
-                cls._shared_history.update(history)
+            if history is not None and history is not BaseRSSSource._shared_history:
+                BaseRSSSource._shared_history.update(history)
             # 创建目录（如果不存在）
             Path(cls.HISTORY_FILE).parent.mkdir(parents=True, exist_ok=True)
             with open(cls.HISTORY_FILE, 'w', encoding='utf-8') as f:
-                json.dump(cls._shared_history, f, ensure_ascii=False, indent=2)
+                json.dump(BaseRSSSource._shared_history, f, ensure_ascii=False, indent=2)
         except Exception as e:
-            logging.error(f"保存历史记录出错: {str(e)}")
+            logger.error("保存历史记录出错: %s", e)
             
     @classmethod
     def clean_history(cls):
@@ -59,112 +125,57 @@ class BaseRSSSource:
             # 保留7天内的记录
             cutoff = now - (cls.HISTORY_KEEP_DAYS * 24 * 3600)
             
-            old_count = len(history)
-            history = {k: v for k, v in history.items() 
-                      if v.get('timestamp', 0) > cutoff}
-            new_count = len(history)
+            if BaseRSSSource._store is not None:
+                removed = BaseRSSSource._store.clean_history(cutoff)
+                if removed:
+                    logger.info("清理了 %d 条过期记录", removed)
+                return history
             
-            if old_count != new_count:
-                logging.info(f"清理了 {old_count - new_count} 条过期记录")
-                cls._shared_history = history
+            expired = [k for k, v in history.items() if v.get('timestamp', 0) <= cutoff]
+            if expired:
+                # 原地删除，所有RSS源持有的都是同一个字典
+                for k in expired:
+                    del history[k]
+                logger.info("清理了 %d 条过期记录", len(expired))
                 cls.save_history()
                 
             return history
         except Exception as e:
-            logging.error(f"清理历史记录出错: {str(e)}")
+            logger.error("清理历史记录出错: %s", e)
             return {}
 
     def __init__(self, url: str, channel_ids: List[str]):
         self.url = url
+        self.host = urlparse(url).hostname
         self.channel_ids = channel_ids  # 支持多个频道ID
         self.name = self.__class__.__name__
-        logging.info(f"初始化RSS源: {self.name} - {self.url}")
+        # config.json中的键，由加载器设置
+        self.key = self.name
+        logger.debug("初始化RSS源: %s - %s", self.name, self.url)
         self.last_fetch_time = None
-        self.logger = logging.getLogger(self.name)
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'application/rss+xml, application/xml, application/atom+xml, application/json, text/xml'
-        }
-        # 使用共享的历史记录
-        self.history = self.clean_history()
+        # 按模块命名，可以在config.json的logging.levels中按模块调整级别
+        self.logger = logging.getLogger(self.__class__.__module__)
+        self.headers = dict(self.DEFAULT_HEADERS)
+        self.max_bytes = self.MAX_BYTES
+        # 条件请求和内容摘要，用于跳过没有变化的RSS
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.content_hash: Optional[str] = None
+        # 与其他源共用下载得到的内容，解析时据此共用解析结果
+        self.shared_content: Optional[str] = None
+        # 使用共享的历史记录，过期记录由加载器在启动时统一清理一次
+        self.history = self.load_history()
         
     def get_headers(self) -> Dict:
         """获取请求头，子类可以重写"""
         return self.headers
         
-    async def fetch(self) -> Optional[feedparser.FeedParserDict]:
-        """获取RSS内容"""
-        try:
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.logger.debug(f"[{self.name}] 开始获取RSS: {self.url}")
-            self.logger.debug(f"[{self.name}] 使用代理: {os.environ.get('HTTP_PROXY')}")
-            
-            # 创建SSL上下文
-            ssl_context = ssl.create_default_context(cafile=certifi.where())
-            
-            # 创建connector
-            connector = aiohttp.TCPConnector(
-                ssl=ssl_context,
-                force_close=True,
-                enable_cleanup_closed=True,
-                limit=10,
-                ttl_dns_cache=300
-            )
-            
-            async with aiohttp.ClientSession(
-                timeout=timeout,
-                connector=connector,
-                trust_env=True
-            ) as session:
-                headers = self.get_headers()
-                self.logger.debug(f"[{self.name}] 请求头: {headers}")
-                
-                try:
-                    self.logger.debug(f"[{self.name}] 开始发送请求...")
-                    async with session.get(
-                        self.url,
-                        headers=headers,
-                        proxy=os.environ.get('HTTP_PROXY')
-                    ) as response:
-                        self.logger.debug(f"[{self.name}] 收到响应: status={response.status}")
-                        
-                        if response.status != 200:
-                            await self.handle_error(f"HTTP error {response.status}")
-                            return None
-                            
-                        content = await response.text()
-                        self.logger.debug(f"[{self.name}] 成功获取内容，长度: {len(content)}")
-                        
-                        # 尝试修复常见的XML问题
-                        content = self.clean_xml(content)
-                        
-                        # 使用正确的解析器
-                        self.logger.debug(f"[{self.name}] 开始解析RSS内容...")
-                        feed = feedparser.parse(content, sanitize_html=True)
-                        
-                        if feed.bozo and feed.bozo_exception:  # feedparser解析错误标志
-                            await self.handle_error(f"Parse error: {feed.bozo_exception}")
-                            return None
-                            
-                        self.last_fetch_time = datetime.now()
-                        self.logger.debug(f"[{self.name}] RSS解析完成，条目数: {len(feed.entries) if hasattr(feed, 'entries') else 0}")
-                        return feed
-                except aiohttp.ClientError as e:
-                    self.logger.error(f"[{self.name}] 请求错误: {str(e)}", exc_info=True)
-                    await self.handle_error(f"Request error: {str(e)}")
-                    return None
-                    
-        except asyncio.TimeoutError:
-            self.logger.error(f"[{self.name}] 请求超时")
-            await self.handle_error("Fetch timeout")
-            return None
-        except Exception as e:
-            self.logger.error(f"[{self.name}] 获取RSS出错: {str(e)}", exc_info=True)
-            await self.handle_error(f"Fetch error: {str(e)}")
-            return None
-            
     def clean_xml(self, content: str) -> str:
         """清理和修复XML内容"""
+        with tracer.span('clean_xml', length=len(content)):
+            return self._clean_xml(content)
+
+    def _clean_xml(self, content: str) -> str:
         try:
             # 预处理：移除所有控制字符
             content = ''.join(char for char in content if ord(char) >= 32 or char == '\n')
@@ -205,6 +216,7 @@ class BaseRSSSource:
             content = re.sub(r'<!--[\s\S]*?-->', '', content)
             
             # 使用BeautifulSoup清理
+            from bs4 import BeautifulSoup
             soup = BeautifulSoup(content, 'lxml-xml')
             
             # 移除所有script和style标签
@@ -226,96 +238,58 @@ class BaseRSSSource:
             
             return content.strip()
         except Exception as e:
-            self.logger.warning(f"Clean XML error: {str(e)}")
+            self.logger.warning("Clean XML error: %s", e)
             return content
             
-    async def parse_entry(self, entry) -> Dict:
-        """默认的文章解析方法，子类可以重写"""
-        try:
-            # 获取摘要
-            if isinstance(entry, dict):
-                summary = entry.get('summary', '')
-                if not summary and entry.get('content'):
-                    # 某些源使用content而不是summary
-                    content = entry.get('content')
-                    if isinstance(content, list) and content:
-                        summary = content[0].get('value', '')
-                    elif isinstance(content, str):
-                        summary = content
-                
-                return {
-                    'title': entry.get('title', ''),
-                    'link': entry.get('link', ''),
-                    'summary': summary,
-                    'published': entry.get('published', entry.get('updated', ''))
-                }
-            else:
-                # 处理feedparser.FeedParserDict对象
-                summary = getattr(entry, 'summary', '')
-                if not summary and hasattr(entry, 'content'):
-                    # 某些源使用content而不是summary
-                    summary = entry.content[0].value if entry.content else ''
-                
-                return {
-                    'title': getattr(entry, 'title', ''),
-                    'link': getattr(entry, 'link', ''),
-                    'summary': summary,
-                    'published': getattr(entry, 'published', getattr(entry, 'updated', ''))
-                }
-        except Exception as e:
-            await self.handle_error(f"Parse entry error: {str(e)}")
-            return {}
+    async def parse_entry(self, entry: ParsedEntry) -> Optional[ParsedEntry]:
+        """清理文章内容，子类可以重写；返回清理后的文章，出错时返回None"""
+        return entry
     
-    def get_entry_id(self, entry) -> str:
+    def get_entry_id(self, entry: ParsedEntry) -> str:
         """生成文章的唯一标识"""
         try:
-            # 获取标题和链接
-            title = getattr(entry, 'title', '') if not isinstance(entry, dict) else entry.get('title', '')
-            link = getattr(entry, 'link', '') if not isinstance(entry, dict) else entry.get('link', '')
             # 使用标题和链接的组合作为唯一标识
-            id_str = f"{link}{title}"
+            id_str = f"{entry.link}{entry.title}"
             return hashlib.md5(id_str.encode()).hexdigest()
         except Exception as e:
             self.logger.error(f"生成文章ID出错: {str(e)}")
             return hashlib.md5(str(datetime.now().timestamp()).encode()).hexdigest()
+
+    def history_key(self, entry_id: str) -> str:
+        """历史记录中的键：按源区分，共用同一个URL的源各自去重、各自路由"""
+        return f"{self.key}:{entry_id}"
+
+    def is_sent(self, entry_id: str) -> bool:
+        """文章是否已经由这个源发送过
+
+        旧版本的历史记录只以文章ID为键，记录中的source与本源相同时同样视为已发送，过期后自然淘汰。
+        """
+        if self.history_key(entry_id) in self.history:
+            return True
+        legacy = self.history.get(entry_id)
+        return legacy is not None and legacy.get('source') == self.name
         
-    async def should_post_entry(self, entry) -> bool:
+    async def should_post_entry(self, entry: ParsedEntry) -> bool:
         """判断是否应该发送这篇文章"""
         try:
             # 检查必要字段是否存在
-            if isinstance(entry, dict):
-                if not entry.get('title') or not entry.get('link'):
-                    return False
-            else:
-                if not hasattr(entry, 'title') or not hasattr(entry, 'link'):
-                    return False
+            if not entry.title or not entry.link:
+                return False
                     
             # 检查是否已发送过
             entry_id = self.get_entry_id(entry)
-            if entry_id in self.history:
-                self.logger.info(f"跳过已发送文章：{getattr(entry, 'title', '') if not isinstance(entry, dict) else entry.get('title', '')}")
+            if self.is_sent(entry_id):
+                self.logger.info("跳过已发送文章：%s", entry.title)
                 return False
                 
             # 检查发布时间
-            published_time = None
-            if isinstance(entry, dict):
-                if entry.get('published_parsed'):
-                    published_time = entry['published_parsed']
-                elif entry.get('updated_parsed'):
-                    published_time = entry['updated_parsed']
-            else:
-                if hasattr(entry, 'published_parsed'):
-                    published_time = entry.published_parsed
-                elif hasattr(entry, 'updated_parsed'):
-                    published_time = entry.updated_parsed
-                
-            if published_time:
+            if entry.published_parsed:
                 # 只发送最近72小时的文章
                 now = datetime.now()
-                entry_time = datetime(*published_time[:6])
+                entry_time = datetime(*entry.published_parsed[:6])
                 time_diff = now - entry_time
                 if time_diff.total_seconds() > 72 * 3600:
-                    self.logger.info(f"跳过过期文章：{getattr(entry, 'title', '') if not isinstance(entry, dict) else entry.get('title', '')}")
+                    self.logger.info("跳过过期文章：%s", entry.title)
                     return False
                     
             return True
@@ -323,25 +297,23 @@ class BaseRSSSource:
             self.logger.error(f"检查文章是否应该发送时出错: {str(e)}")
             return False
             
-    async def mark_as_sent(self, entry) -> None:
+    async def mark_as_sent(self, entry: ParsedEntry) -> None:
         """标记文章为已发送"""
         try:
-            # 获取文章信息
-            title = getattr(entry, 'title', '') if not isinstance(entry, dict) else entry.get('title', '')
-            link = getattr(entry, 'link', '') if not isinstance(entry, dict) else entry.get('link', '')
             entry_id = self.get_entry_id(entry)
             
             # 更新历史记录
-            self.history[entry_id] = {
-                'title': title,
-                'link': link,
+            self.history[self.history_key(entry_id)] = {
+                'title': entry.title,
+                'link': entry.link,
                 'timestamp': datetime.now().timestamp(),
                 'source': self.name
             }
             
             # 保存到文件
-            self.__class__.save_history(self.history)
-            self.logger.info(f"已标记文章为已发送: {title}")
+            with tracer.span('save_history'):
+                self.__class__.save_history(self.history)
+            self.logger.info("已标记文章为已发送: %s", entry.title)
         except Exception as e:
             self.logger.error(f"标记文章为已发送时出错: {str(e)}")
     
@@ -349,35 +321,176 @@ class BaseRSSSource:
         """错误处理，子类可以重写"""
         self.logger.error(f"[{self.name}] {error_msg}")
 
-    async def fetch_feed(self):
+    async def fetch_content(self) -> Optional[str]:
+        """只负责下载RSS内容，不做解析；内容没有变化（304或与上次相同）时返回None
+
+        请求的URL和请求头与其他源完全相同时，共用同一次下载。
+        """
+        headers = self.get_headers()
+        if self.etag or self.last_modified:
+            headers = dict(headers)
+            if self.etag:
+                headers['If-None-Match'] = self.etag
+            if self.last_modified:
+                headers['If-Modified-Since'] = self.last_modified
+        self.shared_content = None
+        start = time.perf_counter()
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.url, headers=self.get_headers()) as response:
-                    if response.status == 200:
-                        content = await response.text()
-                        feed = feedparser.parse(content)
-                        logging.info(f"成功获取RSS源 [{self.name}] 的内容")
-                        return feed
+            with tracer.span('http_get', url=self.url) as span:
+                response = await fetch_coalescer.fetch(fetch_key(self.url, headers, self.max_bytes),
+                                                       lambda: self._download(headers))
+                if response.consumers > 1:
+                    metrics.COALESCED.inc(source=self.key, stage='fetch')
+                    span.set(shared=response.consumers)
+                metrics.FETCH_RESPONSES.inc(source=self.key, status=response.status)
+                span.set(status=response.status)
+                if response.status == 304:
+                    metrics.FETCH_SECONDS.observe(time.perf_counter() - start, source=self.key)
+                    metrics.FETCH_NOT_MODIFIED.inc(source=self.key)
+                    breakers.success(self.key, self.host)
+                    self.logger.debug("RSS源 [%s] 没有更新 (304)", self.name)
+                    return None
+                if response.status != 200:
+                    metrics.FETCH_ERRORS.inc(source=self.key)
+                    self.logger.error("获取RSS源 [%s] 失败: HTTP %s", self.name, response.status)
+                    if response.status >= 500 or response.status == 429:
+                        breakers.failure(self.key, self.host)
                     else:
-                        logging.error(f"获取RSS源 [{self.name}] 失败: HTTP {response.status}")
-                        return None
+                        # 4xx只是这个源的问题，主机是正常的
+                        breakers.failure(self.key)
+                        breakers.success(host=self.host)
+                    return None
+                content = response.text
+                if content is None:
+                    metrics.FETCH_TOO_LARGE.inc(source=self.key)
+                    breakers.failure(self.key)
+                    breakers.success(host=self.host)
+                    self.logger.warning("RSS源 [%s] 的响应超过 %d 字节，已放弃", self.name, self.max_bytes)
+                    return None
+                metrics.FETCH_SECONDS.observe(time.perf_counter() - start, source=self.key)
+                metrics.FETCH_BYTES.inc(response.size, source=self.key)
+                span.set(bytes=response.size)
+                self.etag = response.headers.get('ETag')
+                self.last_modified = response.headers.get('Last-Modified')
+                # 不支持条件请求的源，用内容摘要判断是否有变化
+                digest = response.digest
+                if digest == self.content_hash:
+                    metrics.FETCH_UNCHANGED.inc(source=self.key)
+                    breakers.success(self.key, self.host)
+                    self.logger.debug("RSS源 [%s] 内容没有变化", self.name)
+                    return None
+                self.content_hash = digest
+                # 有多个源共用这次下载时，解析结果也可以共用
+                if response.consumers > 1:
+                    self.shared_content = content
+                # 源是否正常要等解析之后才知道
+                breakers.success(host=self.host)
+                if BaseRSSSource._recorder is not None and response.raw is not None:
+                    # 压缩和写文件放到线程池
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, BaseRSSSource._recorder.record, self.key, self.url, response.status,
+                        dict(response.headers), response.encoding, response.raw)
+                self.logger.debug("成功获取RSS源 [%s] 的内容", self.name)
+                return content
         except Exception as e:
-            logging.error(f"获取RSS源 [{self.name}] 出错: {str(e)}")
+            metrics.FETCH_ERRORS.inc(source=self.key)
+            self.logger.error("获取RSS源 [%s] 出错: %r", self.name, e)
+            if isinstance(e, aiohttp.ClientProxyConnectionError):
+                # 所有代理都连不上，不是主机的问题
+                breakers.failure(self.key)
+            elif isinstance(e, (aiohttp.ClientConnectionError, asyncio.TimeoutError)):
+                breakers.failure(self.key, self.host)
+            else:
+                breakers.failure(self.key)
             return None
 
-    async def parse_entry(self, entry: Dict) -> str:
-        """解析RSS条目,返回要发送的消息内容"""
-        try:
-            title = entry.get('title', 'No Title')
-            link = entry.get('link', '')
-            summary = entry.get('summary', '')
-            
-            # 清理HTML标签
-            clean_summary = BeautifulSoup(summary, 'html.parser').get_text()
-            
-            message = f"**{title}**\n\n{clean_summary}\n\n原文链接: {link}"
-            logging.info(f"解析文章 [{self.name}]: {title}")
-            return message
-        except Exception as e:
-            logging.error(f"解析文章失败 [{self.name}]: {str(e)}")
-            raise
+    async def _download(self, headers: Dict[str, str]) -> SharedResponse:
+        """发送请求并读取响应体，结果可能由多个源共享"""
+        async with proxy_pool.get(self.url, headers=headers) as response:
+            # 复制成CIMultiDict，按名称取值时仍不区分大小写
+            if response.status != 200:
+                return SharedResponse(response.status, response.headers.copy())
+            body = await self.read_body(response)
+            if body is None:
+                return SharedResponse(response.status, response.headers.copy())
+            # 在这里解码，返回之后原始字节就被释放，不会与解析时的文本同时占用内存
+            return SharedResponse.from_body(response.status, response.headers.copy(), body,
+                                            self.response_encoding(response),
+                                            keep_raw=BaseRSSSource._recorder is not None)
+
+    async def parse_content(self, content: str) -> List[ParsedEntry]:
+        """在线程池中解析RSS内容；共用下载的源中解析方式相同的，只解析一次"""
+        loop = asyncio.get_running_loop()
+        parse = lambda: loop.run_in_executor(None, self.parse_entries, content)
+        # 按对象判断，其他途径得到的内容（例如WebSub推送）不会用到别的内容的解析结果
+        if content is not self.shared_content:
+            return await parse()
+        self.shared_content = None
+        # 解析结果只取决于内容和源的类（clean_xml、parse_feed），清理规则在parse_entry中按源执行
+        entries, shared = await fetch_coalescer.parse((self.content_hash, type(self)), parse)
+        if shared:
+            metrics.COALESCED.inc(source=self.key, stage='parse')
+        return entries
+
+    async def read_body(self, response: aiohttp.ClientResponse) -> Optional[bytearray]:
+        """分块读取响应体，超过max_bytes时立即停止并返回None
+
+        限制的是解压后的大小，每读一块检查一次；aiohttp按收到的网络数据块解压，
+        单个数据块解压后的内容仍可能超过上限。各块直接追加到同一个缓冲区，不会同时存在块列表和拼接后的副本。
+        """
+        if response.content_length is not None and response.content_length > self.max_bytes:
+            response.close()
+            return None
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(self.CHUNK_SIZE):
+            if len(body) + len(chunk) > self.max_bytes:
+                self._abort_body(response)
+                return None
+            body += chunk
+        return body
+
+    def _abort_body(self, response: aiohttp.ClientResponse):
+        if response.connection is not None:
+            # 还在接收，直接断开连接，剩下的内容不再读取
+            response.close()
+            return
+        # 响应已经全部收到，连接已放回连接池，但缓冲区过大时连接的读取处于暂停状态；
+        # 清空缓冲区才会恢复读取，否则下一个复用这个连接的请求会一直等待
+        while response.content.read_nowait(self.CHUNK_SIZE):
+            pass
+
+    @staticmethod
+    def response_encoding(response: aiohttp.ClientResponse) -> str:
+        """响应声明的字符编码，没有声明或无法识别时使用utf-8（与aiohttp默认的行为一致）"""
+        if response.charset:
+            try:
+                return codecs.lookup(response.charset).name
+            except LookupError:
+                pass
+        return 'utf-8'
+
+    def forget_validators(self):
+        """清除ETag/Last-Modified和内容摘要，下一轮强制重新下载和处理（例如发送失败需要重试时）"""
+        self.etag = None
+        self.last_modified = None
+        self.content_hash = None
+
+    def parse_feed(self, content: str) -> 'feedparser.FeedParserDict':
+        """解析RSS内容，CPU密集，可以放到线程池中执行"""
+        import feedparser
+        return feedparser.parse(content)
+
+    def parse_entries(self, content: str) -> List[ParsedEntry]:
+        """解析RSS内容并转换成ParsedEntry，feed对象不会离开这个函数，可以放到线程池中执行"""
+        feed = self.parse_feed(content)
+        entries = feed.get('entries', ())
+        # 格式正确但当前没有文章的RSS不算错误；有解析错误、或者根本不是RSS/Atom（version为空，
+        # 例如格式正确的HTML错误页面）且没有文章时才是错误
+        if not entries and (feed.get('bozo') or not feed.get('version')):
+            reason = feed.get('bozo_exception') if feed.get('bozo') else '不是RSS/Atom'
+            raise FeedParseError(f"没有解析出文章: {reason!r}")
+        return [self.entry_from_feed(entry) for entry in entries]
+
+    def entry_from_feed(self, entry) -> ParsedEntry:
+        """把feedparser的条目转换成ParsedEntry，在线程池中执行；子类需要原始条目中的其他信息时重写"""
+        return ParsedEntry.from_feed_entry(entry)
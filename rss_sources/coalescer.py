@@ -0,0 +1,115 @@
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, List, Mapping, Optional, Tuple, Union
+from urllib.parse import urlsplit, urlunsplit
+from .entry import ParsedEntry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def normalize_url(url: str) -> str:
+    """协议和主机名转小写，去掉默认端口和#片段；路径和查询参数保持原样"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    return urlunsplit((scheme, host, parts.path or '/', parts.query, ''))
+
+def fetch_key(url: str, headers: Mapping[str, str], *extra: Hashable) -> tuple:
+    """合并请求的键：规范化的URL加上请求头（包括条件请求头），请求头名不区分大小写"""
+    return (normalize_url(url), tuple(sorted((name.lower(), value) for name, value in headers.items())), *extra)
+
+class SharedResponse:
+    """一次下载的结果，由同时请求这个URL的所有源共享
+
+    下载完成时就解码并算出摘要，原始字节随即释放（录制时除外），解析时内存中只有解码后的文本。
+    """
+    __slots__ = ('status', 'headers', 'encoding', 'text', 'size', 'digest', 'raw', 'consumers')
+
+    def __init__(self, status: int, headers: Mapping[str, str], encoding: str = '', text: Optional[str] = None,
+                 size: int = 0, digest: str = '', raw: Optional[bytes] = None):
+        self.status = status
+        self.headers = headers
+        self.encoding = encoding
+        self.text = text  # 解码后的内容，各个源拿到的是同一个字符串；超过大小上限时为None
+        self.size = size  # 响应体的字节数
+        self.digest = digest  # 响应体的SHA1，用于判断内容是否变化
+        self.raw = raw  # 原始字节，只在录制时保留
+        self.consumers = 1  # 共享这次下载的源的数量，下载完成后不再变化
+
+    @classmethod
+    def from_body(cls, status: int, headers: Mapping[str, str], body: Union[bytes, bytearray], encoding: str,
+                  keep_raw: bool = False) -> 'SharedResponse':
+        """解码响应体并计算摘要，keep_raw为False时不保留原始字节"""
+        return cls(status, headers, encoding, body.decode(encoding), len(body), hashlib.sha1(body).hexdigest(),
+                   bytes(body) if keep_raw else None)
+
+class FetchCoalescer:
+    """合并相同的RSS请求和解析
+
+    多个源配置了同一个URL（例如推送到不同频道或使用不同的清理规则）时，
+    同时发起的请求共用一次下载；解析方式相同的源共用一次解析结果，
+    各个源拿到的是条目的副本，之后的清理、去重和路由互不影响。
+    """
+
+    def __init__(self, parse_cache_size: int = 32):
+        self._downloads: Dict[tuple, asyncio.Future] = {}
+        self._consumers: Dict[tuple, int] = {}
+        self._parses: Dict[Hashable, asyncio.Future] = {}
+        # 最近的共享解析结果，同一份内容的各个源不一定同时进入解析阶段
+        self._parsed: 'OrderedDict[Hashable, List[ParsedEntry]]' = OrderedDict()
+        self.parse_cache_size = parse_cache_size
+
+    async def fetch(self, key: tuple, download: Callable[[], Awaitable[SharedResponse]]) -> SharedResponse:
+        """相同的键已经在下载时等待那次下载，否则发起新的下载"""
+        future = self._downloads.get(key)
+        if future is None:
+            future = self._downloads[key] = asyncio.ensure_future(self._download(key, download))
+            self._consumers[key] = 1
+        else:
+            self._consumers[key] += 1
+        # 某个源被取消时，下载继续进行，其他等待的源不受影响
+        return await asyncio.shield(future)
+
+    async def _download(self, key: tuple, download: Callable[[], Awaitable[SharedResponse]]) -> SharedResponse:
+        try:
+            shared = await download()
+        finally:
+            # 之后的请求会重新下载
+            del self._downloads[key]
+            consumers = self._consumers.pop(key)
+        # 等待的源在返回之后才会被唤醒，看到的是最终的人数
+        shared.consumers = consumers
+        if consumers > 1:
+            logger.debug("合并了 %d 个相同的请求: %s", consumers, key[0])
+        return shared
+
+    async def parse(self, key: Hashable,
+                    parse: Callable[[], Awaitable[List[ParsedEntry]]]) -> Tuple[List[ParsedEntry], bool]:
+        """共享的解析：相同的键正在解析或最近解析过时直接使用那次的结果
+
+        返回条目的副本，以及结果是否来自其他源的解析。
+        """
+        entries = self._parsed.get(key)
+        if entries is not None:
+            self._parsed.move_to_end(key)
+            return [entry.copy() for entry in entries], True
+        future = self._parses.get(key)
+        if future is not None:
+            entries = await asyncio.shield(future)
+            return [entry.copy() for entry in entries], True
+        future = self._parses[key] = asyncio.ensure_future(parse())
+        try:
+            entries = await asyncio.shield(future)
+        finally:
+            del self._parses[key]
+        self._parsed[key] = entries
+        while len(self._parsed) > self.parse_cache_size:
+            self._parsed.popitem(last=False)
+        return [entry.copy() for entry in entries], False
+
+fetch_coalescer = FetchCoalescer()
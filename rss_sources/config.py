@@ -1,18 +1,88 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Set
 from .base import BaseRSSSource
+from .routing import RouteRules
 
 class RSSConfig:
     def __init__(self):
         self.sources: List[BaseRSSSource] = []
-        
+        # config.json中的键 -> RSS源
+        self._by_key: Dict[str, BaseRSSSource] = {}
+        # 频道 -> 固定推送到该频道的RSS源的键
+        self._by_channel: Dict[str, Set[str]] = {}
+        self.routes = RouteRules()
+
+    def _index(self, source: BaseRSSSource):
+        for channel_id in source.channel_ids:
+            self._by_channel.setdefault(str(channel_id), set()).add(source.key)
+
+    def _unindex(self, source: BaseRSSSource):
+        for channel_id in source.channel_ids:
+            keys = self._by_channel.get(str(channel_id))
+            if keys is not None:
+                keys.discard(source.key)
+                if not keys:
+                    del self._by_channel[str(channel_id)]
+
     def add_source(self, source: BaseRSSSource):
         """添加RSS源"""
         self.sources.append(source)
-        
+        self._by_key[source.key] = source
+        self._index(source)
+
+    def get_source(self, key: str) -> Optional[BaseRSSSource]:
+        """按config.json中的键获取RSS源"""
+        return self._by_key.get(key)
+
+    def remove_source(self, key: str) -> Optional[BaseRSSSource]:
+        """移除RSS源"""
+        source = self._by_key.pop(key, None)
+        if source is not None:
+            self.sources = [s for s in self.sources if s is not source]
+            self._unindex(source)
+        return source
+
+    def replace_source(self, key: str, source: BaseRSSSource):
+        """替换RSS源，保持原来的顺序"""
+        old = self._by_key.get(key)
+        if old is None:
+            self.add_source(source)
+            return
+        self.sources = [source if s is old else s for s in self.sources]
+        self._by_key[key] = source
+        self._unindex(old)
+        self._index(source)
+
+    def set_channels(self, key: str, channel_ids: List[str]):
+        """修改RSS源固定推送的频道"""
+        source = self._by_key.get(key)
+        if source is None:
+            return
+        self._unindex(source)
+        source.channel_ids = channel_ids
+        self._index(source)
+
+    def set_routes(self, routes: Dict[str, Dict]):
+        """设置按关键词/正则路由的规则"""
+        self.routes = RouteRules(routes)
+
     def get_sources(self) -> List[BaseRSSSource]:
         """获取所有RSS源"""
         return self.sources
-    
+
     def get_sources_by_channel(self, channel_id: str) -> List[BaseRSSSource]:
-        """获取指定频道的所有RSS源"""
-        return [source for source in self.sources if channel_id in source.channel_ids] 
\ No newline at end of file
+        """获取可能推送到指定频道的所有RSS源（固定频道或路由规则）"""
+        channel_id = str(channel_id)
+        keys = self._by_channel.get(channel_id, set())
+        if channel_id in self.routes.channels:
+            return [source for source in self.sources
+                    if source.key in keys or self.routes.applies_to(channel_id, source.key)]
+        return [self._by_key[key] for key in keys]
+
+    def route(self, source: BaseRSSSource, text: str) -> List[str]:
+        """计算文章要推送到的频道：源固定的频道加上规则匹配到的频道"""
+        channels = [str(channel_id) for channel_id in source.channel_ids]
+        if self.routes:
+            for channel_id in self.routes.match(source.key, text):
+                if channel_id not in channels:
+                    channels.append(channel_id)
+        return channels
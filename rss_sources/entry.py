@@ -0,0 +1,53 @@
+from typing import Optional
+import time
+
+class ParsedEntry:
+    """流水线中流转的文章，只保留用到的字段
+
+    feedparser的条目里还有content、summary_detail、links等大量数据，
+    解析后立即转换成ParsedEntry，整个feed对象随即释放。
+    """
+    __slots__ = ('title', 'link', 'guid', 'summary', 'published', 'published_parsed', 'lang', 'entry_id')
+
+    def __init__(self, title: str = '', link: str = '', guid: str = '', summary: str = '',
+                 published: str = '', published_parsed: Optional[time.struct_time] = None,
+                 lang: Optional[str] = None, entry_id: Optional[str] = None):
+        self.title = title
+        self.link = link
+        self.guid = guid
+        self.summary = summary
+        self.published = published
+        # 发布时间（UTC），没有时为None
+        self.published_parsed = published_parsed
+        # 文章的语言，由language.entry_language在第一次用到时判断
+        self.lang = lang
+        # 源在转换时按原始条目算好的文章ID，没有时由get_entry_id按上面的字段生成
+        self.entry_id = entry_id
+
+    @classmethod
+    def from_feed_entry(cls, entry) -> 'ParsedEntry':
+        """从feedparser的条目转换，摘要依次取summary、description、content"""
+        get = entry.get
+        summary = get('summary') or get('description') or ''
+        if not summary:
+            content = get('content')
+            if isinstance(content, list) and content:
+                summary = content[0].get('value', '')
+            elif isinstance(content, str):
+                summary = content
+        return cls(
+            title=get('title') or '',
+            link=get('link') or '',
+            guid=get('id') or '',
+            summary=summary,
+            published=get('published') or get('updated') or '',
+            published_parsed=get('published_parsed') or get('updated_parsed'),
+        )
+
+    def copy(self) -> 'ParsedEntry':
+        """浅复制，共享解析结果的各个源各自修改自己的副本"""
+        return ParsedEntry(self.title, self.link, self.guid, self.summary, self.published, self.published_parsed,
+                           self.lang, self.entry_id)
+
+    def __repr__(self) -> str:
+        return f"ParsedEntry(title={self.title!r}, link={self.link!r})"
@@ -1,6 +1,6 @@
-from typing import Dict
+from typing import Optional
 from .base import BaseRSSSource
-from bs4 import BeautifulSoup
+from .entry import ParsedEntry
 import re
 
 class GeekparkRSS(BaseRSSSource):
@@ -21,22 +21,25 @@ class GeekparkRSS(BaseRSSSource):
         content = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', content)
         return super().clean_xml(content)
         
-    async def parse_entry(self, entry) -> Dict:
+    async def parse_entry(self, entry: ParsedEntry) -> Optional[ParsedEntry]:
         """GeekPark特定的解析逻辑"""
-        data = await super().parse_entry(entry)
+        entry = await super().parse_entry(entry)
+        if entry is None:
+            return None
         
         # 清理内容中的HTML标签
-        if data.get('summary'):
+        if entry.summary:
             # 移除script和style标签
-            soup = BeautifulSoup(data['summary'], 'html.parser')
+            from bs4 import BeautifulSoup
+            soup = BeautifulSoup(entry.summary, 'html.parser')
             for tag in soup(['script', 'style', 'iframe']):
                 tag.decompose()
             # 移除所有属性
             for tag in soup.find_all(True):
                 tag.attrs = {}
-            data['summary'] = soup.get_text(separator=' ', strip=True)
+            entry.summary = soup.get_text(separator=' ', strip=True)
             
-        return data
+        return entry
         
     async def handle_error(self, error_msg: str):
         # 特定的错误处理
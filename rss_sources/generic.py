@@ -0,0 +1,52 @@
+from typing import Dict, List, Optional
+from .base import BaseRSSSource
+from .entry import ParsedEntry
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+class GenericRSSSource(BaseRSSSource):
+    """完全由config.json描述的RSS源，只需要配置URL，不需要单独的模块
+
+    支持的配置项：
+        url: RSS地址（必填）
+        channel_ids: 推送的频道
+        headers: 额外的请求头
+        rules: 摘要处理规则
+            strip_html: 是否去掉摘要中的HTML标签，默认true
+            remove_patterns: 要从摘要中删除的正则表达式列表
+    """
+
+    def __init__(self, key: str, source_config: Dict):
+        super().__init__(
+            url=source_config['url'],
+            channel_ids=source_config.get('channel_ids', [])
+        )
+        self.key = key
+        self.name = source_config.get('name', key)
+        # 大量通用源共用一个logger
+        self.logger = logger
+        if source_config.get('headers'):
+            self.headers.update(source_config['headers'])
+        rules = source_config.get('rules', {})
+        self.strip_html = rules.get('strip_html', True)
+        self.remove_patterns: List[re.Pattern] = [
+            re.compile(pattern, re.DOTALL) for pattern in rules.get('remove_patterns', [])
+        ]
+
+    async def parse_entry(self, entry: ParsedEntry) -> Optional[ParsedEntry]:
+        """按配置的规则解析文章"""
+        try:
+            summary = entry.summary
+            for pattern in self.remove_patterns:
+                summary = pattern.sub('', summary)
+            if summary and self.strip_html:
+                from bs4 import BeautifulSoup
+                summary = BeautifulSoup(summary, 'html.parser').get_text(separator=' ', strip=True)
+
+            entry.summary = summary
+            return entry
+        except Exception as e:
+            await self.handle_error(f"解析文章错误: {str(e)}")
+            return None
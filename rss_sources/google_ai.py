@@ -1,6 +1,6 @@
-from typing import Dict
+from typing import Optional
 from .base import BaseRSSSource
-from bs4 import BeautifulSoup
+from .entry import ParsedEntry
 import re
 
 class GoogleAIRSS(BaseRSSSource):
@@ -20,15 +20,18 @@ class GoogleAIRSS(BaseRSSSource):
         content = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', content)
         return super().clean_xml(content)
         
-    async def parse_entry(self, entry) -> Dict:
+    async def parse_entry(self, entry: ParsedEntry) -> Optional[ParsedEntry]:
         """Google AI特定的解析逻辑"""
-        data = await super().parse_entry(entry)
+        entry = await super().parse_entry(entry)
+        if entry is None:
+            return None
         
         # 清理内容中的HTML标签
-        if data.get('summary'):
+        if entry.summary:
             # 移除所有HTML注释
-            summary = re.sub(r'<!--.*?-->', '', data['summary'], flags=re.DOTALL)
+            summary = re.sub(r'<!--.*?-->', '', entry.summary, flags=re.DOTALL)
             # 移除script和style标签及其内容
+            from bs4 import BeautifulSoup
             soup = BeautifulSoup(summary, 'html.parser')
             for tag in soup(['script', 'style', 'iframe']):
                 tag.decompose()
@@ -38,9 +41,9 @@ class GoogleAIRSS(BaseRSSSource):
                     del tag.attrs['class']
                 if 'id' in tag.attrs:
                     del tag.attrs['id']
-            data['summary'] = soup.get_text(separator=' ', strip=True)
+            entry.summary = soup.get_text(separator=' ', strip=True)
             
-        return data
+        return entry
         
     async def handle_error(self, error_msg: str):
         # 特定的错误处理
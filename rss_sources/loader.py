@@ -0,0 +1,66 @@
+import importlib
+import inspect
+import logging
+from typing import Callable, Dict, List, Optional, Tuple, Type
+from .base import BaseRSSSource
+from .generic import GenericRSSSource
+
+logger = logging.getLogger(__name__)
+
+def resolve_source_class(key: str, source_config: Dict) -> Optional[Type[BaseRSSSource]]:
+    """找到RSS源对应的类，只有需要自定义代码的源才会导入模块
+
+    配置了url且没有指定module的源使用GenericRSSSource；
+    否则导入 rss_sources.<module>（默认与键同名）中定义的BaseRSSSource子类。
+    """
+    module_name = source_config.get('module')
+    if module_name is None:
+        if source_config.get('url'):
+            return GenericRSSSource
+        module_name = key
+
+    full_name = f"{__package__}.{module_name}"
+    try:
+        module = importlib.import_module(full_name)
+    except ModuleNotFoundError as e:
+        if e.name != full_name:
+            raise
+        return None
+
+    for _, obj in inspect.getmembers(module, inspect.isclass):
+        if issubclass(obj, BaseRSSSource) and obj.__module__ == module.__name__:
+            return obj
+    return None
+
+def load_rss_sources(sources_config: Dict[str, Dict],
+                     source_filter: Optional[Callable[[str], bool]] = None
+                     ) -> List[Tuple[str, Type[BaseRSSSource], Dict]]:
+    """根据config.json的sources加载RSS源类，返回 (键, 类, 配置) 列表"""
+    sources = []
+    for key, source_config in sources_config.items():
+        if not source_config.get('enabled', True):
+            logger.info(f"跳过已禁用的RSS源: {key}")
+            continue
+        if source_filter is not None and not source_filter(key):
+            continue
+        try:
+            rss_class = resolve_source_class(key, source_config)
+        except Exception as e:
+            logger.error(f"加载RSS源 {key} 时出错: {str(e)}")
+            continue
+        if rss_class is None:
+            logger.warning(f"RSS源 {key} 既没有配置url，也没有对应的模块，已跳过")
+            continue
+        sources.append((key, rss_class, source_config))
+    return sources
+
+def create_source(key: str, rss_class: Type[BaseRSSSource], source_config: Dict) -> BaseRSSSource:
+    """实例化RSS源"""
+    if issubclass(rss_class, GenericRSSSource):
+        source = rss_class(key, source_config)
+    else:
+        source = rss_class(source_config.get('channel_ids', []))
+        source.key = key
+    if source_config.get('max_bytes'):
+        source.max_bytes = int(source_config['max_bytes'])
+    return source
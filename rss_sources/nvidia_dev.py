@@ -1,6 +1,6 @@
-from typing import Dict
+from typing import Optional
 from .base import BaseRSSSource
-from bs4 import BeautifulSoup
+from .entry import ParsedEntry
 import re
 
 class NvidiaDevRSS(BaseRSSSource):
@@ -22,27 +22,10 @@ class NvidiaDevRSS(BaseRSSSource):
         content = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', content)
         return super().clean_xml(content)
         
-    async def parse_entry(self, entry) -> Dict:
+    async def parse_entry(self, entry: ParsedEntry) -> Optional[ParsedEntry]:
         """NVIDIA开发者博客特定的解析逻辑"""
         try:
-            # 获取基本信息
-            title = getattr(entry, 'title', '')
-            link = getattr(entry, 'link', '')
-            
-            # 获取摘要
-            summary = ''
-            if hasattr(entry, 'summary'):
-                summary = entry.summary
-            elif hasattr(entry, 'description'):
-                summary = entry.description
-            elif hasattr(entry, 'content'):
-                if isinstance(entry.content, list) and entry.content:
-                    summary = entry.content[0].value
-                else:
-                    summary = str(entry.content)
-                    
-            # 获取发布时间
-            published = getattr(entry, 'published', getattr(entry, 'updated', ''))
+            summary = entry.summary
             
             # 清理内容中的HTML标签
             if summary:
@@ -51,20 +34,17 @@ class NvidiaDevRSS(BaseRSSSource):
                 # 移除多余的空白和换行
                 summary = re.sub(r'\s+', ' ', summary)
                 # 移除HTML标签
+                from bs4 import BeautifulSoup
                 soup = BeautifulSoup(summary, 'html.parser')
                 for tag in soup(['script', 'style', 'iframe']):
                     tag.decompose()
                 summary = soup.get_text(separator=' ', strip=True)
                 
-            return {
-                'title': title,
-                'link': link,
-                'summary': summary,
-                'published': published
-            }
+            entry.summary = summary
+            return entry
         except Exception as e:
             await self.handle_error(f"解析文章错误: {str(e)}")
-            return {}
+            return None
         
     async def handle_error(self, error_msg: str):
         await super().handle_error(f"nvidia_dev RSS处理错误: {error_msg}") 
\ No newline at end of file
@@ -0,0 +1,97 @@
+import gzip
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class Recording:
+    """录制的一次RSS响应"""
+    key: str
+    url: str
+    status: int
+    encoding: str
+    fetched_at: datetime
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    def text(self) -> str:
+        """按录制时响应的编码解码"""
+        return self.body.decode(self.encoding or 'utf-8', errors='replace')
+
+class ResponseRecorder:
+    """把RSS源的原始响应连同响应头压缩保存到磁盘，每个源只保留最近的keep份
+
+    每份录制是一个gzip文件：第一行是JSON格式的元数据，之后是原始的响应体。
+    目录结构为 <directory>/<源的键>/<时间>.gz，文件名按时间排序。
+    """
+
+    def __init__(self, directory: str = 'recordings', keep: int = 20):
+        self.directory = directory
+        self.keep = keep
+
+    def _source_dir(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def record(self, key: str, url: str, status: int, headers: Dict[str, str], encoding: str,
+               body: bytes):
+        """保存一次响应，同步写文件，在线程池中调用；出错只记录日志，不影响抓取"""
+        try:
+            source_dir = self._source_dir(key)
+            os.makedirs(source_dir, exist_ok=True)
+            fetched_at = datetime.now()
+            meta = {'url': url, 'status': status, 'encoding': encoding,
+                    'fetched_at': fetched_at.isoformat(), 'headers': headers}
+            path = os.path.join(source_dir, f"{fetched_at:%Y%m%d-%H%M%S-%f}.gz")
+            # 先写临时文件再改名，重放时不会读到写了一半的文件
+            tmp_path = path + '.tmp'
+            with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+                f.write(json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+                f.write(b'\n')
+                f.write(body)
+            os.replace(tmp_path, path)
+            self._prune(source_dir)
+        except Exception as e:
+            logger.warning("录制RSS源 [%s] 的响应失败: %s", key, e)
+
+    def _prune(self, source_dir: str):
+        files = sorted(name for name in os.listdir(source_dir) if name.endswith('.gz'))
+        for name in files[:max(0, len(files) - self.keep)]:
+            os.remove(os.path.join(source_dir, name))
+
+    def keys(self) -> List[str]:
+        """有录制的源"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name for name in os.listdir(self.directory)
+                      if os.path.isdir(self._source_dir(name)))
+
+    def paths(self, key: str) -> List[str]:
+        """某个源的所有录制，按时间从旧到新"""
+        source_dir = self._source_dir(key)
+        if not os.path.isdir(source_dir):
+            return []
+        return [os.path.join(source_dir, name) for name in sorted(os.listdir(source_dir))
+                if name.endswith('.gz')]
+
+    @staticmethod
+    def load(key: str, path: str) -> Recording:
+        with gzip.open(path, 'rb') as f:
+            data = f.read()
+        header, _, body = data.partition(b'\n')
+        meta = json.loads(header)
+        return Recording(key=key, url=meta['url'], status=meta['status'], encoding=meta.get('encoding', ''),
+                         fetched_at=datetime.fromisoformat(meta['fetched_at']), body=body,
+                         headers=meta.get('headers', {}))
+
+    def iter(self, key: str) -> Iterator[Recording]:
+        """按时间顺序读取某个源的录制"""
+        for path in self.paths(key):
+            try:
+                yield self.load(key, path)
+            except Exception as e:
+                logger.warning("读取录制文件 %s 失败: %s", path, e)
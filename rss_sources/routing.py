@@ -0,0 +1,140 @@
+import logging
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+def _is_word_char(char: str) -> bool:
+    return char.isascii() and char.isalnum()
+
+class AhoCorasick:
+    """Aho-Corasick多模式匹配，匹配耗时只与文本长度有关，与关键词数量无关
+
+    关键词不区分大小写；以ASCII字母数字开头/结尾的关键词要求在单词边界上，
+    避免 "AI" 匹配到 "said"。中文关键词不受边界限制。
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # 每个状态的输出：(关键词长度, 数据, 开头是否需要边界, 结尾是否需要边界)
+        self._output: List[List[Tuple[int, str, bool, bool]]] = [[]]
+        self._built = False
+
+    def add(self, keyword: str, payload: str):
+        """添加关键词，payload为匹配时返回的数据"""
+        keyword = keyword.lower()
+        if not keyword:
+            return
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(
+            (len(keyword), payload, _is_word_char(keyword[0]), _is_word_char(keyword[-1]))
+        )
+        self._built = False
+
+    def build(self):
+        """构建失败指针"""
+        queue = deque()
+        for next_state in self._goto[0].values():
+            self._fail[next_state] = 0
+            queue.append(next_state)
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+        self._built = True
+
+    def find(self, text: str) -> Set[str]:
+        """返回文本中匹配到的所有关键词的payload"""
+        if not self._built:
+            self.build()
+        text = text.lower()
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, payload, start_boundary, end_boundary in output[state]:
+                if payload in found:
+                    continue
+                start = end - length + 1
+                if start_boundary and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if end_boundary and end + 1 < len(text) and _is_word_char(text[end + 1]):
+                    continue
+                found.add(payload)
+        return found
+
+class RouteRules:
+    """按关键词/正则把文章路由到频道
+
+    config.json中的格式：
+        "routes": {
+            "<频道ID>": {
+                "keywords": ["LLM", "大模型"],
+                "patterns": ["GPT-\\\\d"],
+                "sources": ["openai"]   # 可选，只对这些源生效
+            }
+        }
+    所有频道的关键词编译进同一个Aho-Corasick自动机；每个频道的正则合并成一个表达式。
+    """
+
+    def __init__(self, routes: Optional[Dict[str, Dict]] = None):
+        self.routes = routes or {}
+        self._keywords = AhoCorasick()
+        self._patterns: List[Tuple[str, re.Pattern]] = []
+        # 频道 -> 允许的源（None表示所有源）
+        self._allowed_sources: Dict[str, Optional[Set[str]]] = {}
+        for channel_id, rule in self.routes.items():
+            channel_id = str(channel_id)
+            sources = rule.get('sources')
+            self._allowed_sources[channel_id] = set(sources) if sources else None
+            for keyword in rule.get('keywords', []):
+                self._keywords.add(keyword, channel_id)
+            patterns = rule.get('patterns', [])
+            if patterns:
+                try:
+                    combined = re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), re.IGNORECASE)
+                    self._patterns.append((channel_id, combined))
+                except re.error as e:
+                    logger.error(f"频道 {channel_id} 的路由正则无效: {str(e)}")
+        self._keywords.build()
+
+    def __bool__(self) -> bool:
+        return bool(self.routes)
+
+    @property
+    def channels(self) -> Iterable[str]:
+        return self._allowed_sources.keys()
+
+    def applies_to(self, channel_id: str, source_key: str) -> bool:
+        """该频道的规则是否对此源生效"""
+        allowed = self._allowed_sources.get(channel_id)
+        return allowed is None or source_key in allowed
+
+    def match(self, source_key: str, text: str) -> Set[str]:
+        """返回规则匹配到的频道"""
+        if not self.routes:
+            return set()
+        matched = self._keywords.find(text)
+        for channel_id, pattern in self._patterns:
+            if channel_id not in matched and pattern.search(text):
+                matched.add(channel_id)
+        return {channel_id for channel_id in matched if self.applies_to(channel_id, source_key)}
@@ -1,6 +1,6 @@
-from typing import Dict
+from typing import Dict, Optional
 from .base import BaseRSSSource
-from bs4 import BeautifulSoup
+from .entry import ParsedEntry
 import re
 
 class StabilityRSS(BaseRSSSource):
@@ -29,22 +29,25 @@ class StabilityRSS(BaseRSSSource):
         content = content.replace('Site-Server v@build.version@', 'Site-Server')
         return super().clean_xml(content)
         
-    async def parse_entry(self, entry) -> Dict:
+    async def parse_entry(self, entry: ParsedEntry) -> Optional[ParsedEntry]:
         """Stability特定的解析逻辑"""
-        data = await super().parse_entry(entry)
+        entry = await super().parse_entry(entry)
+        if entry is None:
+            return None
         
         # 清理内容中的HTML标签和特殊格式
-        if data.get('summary'):
+        if entry.summary:
             # 移除Key Takeaways部分
-            summary = re.sub(r'\*\*Key Takeaways:?\*\*.*?(?=\n\n)', '', data['summary'], flags=re.DOTALL)
+            summary = re.sub(r'\*\*Key Takeaways:?\*\*.*?(?=\n\n)', '', entry.summary, flags=re.DOTALL)
             # 移除其他Markdown标记
             summary = re.sub(r'\*\*.*?\*\*', '', summary)
             # 清理多余的空行
             summary = re.sub(r'\n{3,}', '\n\n', summary)
+            from bs4 import BeautifulSoup
             soup = BeautifulSoup(summary, 'html.parser')
-            data['summary'] = soup.get_text(separator=' ', strip=True)
+            entry.summary = soup.get_text(separator=' ', strip=True)
             
-        return data
+        return entry
         
     async def handle_error(self, error_msg: str):
         await super().handle_error(f"stability RSS处理错误: {error_msg}") 
\ No newline at end of file
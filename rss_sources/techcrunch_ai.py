@@ -1,6 +1,6 @@
-from typing import Dict
+from typing import Dict, Optional
 from .base import BaseRSSSource
-from bs4 import BeautifulSoup
+from .entry import ParsedEntry
 import re
 
 class TechcrunchRSS(BaseRSSSource):
@@ -19,27 +19,10 @@ class TechcrunchRSS(BaseRSSSource):
         })
         return headers
         
-    async def parse_entry(self, entry) -> Dict:
+    async def parse_entry(self, entry: ParsedEntry) -> Optional[ParsedEntry]:
         """TechCrunch特定的解析逻辑"""
         try:
-            # 获取基本信息
-            title = getattr(entry, 'title', '')
-            link = getattr(entry, 'link', '')
-            
-            # 获取摘要
-            summary = ''
-            if hasattr(entry, 'summary'):
-                summary = entry.summary
-            elif hasattr(entry, 'description'):
-                summary = entry.description
-            elif hasattr(entry, 'content'):
-                if isinstance(entry.content, list) and entry.content:
-                    summary = entry.content[0].value
-                else:
-                    summary = str(entry.content)
-                    
-            # 获取发布时间
-            published = getattr(entry, 'published', getattr(entry, 'updated', ''))
+            summary = entry.summary
             
             # 清理内容中的HTML标签
             if summary:
@@ -48,20 +31,17 @@ class TechcrunchRSS(BaseRSSSource):
                 # 移除多余的空白和换行
                 summary = re.sub(r'\s+', ' ', summary)
                 # 移除HTML标签
+                from bs4 import BeautifulSoup
                 soup = BeautifulSoup(summary, 'html.parser')
                 for tag in soup(['script', 'style', 'iframe']):
                     tag.decompose()
                 summary = soup.get_text(separator=' ', strip=True)
                 
-            return {
-                'title': title,
-                'link': link,
-                'summary': summary,
-                'published': published
-            }
+            entry.summary = summary
+            return entry
         except Exception as e:
             await self.handle_error(f"解析文章错误: {str(e)}")
-            return {}
+            return None
         
     async def handle_error(self, error_msg: str):
         await super().handle_error(f"techcrunch RSS处理错误: {error_msg}") 
\ No newline at end of file
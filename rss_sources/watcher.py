@@ -0,0 +1,143 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Callable, Dict, Optional, Set
+from urllib.parse import urlparse
+from .config import RSSConfig
+from .loader import load_rss_sources, create_source
+from dns_resolver import dns_resolver
+import metrics
+
+logger = logging.getLogger(__name__)
+
+class ConfigWatcher:
+    """监视config.json，只对变化的RSS源做增加、删除或重新路由，不需要重启
+
+    创建或重建失败的源不记为已应用，每隔retry_interval秒重试一次，直到成功或配置再次变化。
+    """
+
+    def __init__(self, path: str, rss_config: RSSConfig,
+                 source_filter: Optional[Callable[[str], bool]] = None, interval: float = 5):
+        self.path = path
+        self.rss_config = rss_config
+        self.source_filter = source_filter
+        self.interval = interval
+        self.retry_interval = 60.0
+        # 创建或重建失败、等待重试的源
+        self._failed: Set[str] = set()
+        self._retry_at = 0.0
+        self._mtime = self._get_mtime()
+        config = self._read_config() or {}
+        self._sources = self._active_sources(config)
+        self._routes = config.get('routes', {})
+
+    def _get_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def _read_config(self) -> Optional[Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"读取配置文件 {self.path} 失败，保持当前配置: {str(e)}")
+            return None
+
+    def _active_sources(self, config: Dict) -> Dict[str, Dict]:
+        """配置中启用的、属于本进程的RSS源"""
+        return {
+            key: source_config
+            for key, source_config in config.get('sources', {}).items()
+            if source_config.get('enabled', True)
+            and (self.source_filter is None or self.source_filter(key))
+        }
+
+    async def run(self):
+        """定期检查配置文件是否变化"""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                mtime = self._get_mtime()
+                retry = self._failed and time.monotonic() >= self._retry_at
+                if mtime is None or (mtime == self._mtime and not retry):
+                    continue
+                self._mtime = mtime
+                config = self._read_config()
+                if config is not None:
+                    await self.apply(config)
+            except Exception as e:
+                logger.error(f"应用配置变更出错: {str(e)}", exc_info=True)
+
+    async def apply(self, config: Dict):
+        """对比新旧sources，只处理发生变化的RSS源，路由规则变化时重新编译"""
+        new_sources = self._active_sources(config)
+        old_sources = self._sources
+
+        removed = [key for key in old_sources if key not in new_sources]
+        added = [key for key in new_sources if key not in old_sources]
+        changed = [key for key in new_sources
+                   if key in old_sources and new_sources[key] != old_sources[key]]
+
+        for key in removed:
+            self.rss_config.remove_source(key)
+            logger.info(f"配置变更：已移除RSS源 {key}")
+
+        rerouted = []
+        rebuild = list(added)
+        for key in changed:
+            old = {k: v for k, v in old_sources[key].items() if k != 'channel_ids'}
+            new = {k: v for k, v in new_sources[key].items() if k != 'channel_ids'}
+            source = self.rss_config.get_source(key)
+            if old == new and source is not None:
+                # 只改了频道，直接更新，保留源的状态
+                self.rss_config.set_channels(key, new_sources[key].get('channel_ids', []))
+                rerouted.append(key)
+                logger.info(f"配置变更：RSS源 {key} 改为推送到 {source.channel_ids}")
+            else:
+                rebuild.append(key)
+
+        new_hosts = []
+        built = set()
+        for key, rss_class, source_config in load_rss_sources({key: new_sources[key] for key in rebuild}):
+            try:
+                source = create_source(key, rss_class, source_config)
+            except Exception as e:
+                logger.error(f"配置变更：创建RSS源 {key} 失败: {str(e)}")
+                continue
+            built.add(key)
+            if key in added:
+                self.rss_config.add_source(source)
+                logger.info(f"配置变更：已添加RSS源 {key}")
+            else:
+                self.rss_config.replace_source(key, source)
+                logger.info(f"配置变更：已重建RSS源 {key}")
+            new_hosts.append(urlparse(source.url).hostname)
+
+        # 失败的源保留旧的配置（新增的则不记录），下次检查时仍视为变化，重新创建
+        failed = [key for key in rebuild if key not in built]
+        applied = dict(new_sources)
+        for key in failed:
+            metrics.CONFIG_RELOAD_ERRORS.inc(source=key)
+            if key in old_sources:
+                applied[key] = old_sources[key]
+            else:
+                del applied[key]
+        self._sources = applied
+        self._failed = set(failed)
+        if failed:
+            self._retry_at = time.monotonic() + self.retry_interval
+            logger.error(f"配置变更：RSS源 {failed} 创建失败，保持原状（已有的源继续使用旧的配置），{self.retry_interval:.0f} 秒后重试")
+        routes = config.get('routes', {})
+        if routes != self._routes:
+            self.rss_config.set_routes(routes)
+            self._routes = routes
+            logger.info(f"配置变更：路由规则已更新，共 {len(routes)} 个频道")
+        if new_hosts:
+            await dns_resolver.prefetch(new_hosts)
+        if removed or rebuild or rerouted:
+            logger.info(f"配置已重新加载：新增 {len(built & set(added))}，移除 {len(removed)}，"
+                        f"重建 {len(built - set(added))}，重新路由 {len(rerouted)}，失败 {len(failed)}")
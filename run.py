@@ -1,254 +1,143 @@
+import time
+# 记录进程启动时间，用于启动耗时报告
+STARTUP_BEGIN = time.perf_counter()
 import os
+import sys
 import json
 import asyncio
-import discord
 import logging
-import importlib
-import inspect
-import aiohttp
 import argparse
-import certifi
-from pathlib import Path
 from datetime import datetime
-from translate import Translator
 from dotenv import load_dotenv
 from rss_sources.config import RSSConfig
-from rss_sources.base import BaseRSSSource
-from typing import List, Dict
-import ssl
-from aiohttp import ClientTimeout
-from aiohttp.client_exceptions import ClientError, ClientConnectorError
-from discord.http import HTTPClient, Route
-from discord.errors import DiscordServerError
+from rss_sources.base import BaseRSSSource, FeedParseError
+from rss_sources.entry import ParsedEntry
+from rss_sources.recorder import ResponseRecorder
+from rss_sources.coalescer import normalize_url
+from rss_sources.loader import load_rss_sources, create_source
+from rss_sources.watcher import ConfigWatcher
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+from dataclasses import dataclass, field
 from dns_resolver import dns_resolver
+from pipeline import Pipeline, Stage
+from state_store import StateStore
+from sharding import HashRing
+from log_config import setup_logging
+from collections import Counter
+import metrics
+from tracing import tracer, Trace
+from loop_monitor import loop_monitor
+from circuit_breaker import breakers
+from proxy_pool import proxy_pool
+from websub import websub
+from language import ZH, entry_language
+from message_planner import MESSAGE_LIMIT, TITLE_LIMIT, cut_at_sentence, plan_summary, split_sentences
+import multiprocessing
 from urllib.parse import urlparse
 
-class CustomHTTPClient(HTTPClient):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        
-        # 创建自定义SSL上下文
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-        
-        # 创建connector
-        self._connector = aiohttp.TCPConnector(
-            ssl=ssl_context,
-            force_close=False,
-            enable_cleanup_closed=True,
-            limit=10,
-            ttl_dns_cache=300,
-            use_dns_cache=True,
-            verify_ssl=False
-        )
-        
-        # 设置更长的超时时间
-        timeout = ClientTimeout(
-            total=120,
-            connect=30,
-            sock_connect=30,
-            sock_read=30
-        )
-        
-        # 创建session
-        self.__session = aiohttp.ClientSession(
-            connector=self._connector,
-            timeout=timeout
-        )
-
-    async def request(self, route: Route, **kwargs):
-        """重写请求方法，使用IP直接请求"""
-        retries = 3
-        last_error = None
-        
-        for attempt in range(retries):
-            try:
-                discord_ip = dns_resolver.get_discord_ip()
-                logger.debug(f"获取到Discord IP: {discord_ip}")
-                
-                # 构建使用IP的URL
-                url = f"https://{discord_ip}/api/v10{route.path}"
-                logger.debug(f"发起请求: URL={url}, method={route.method}")
-                
-                # 添加必要的headers
-                headers = kwargs.get('headers', {}) or {}
-                headers['Host'] = 'discord.com'
-                headers['Connection'] = 'keep-alive'
-                kwargs['headers'] = headers
-                
-                logger.debug(f"请求头: {headers}")
-                
-                # 直接使用session发起请求，而不是调用父类的request方法
-                async with self.__session.request(
-                    route.method, url, **kwargs
-                ) as response:
-                    # 读取响应内容
-                    data = await response.read()
-                    logger.debug(f"收到响应: status={response.status}")
-                    
-                    # 检查响应状态
-                    if response.status >= 500:
-                        raise DiscordServerError(response, data)
-                    
-                    return data
-                    
-            except asyncio.TimeoutError as e:
-                last_error = e
-                logger.warning(f"请求超时 (attempt {attempt + 1}/{retries}): {str(e)}")
-                if attempt < retries - 1:
-                    await asyncio.sleep(2 ** attempt)
-                continue
-            except (ClientError, ClientConnectorError) as e:
-                last_error = e
-                logger.warning(f"请求失败 (attempt {attempt + 1}/{retries}): {str(e)}")
-                if attempt < retries - 1:
-                    await asyncio.sleep(2 ** attempt)
-                continue
-            except Exception as e:
-                logger.error(f"未预期的错误: {str(e)}", exc_info=True)
-                raise
-        
-        logger.error(f"所有重试都失败了: {str(last_error)}")
-        raise last_error
-
-# 修改Discord的HTTP类
-discord.http.HTTPClient = CustomHTTPClient
-
-# 设置日志
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s %(levelname)-8s [%(name)s] %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
 logger = logging.getLogger(__name__)
 
-# 解析命令行参数
-parser = argparse.ArgumentParser(description='Discord RSS Bot')
-parser.add_argument('--env', type=str, default='dev', choices=['dev', 'prod'], help='运行环境 (dev/prod)')
-args = parser.parse_args()
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='Discord RSS Bot')
+    parser.add_argument('--env', type=str, default='dev', choices=['dev', 'prod'], help='运行环境 (dev/prod)')
+    parser.add_argument('--workers', type=int, default=1, help='处理RSS源的worker进程数，大于1时启用多进程模式')
+    parser.add_argument('--metrics-port', type=int, default=None, help='/metrics 指标端点的端口，覆盖config.json中的metrics.port')
+    parser.add_argument('--replay', nargs='?', const='', default=None, metavar='DIR',
+                        help='重放录制的RSS响应后退出，不连接Discord也不访问网络；默认使用config.json中recording.dir')
+    parser.add_argument('--replay-output', default=None, metavar='FILE', help='重放生成的消息保存为JSON，用于比较代码修改前后的输出')
+    parser.add_argument('--once', action='store_true',
+                        help='只处理一轮后退出，通过REST API或webhook发送，不连接Discord网关；适合cron定时运行')
+    return parser.parse_args(argv)
+
+class StartupTimer:
+    """记录启动各阶段的耗时"""
+
+    def __init__(self, begin: float):
+        self.begin = begin
+        self.phases = []
+        self.reported = False
 
-logger.info(f"当前环境: {args.env}")
+    def mark(self, phase: str):
+        """记录一个阶段完成的时间点"""
+        self.phases.append((phase, time.perf_counter()))
+
+    def report(self):
+        """输出启动耗时报告（只输出一次）"""
+        if self.reported:
+            return
+        self.reported = True
+        logger.info("启动耗时报告：")
+        last = self.begin
+        for phase, at in sorted(self.phases, key=lambda item: item[1]):
+            logger.info(f"- {phase}: +{at - last:.3f}s (累计 {at - self.begin:.3f}s)")
+            last = at
+
+startup_timer = StartupTimer(STARTUP_BEGIN)
+
+# Discord连接就绪后才允许发送，在main中创建
+discord_ready: Optional[asyncio.Event] = None
 
 # 加载环境变量
 load_dotenv()
 token = os.getenv('DISCORD_TOKEN')
 
+# 配置文件路径
+CONFIG_FILE = 'config.json'
+
 # 加载配置文件
 def load_config():
     try:
-        with open('config.json', 'r', encoding='utf-8') as f:
+        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
             return json.load(f)
     except Exception as e:
         logger.error(f"加载配置文件失败: {str(e)}")
         return None
 
-# 创建自定义的aiohttp会话
-class ProxyConnector(aiohttp.TCPConnector):
-    async def _wrap_create_connection(self, *args, **kwargs):
-        try:
-            logger.debug(f"开始建立连接: args={args}, kwargs={kwargs}")
-            return await super()._wrap_create_connection(*args, **kwargs)
-        except Exception as e:
-            logger.error(f"连接失败: {str(e)}", exc_info=True)
-            raise
+# 翻译器，第一次使用时创建
+translator = None
 
-# 创建自定义session类来记录请求
-class LoggedClientSession(aiohttp.ClientSession):
-    async def _request(self, *args, **kwargs):
-        try:
-            logger.debug(f"发起请求: method={args[0]}, url={args[1]}")
-            logger.debug(f"请求参数: {kwargs}")
-            response = await super()._request(*args, **kwargs)
-            logger.debug(f"请求完成: status={response.status}")
-            return response
-        except asyncio.TimeoutError:
-            logger.error(f"请求超时: method={args[0]}, url={args[1]}")
-            raise
-        except Exception as e:
-            logger.error(f"请求失败: {str(e)}", exc_info=True)
-            raise
-
-def load_rss_sources():
-    """动态加载所有RSS源类"""
-    rss_classes = []
-    rss_dir = Path(__file__).parent / 'rss_sources'
-    
-    # 加载配置
-    config = load_config()
-    if not config:
-        return []
-    
-    # 遍历rss_sources目录中的所有.py文件
-    for file_path in rss_dir.glob('*.py'):
-        if file_path.stem in ['__init__', 'base', 'config']:
-            continue
-            
-        try:
-            # 检查源是否启用
-            source_config = config['sources'].get(file_path.stem)
-            if not source_config or not source_config.get('enabled', True):
-                logger.info(f"跳过已禁用的RSS源: {file_path.stem}")
-                continue
-                
-            # 构建模块名
-            module_name = f"rss_sources.{file_path.stem}"
-            
-            # 导入模块
-            module = importlib.import_module(module_name)
-            
-            # 查找继承自BaseRSSSource的类
-            for name, obj in inspect.getmembers(module):
-                if (inspect.isclass(obj) and 
-                    issubclass(obj, BaseRSSSource) and 
-                    obj != BaseRSSSource):
-                    # 添加配置信息到类
-                    obj._config = source_config
-                    rss_classes.append(obj)
-                    logger.info(f"已加载RSS源: {obj.__name__}")
-        except Exception as e:
-            logger.error(f"加载RSS源 {file_path.stem} 时出错: {str(e)}")
-            
-    return rss_classes
+def get_translator():
+    """获取翻译器，延迟导入translate模块"""
+    global translator
+    if translator is None:
+        from translate import Translator
+        translator = Translator(to_lang="zh", from_lang="en", provider="mymemory")
+    return translator
 
 async def translate_with_timeout(text: str, timeout: int = 10) -> str:
     """带超时的翻译"""
     try:
-        # 如果文本是中文，直接返回
-        if any('\u4e00' <= char <= '\u9fff' for char in text):
-            return text
-            
         # 创建一个事件循环
         loop = asyncio.get_event_loop()
         # 在线程池中运行同步翻译函数
-        future = loop.run_in_executor(None, translator.translate, text)
+        future = loop.run_in_executor(None, get_translator().translate, text)
         # 等待翻译完成，带超时
-        result = await asyncio.wait_for(future, timeout=timeout)
+        with metrics.TRANSLATE_SECONDS.time(), tracer.span('translate_request', length=len(text)):
+            result = await asyncio.wait_for(future, timeout=timeout)
         
         # 检查翻译结果是否包含错误信息
         if result and not result.upper().startswith('MYMEMORY WARNING'):
             return result
+        metrics.TRANSLATE_ERRORS.inc(reason='quota')
         return text  # 如果有错误，返回原文
     except asyncio.TimeoutError:
+        metrics.TRANSLATE_ERRORS.inc(reason='timeout')
         logger.warning("翻译超时，使用原文")
         return text
     except Exception as e:
+        metrics.TRANSLATE_ERRORS.inc(reason='error')
         logger.warning(f"翻译错误: {str(e)}，使用原文")
         return text
 
 async def translate_text(text: str) -> str:
-    """翻译文本"""
+    """翻译文本，是否需要翻译由调用方按文章的语言判断"""
     try:
         if not text:
             return ""
             
-        # 如果文本是中文，直接返回
-        if any('\u4e00' <= char <= '\u9fff' for char in text):
-            return text
-            
-        # 分块翻译以避免过长
-        max_length = 500
-        chunks = [text[i:i + max_length] for i in range(0, len(text), max_length)]
+        # 按句子分块翻译以避免过长，不在句子中间切开
+        chunks = split_sentences(text, 500)
         translated_chunks = []
         
         # 并发翻译所有块
@@ -268,157 +157,736 @@ async def translate_text(text: str) -> str:
         logger.warning(f"翻译错误: {str(e)}，使用原文")
         return text
 
-async def send_to_discord(channel_id: int, entry: dict):
-    """发送消息到Discord"""
-    try:
-        channel = client.get_channel(channel_id)
-        if channel:
-            # 创建消息
-            message = f"**{entry['title']}**\n"
-            
-            # 如果标题不是中文，尝试翻译
-            if not any('\u4e00' <= char <= '\u9fff' for char in entry['title']):
-                title_zh = await translate_text(entry['title'])
-                if title_zh != entry['title']:
-                    message += f"{title_zh}\n"
-                    
-            message += "\n"
-            
-            # 如果摘要不是中文，尝试翻译
-            if entry.get('summary'):
-                if not any('\u4e00' <= char <= '\u9fff' for char in entry['summary']):
-                    summary_zh = await translate_text(entry['summary'])
-                    if summary_zh != entry['summary']:
-                        message += f"{summary_zh}\n\n"
-                else:
-                    message += f"{entry['summary']}\n\n"
-                    
-            if entry.get('link'):
-                message += f"链接: {entry['link']}"
-                
-            await channel.send(message)
-            logger.info(f"已发送文章：{entry['title']}")
-    except Exception as e:
-        logger.error(f"发送消息错误: {str(e)}")
+def plan_message(job: 'ArticleJob'):
+    """翻译之前按消息长度上限截断摘要，不翻译发不出去的内容"""
+    entry = job.entry
+    title = cut_at_sentence(entry.title, TITLE_LIMIT)
+    summary = plan_summary(title, entry.summary, entry.link, entry_language(entry) != ZH)
+    if len(summary) < len(entry.summary):
+        metrics.SUMMARY_TRUNCATED.inc(source=job.source.key)
+        entry.summary = summary
 
-async def setup_rss_sources() -> RSSConfig:
-    """设置RSS源"""
+async def translate_article(job: 'ArticleJob'):
+    """翻译文章标题和摘要（中文文章不翻译）"""
+    entry = job.entry
+    if entry_language(entry) == ZH:
+        return
+    job.title_zh = await translate_text(cut_at_sentence(entry.title, TITLE_LIMIT))
+    if entry.summary:
+        job.summary_zh = await translate_text(entry.summary)
+
+def render_message(job: 'ArticleJob', keep_original: bool = False) -> str:
+    """生成要发送的消息，译文比预留的长时截断摘要，保证不超过Discord的长度上限
+
+    没有译文的英文摘要默认不发送；keep_original为True时保留原文（重放时不翻译，用于检查清理结果）。
+    """
+    entry = job.entry
+    title = cut_at_sentence(entry.title, TITLE_LIMIT)
+    head = f"**{title}**\n"
+    if job.title_zh and job.title_zh != title:
+        head += f"{cut_at_sentence(job.title_zh, TITLE_LIMIT)}\n"
+    head += "\n"
+    tail = f"链接: {entry.link}" if entry.link else ""
+    summary = ""
+    if entry.summary:
+        if entry_language(entry) == ZH:
+            summary = entry.summary
+        elif job.summary_zh and job.summary_zh != entry.summary:
+            summary = job.summary_zh
+        elif keep_original:
+            summary = entry.summary
+    summary = cut_at_sentence(summary, MESSAGE_LIMIT - len(head) - len(tail) - 2)
+    if summary:
+        return f"{head}{summary}\n\n{tail}"
+    return head + tail
+
+async def send_to_discord(channel_id: int, message: str):
+    """发送消息到Discord，连接就绪前会等待"""
+    if discord_ready is not None:
+        await discord_ready.wait()
+    channel = client.get_channel(channel_id)
+    if channel is None:
+        raise RuntimeError(f"找不到频道 {channel_id}")
+    with metrics.SEND_SECONDS.time(), tracer.span('discord_send', channel=channel_id):
+        await channel.send(message)
+
+async def setup_rss_sources(source_filter: Optional[Callable[[str], bool]] = None) -> RSSConfig:
+    """设置RSS源，source_filter按config.json中的键过滤（多进程模式下按分片过滤）"""
     config = RSSConfig()
     
-    # 动态加载所有RSS源
-    rss_classes = load_rss_sources()
+    app_config = load_config()
+    if not app_config:
+        return config
     
-    # 实例化并添加所有RSS源
-    for rss_class in rss_classes:
+    # 启动时统一清理一次过期历史
+    BaseRSSSource.clean_history()
+    
+    config.set_routes(app_config.get('routes', {}))
+    
+    # 按配置加载RSS源，只导入需要自定义代码的模块
+    for key, rss_class, source_config in load_rss_sources(app_config['sources'], source_filter):
         try:
-            # 使用配置中的channel_ids
-            channel_ids = rss_class._config.get('channel_ids', [])
-            source = rss_class(channel_ids)
+            source = create_source(key, rss_class, source_config)
             config.add_source(source)
-            logger.info(f"已添加RSS源: {source.name} (频道: {channel_ids})")
+            logger.debug(f"已添加RSS源: {source.name} (频道: {source.channel_ids})")
         except Exception as e:
-            logger.error(f"添加RSS源 {rss_class.__name__} 时出错: {str(e)}")
+            logger.error(f"添加RSS源 {key} 时出错: {str(e)}")
     
+    logger.info(f"已加载 {len(config.get_sources())} 个RSS源")
     return config
 
-async def process_rss_feeds(config: RSSConfig):
-    """处理所有RSS源"""
+# 流水线各阶段的默认worker数量和队列长度，可在config.json的pipeline中覆盖
+PIPELINE_DEFAULTS = {
+    'fetch': {'workers': 8, 'queue_size': 100},
+    'parse': {'workers': 2, 'queue_size': 20},
+    'dedup': {'workers': 1, 'queue_size': 500},
+    'clean': {'workers': 2, 'queue_size': 200},
+    'translate': {'workers': 4, 'queue_size': 50},
+    'render': {'workers': 1, 'queue_size': 50},
+    'send': {'workers': 1, 'queue_size': 50},
+}
+
+@dataclass
+class ArticleJob:
+    """在流水线中流转的一篇文章"""
+    source: BaseRSSSource
+    entry: ParsedEntry
+    entry_id: str = ''
+    history_key: str = ''  # 历史记录、本轮去重和发件箱中的键，按源区分
+    title_zh: Optional[str] = None
+    summary_zh: Optional[str] = None
+    message: str = ''
+    channel_ids: List[str] = field(default_factory=list)
+    trace: Optional[Trace] = None  # 被采样时记录各阶段耗时
+    fetched_at: Optional[datetime] = None  # 重放时为录制时间，按它判断文章是否过期
+
+    @property
+    def title(self) -> str:
+        return self.entry.title or 'No Title'
+
+class RSSProcessor:
+    """按 抓取→解析→去重→清理→翻译→渲染→发送 分阶段处理RSS源"""
+
+    def __init__(self, config: RSSConfig, pipeline_config: Dict = None,
+                 sink: Optional[Callable[[ArticleJob], Awaitable[bool]]] = None,
+                 send: Optional[Callable[[int, str], Awaitable[Any]]] = None):
+        self.config = config
+        # 发送阶段的出口，默认直接发到Discord；多进程模式下写入发件箱
+        self.sink = sink or self.deliver
+        # deliver发送单条消息的方法，默认通过网关连接发送，也可以换成REST发送
+        self.send = send or send_to_discord
+        self.round_stats = {}
+        self._seen_ids = set()  # 本轮已进入流水线的文章，避免重复发送
+        self.duplicates_by_source = Counter()
+        stage_config = {name: dict(defaults) for name, defaults in PIPELINE_DEFAULTS.items()}
+        for name, overrides in (pipeline_config or {}).items():
+            if name in stage_config:
+                stage_config[name].update(overrides)
+        handlers = {
+            'fetch': self.fetch_stage,
+            'parse': self.parse_stage,
+            'dedup': self.dedup_stage,
+            'clean': self.clean_stage,
+            'translate': self.translate_stage,
+            'render': self.render_stage,
+            'send': self.send_stage,
+        }
+        self.pipeline = Pipeline([
+            Stage(name, handlers[name], on_error=self.stage_failed, **stage_config[name]) for name in PIPELINE_DEFAULTS
+        ])
+
+    def stage_failed(self, item, error: Exception):
+        """某个阶段处理出错时，这个源下一轮即使RSS没有变化也重新处理，出错的文章不会被跳过"""
+        if isinstance(item, ArticleJob):
+            source = item.source
+        elif isinstance(item, tuple):
+            source = item[0]
+        else:
+            source = item
+        source.forget_validators()
+
+    async def fetch_stage(self, source: BaseRSSSource):
+        # 采样在每次抓取时决定，被采样的RSS源的所有文章都会被追踪
+        if not breakers.allow(source.key, source.host):
+            # 连续失败的源或主机在退避期间直接跳过，不占用时间和连接
+            self.round_stats['circuit_open'] += 1
+            return None
+        trace = tracer.start_trace(f"{source.name} 抓取")
+        with tracer.span('fetch', trace, source=source.key):
+            content = await source.fetch_content()
+        if content is None:
+            return None
+        websub.check_feed(source.key, source.url, content)
+        return [(source, content, trace)]
+
+    async def push(self, key: str, content: str):
+        """WebSub推送的内容跳过抓取，直接进入解析阶段，之后与轮询到的文章走同样的去重和发送"""
+        source = self.config.get_source(key)
+        if source is None:
+            # 源已经从配置中移除
+            await websub.unsubscribe(key)
+            return
+        trace = tracer.start_trace(f"{source.name} 推送")
+        await self.pipeline.submit_to('parse', (source, content, trace))
+
+    async def parse_stage(self, item):
+        source, content, trace = item
+        # feedparser是CPU密集的同步调用，放到线程池避免阻塞事件循环；
+        # 在线程中直接转换成ParsedEntry，整个feed对象不会留在流水线里
+        with metrics.PARSE_SECONDS.time(source=source.key), tracer.span('parse', trace, bytes=len(content)):
+            try:
+                entries = await source.parse_content(content)
+            except FeedParseError as e:
+                # 返回的不是RSS（例如错误页面）
+                logger.warning("RSS源 [%s] %s", source.name, e)
+                breakers.failure(source.key)
+                # 下一轮重新下载和解析，同样的错误内容不能当作“没有变化”而算作成功
+                source.forget_validators()
+                return None
+            except Exception:
+                # 由stage_failed清除源的条件请求头
+                breakers.failure(source.key)
+                raise
+        breakers.success(source.key)
+        if not entries:
+            logger.debug("RSS源 [%s] 当前没有文章", source.name)
+            return None
+        self.round_stats['total'] += len(entries)
+        jobs = []
+        for entry in entries:
+            job = ArticleJob(source=source, entry=entry)
+            job.trace = tracer.child_trace(trace, f"{source.name}: {job.title}")
+            jobs.append(job)
+        return jobs
+
+    async def dedup_stage(self, job: ArticleJob):
+        with tracer.span('dedup', job.trace):
+            return await self._dedup(job)
+
+    async def _dedup(self, job: ArticleJob):
+        entry = job.entry
+        logger.debug("处理来自 %s 的文章: %s", job.source.name, job.title)
+        
+        # 检查是否过期
+        published_time = entry.published_parsed
+        if published_time:
+            entry_time = datetime(*published_time[:6])
+            if ((job.fetched_at or datetime.now()) - entry_time).total_seconds() > 72 * 3600:
+                logger.debug("跳过过期文章：%s", job.title)
+                self.round_stats['expired'] += 1
+                metrics.ENTRIES.inc(source=job.source.key, result='expired')
+                return None
+        
+        # 检查是否重复
+        job.entry_id = job.source.get_entry_id(entry)
+        job.history_key = job.source.history_key(job.entry_id)
+        if job.history_key in self._seen_ids or job.source.is_sent(job.entry_id):
+            # 重复文章每轮都会出现，只在本轮结束时按源汇总
+            self.round_stats['duplicate'] += 1
+            self.duplicates_by_source[job.source.name] += 1
+            metrics.ENTRIES.inc(source=job.source.key, result='duplicate')
+            return None
+        self._seen_ids.add(job.history_key)
+        metrics.ENTRIES.inc(source=job.source.key, result='new')
+        return [job]
+
+    async def clean_stage(self, job: ArticleJob):
+        with metrics.CLEAN_SECONDS.time(source=job.source.key), tracer.span('parse_entry', job.trace):
+            parsed = await job.source.parse_entry(job.entry)
+        if parsed is None:
+            # 清理出错，下一轮重新处理这个源
+            job.source.forget_validators()
+            return None
+        job.entry = parsed
+        # 翻译之前路由，没有频道要推送的文章不再翻译
+        with tracer.span('route', job.trace):
+            job.channel_ids = self.config.route(
+                job.source, f"{parsed.title}\n{parsed.summary}")
+            if not job.channel_ids:
+                logger.debug("文章没有匹配的频道 [%s]: %s", job.source.name, job.title)
+                self.round_stats['unrouted'] += 1
+                metrics.ENTRIES.inc(source=job.source.key, result='unrouted')
+                await job.source.mark_as_sent(job.entry)
+                return None
+        plan_message(job)
+        return [job]
+
+    async def translate_stage(self, job: ArticleJob):
+        with tracer.span('translate', job.trace):
+            await translate_article(job)
+        return [job]
+
+    async def render_stage(self, job: ArticleJob):
+        with tracer.span('render', job.trace):
+            job.message = render_message(job)
+        return [job]
+
+    async def send_stage(self, job: ArticleJob):
+        with tracer.span('send', job.trace, channels=job.channel_ids):
+            if await self.sink(job):
+                self.round_stats['processed'] += 1
+        return None
+
+    async def deliver(self, job: ArticleJob) -> bool:
+        """发送到文章路由到的所有频道，全部成功才标记为已发送"""
+        success = True
+        for channel_id in job.channel_ids:
+            try:
+                await self.send(int(channel_id), job.message)
+                logger.info("已发送文章到频道 %s: %s", channel_id, job.title)
+            except Exception as e:
+                success = False
+                metrics.SEND_ERRORS.inc()
+                logger.error(f"发送文章到频道 {channel_id} 失败: {str(e)}")
+        
+        if success:
+            await job.source.mark_as_sent(job.entry)
+        else:
+            # 下一轮即使RSS没有变化也要重新处理，重试发送
+            job.source.forget_validators()
+        return success
+
+    async def run_round(self, round_count: int) -> Dict:
+        """执行一轮处理并输出统计信息，返回本轮的统计"""
+        self.round_stats = {'total': 0, 'processed': 0, 'expired': 0, 'duplicate': 0, 'unrouted': 0,
+                            'circuit_open': 0, 'websub': 0}
+        self._seen_ids = set()
+        self.duplicates_by_source = Counter()
+        self.pipeline.reset_stats()
+        start = time.monotonic()
+        
+        logger.info(f"开始第 {round_count} 轮RSS处理...")
+        # URL相同的源相邻提交，几乎同时抓取，可以共用一次下载和解析
+        groups: Dict[str, List[BaseRSSSource]] = {}
+        for source in self.config.get_sources():
+            groups.setdefault(normalize_url(source.url), []).append(source)
+        for group in groups.values():
+            for source in group:
+                if not websub.should_poll(source.key):
+                    # 已通过WebSub订阅的源只低频轮询
+                    self.round_stats['websub'] += 1
+                    continue
+                await self.pipeline.submit(source)
+        if round_count == 1:
+            # 首轮记录各阶段完成时间，写入启动耗时报告
+            await self.pipeline.drain(lambda stage: startup_timer.mark(f"首轮{stage}完成"))
+            startup_timer.report()
+        else:
+            await self.pipeline.drain()
+        elapsed = time.monotonic() - start
+        metrics.ROUND_SECONDS.set(elapsed)
+        checked = self.round_stats['total'] - self.round_stats['expired']
+        if checked:
+            metrics.DEDUP_HIT_RATIO.set(self.round_stats['duplicate'] / checked)
+        
+        # 输出本轮处理的统计信息
+        logger.info(f"第 {round_count} 轮RSS处理完成！耗时 {elapsed:.1f} 秒，统计信息：")
+        logger.info(f"- 总文章数：{self.round_stats['total']}")
+        logger.info(f"- 新发送文章：{self.round_stats['processed']}")
+        logger.info(f"- 过期文章：{self.round_stats['expired']}")
+        logger.info(f"- 重复文章：{self.round_stats['duplicate']}")
+        if self.duplicates_by_source:
+            logger.info("  按源: %s", ', '.join(
+                f"{name} {count}" for name, count in self.duplicates_by_source.most_common()))
+        logger.info(f"- 未匹配频道：{self.round_stats['unrouted']}")
+        logger.info(f"- 熔断跳过的RSS源：{self.round_stats['circuit_open']}")
+        for line in breakers.summary():
+            logger.info(f"  {line}")
+        if websub.enabled:
+            logger.info(f"- WebSub订阅跳过轮询的RSS源：{self.round_stats['websub']}")
+            for line in websub.summary():
+                logger.info(f"  {line}")
+        if proxy_pool.uses_proxies:
+            logger.info("- 代理：")
+            for line in proxy_pool.summary():
+                logger.info(f"  {line}")
+        if loop_monitor.running:
+            logger.info(f"- {loop_monitor.summary(reset=True)}")
+        logger.info("各阶段统计：")
+        for line in self.pipeline.report(elapsed):
+            logger.info(line)
+        return {'round': round_count, 'elapsed': elapsed, **self.round_stats}
+
+async def process_rss_feeds(config: RSSConfig, sink: Optional[Callable[[ArticleJob], Awaitable[bool]]] = None,
+                            send: Optional[Callable[[int, str], Awaitable[Any]]] = None,
+                            rounds: Optional[int] = None, interval: float = 300,
+                            pipeline_config: Optional[Dict] = None) -> List[Dict]:
+    """处理所有RSS源，rounds为None时一直运行，否则执行指定轮数后返回各轮统计
+
+    pipeline_config覆盖config.json中的pipeline。
+    """
+    app_config = load_config() or {}
+    breaker_config = app_config.get('circuit_breaker', {})
+    breakers.configure(breaker_config.get('failure_threshold', 3), breaker_config.get('base_delay', 300),
+                       breaker_config.get('max_delay', 6 * 3600), breaker_config.get('jitter', 0.2))
+    processor = RSSProcessor(config, pipeline_config or app_config.get('pipeline'), sink=sink, send=send)
+    processor.pipeline.start()
+    metrics.registry.add_collector(processor.pipeline.collect_metrics)
+    if websub.enabled:
+        await websub.start(processor.push)
     round_count = 0
+    results = []
+    try:
+        while rounds is None or round_count < rounds:
+            try:
+                round_count += 1
+                results.append(await processor.run_round(round_count))
+            except Exception as e:
+                logger.error(f"RSS处理主循环错误: {str(e)}")
+            
+            if rounds is not None and round_count >= rounds:
+                break
+            # 等待一段时间再次获取
+            logger.info(f"等待 {interval:.0f} 秒后开始下一轮处理...")
+            await asyncio.sleep(interval)
+        return results
+    finally:
+        metrics.registry.remove_collector(processor.pipeline.collect_metrics)
+        if websub.enabled:
+            await websub.stop()
+        await processor.pipeline.stop()
+
+class ReplayProcessor(RSSProcessor):
+    """用录制的响应重放 解析→去重→清理→路由→渲染，不访问网络；翻译和发送都跳过"""
+
+    def __init__(self, config: RSSConfig, recorder: ResponseRecorder, pipeline_config: Dict = None):
+        super().__init__(config, pipeline_config, sink=self.collect)
+        self.recorder = recorder
+        self.recordings = 0
+        # 源的键 -> {文章ID: 消息}
+        self.messages: Dict[str, Dict[str, str]] = {}
+
+    async def fetch_stage(self, source: BaseRSSSource):
+        # 一个源的所有录制按时间顺序进入流水线，旧录制中出现过的文章算作重复
+        loop = asyncio.get_running_loop()
+        recordings = await loop.run_in_executor(None, lambda: list(self.recorder.iter(source.key)))
+        items = []
+        for recording in recordings:
+            trace = tracer.start_trace(f"{source.name} 重放 {recording.fetched_at:%Y-%m-%d %H:%M:%S}")
+            items.append((source, recording.text(), trace, recording.fetched_at))
+        self.recordings += len(items)
+        return items
+
+    async def parse_stage(self, item):
+        source, content, trace, fetched_at = item
+        jobs = await super().parse_stage((source, content, trace))
+        for job in jobs or ():
+            job.fetched_at = fetched_at
+        return jobs
+
+    async def translate_stage(self, job: ArticleJob):
+        return [job]
+
+    async def render_stage(self, job: ArticleJob):
+        with tracer.span('render', job.trace):
+            job.message = render_message(job, keep_original=True)
+        return [job]
+
+    async def collect(self, job: ArticleJob) -> bool:
+        self.messages.setdefault(job.source.key, {})[job.entry_id] = job.message
+        return True
+
+async def replay_main(args: argparse.Namespace):
+    """重放录制的RSS响应，用于调整清理规则、排查解析问题和性能分析"""
+    app_config = load_config() or {}
+    directory = args.replay or app_config.get('recording', {}).get('dir', 'recordings')
+    recorder = ResponseRecorder(directory)
+    recorded = set(recorder.keys())
+    if not recorded:
+        logger.error(f"{directory} 中没有录制的RSS响应")
+        return
+    # 从空的历史记录开始，也不写回文件，每次重放的结果都一样
+    BaseRSSSource.use_memory_history()
+    setup_tracing()
+    setup_loop_monitor()
+    config = await setup_rss_sources(lambda key: key in recorded)
+    processor = ReplayProcessor(config, recorder, app_config.get('pipeline'))
+    processor.pipeline.start()
+    try:
+        stats = await processor.run_round(1)
+    finally:
+        await processor.pipeline.stop()
+        tracer.close()
+        await loop_monitor.stop()
+    logger.info(f"重放了 {len(config.get_sources())} 个RSS源的 {processor.recordings} 份录制，"
+                f"耗时 {stats['elapsed']:.2f}s，生成 {stats['processed']} 条消息")
+    if args.replay_output:
+        with open(args.replay_output, 'w', encoding='utf-8') as f:
+            json.dump(processor.messages, f, ensure_ascii=False, indent=2, sort_keys=True)
+        logger.info(f"消息已保存到 {args.replay_output}")
+
+# --once模式在两次运行之间保存的ETag/Last-Modified和内容摘要
+FETCH_STATE_FILE = 'fetch_state.json'
+
+def load_fetch_state(config: RSSConfig):
+    """恢复各RSS源上次运行的条件请求头和内容摘要，没有变化的源直接得到304"""
+    try:
+        with open(FETCH_STATE_FILE, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return
+    except Exception as e:
+        logger.warning(f"读取 {FETCH_STATE_FILE} 失败: {str(e)}")
+        return
+    for source in config.get_sources():
+        saved = state.get(source.key)
+        # URL改过的源重新下载
+        if saved and saved.get('url') == source.url:
+            source.etag = saved.get('etag')
+            source.last_modified = saved.get('last_modified')
+            source.content_hash = saved.get('content_hash')
+
+def save_fetch_state(config: RSSConfig):
+    """保存各RSS源的条件请求头和内容摘要，先写临时文件再改名"""
+    state = {source.key: {'url': source.url, 'etag': source.etag, 'last_modified': source.last_modified,
+                          'content_hash': source.content_hash}
+             for source in config.get_sources()}
+    tmp_path = FETCH_STATE_FILE + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, FETCH_STATE_FILE)
+    except Exception as e:
+        logger.error(f"保存 {FETCH_STATE_FILE} 失败: {str(e)}")
+
+async def once_main(args: argparse.Namespace) -> int:
+    """单次运行：并发抓取所有RSS源一轮，通过REST API或webhook发送新文章，保存状态后退出
+
+    不连接Discord网关，不启动指标端点、事件循环监控和后台任务，适合cron或serverless定时调用。
+    """
+    from discord_rest import DiscordRESTSender
+    app_config = load_config() or {}
+    setup_tracing()
+    setup_recording()
+    setup_proxies(args.env)
+    config = await setup_rss_sources()
+    load_fetch_state(config)
+    startup_timer.mark('加载RSS源')
+    # 每个RSS源一个抓取worker，整轮的耗时接近最慢的那个源
+    pipeline_config = {name: dict(overrides) for name, overrides in (app_config.get('pipeline') or {}).items()}
+    fetch_config = pipeline_config.setdefault('fetch', {})
+    fetch_config['workers'] = max(fetch_config.get('workers', PIPELINE_DEFAULTS['fetch']['workers']),
+                                  min(len(config.get_sources()), 64))
+    sender = DiscordRESTSender(token, webhooks=app_config.get('webhooks'))
+    try:
+        results = await process_rss_feeds(config, send=sender.send, rounds=1, pipeline_config=pipeline_config)
+    finally:
+        # 历史记录在每篇文章发送后已经保存
+        save_fetch_state(config)
+        await sender.close()
+        await BaseRSSSource.close_session()
+        tracer.close()
+    elapsed = time.perf_counter() - STARTUP_BEGIN
+    processed = results[0]['processed'] if results else 0
+    logger.info(f"单次运行完成，发送 {processed} 篇文章，总耗时 {elapsed:.2f}s")
+    return 0 if results else 1
+
+def get_metrics_address(args: argparse.Namespace) -> Optional[tuple]:
+    """指标端点的地址，命令行优先，没有配置端口时不启动"""
+    metrics_config = (load_config() or {}).get('metrics', {})
+    port = args.metrics_port if args.metrics_port is not None else metrics_config.get('port')
+    if not port:
+        return None
+    return metrics_config.get('host', '127.0.0.1'), int(port)
+
+def setup_tracing(worker_index: Optional[int] = None):
+    """按config.json的tracing开启追踪，每个进程写自己的文件"""
+    tracing_config = (load_config() or {}).get('tracing', {})
+    if not tracing_config.get('enabled'):
+        return
+    path = tracing_config.get('path', 'trace.json')
+    if worker_index is not None:
+        root, ext = os.path.splitext(path)
+        path = f"{root}.worker{worker_index}{ext}"
+    tracer.configure(path, tracing_config.get('sample_rate', 0.1))
+
+def setup_loop_monitor():
+    """按config.json的loop_monitor启动事件循环延迟监控，默认开启"""
+    monitor_config = (load_config() or {}).get('loop_monitor', {})
+    if not monitor_config.get('enabled', True):
+        return
+    loop_monitor.interval = monitor_config.get('interval_ms', 100) / 1000
+    loop_monitor.threshold = monitor_config.get('threshold_ms', 250) / 1000
+    loop_monitor.start()
+
+def setup_recording():
+    """按config.json的recording录制RSS源的原始响应"""
+    recording_config = (load_config() or {}).get('recording', {})
+    if not recording_config.get('enabled'):
+        return
+    BaseRSSSource.use_recorder(ResponseRecorder(recording_config.get('dir', 'recordings'),
+                                                recording_config.get('keep', 20)))
+
+def setup_proxies(env: str):
+    """按--env从config.json的proxies中选择代理列表；没有配置时使用HTTP_PROXY环境变量，都没有时直连"""
+    proxy_config = (load_config() or {}).get('proxies', {})
+    urls = proxy_config.get(env)
+    if urls is None:
+        urls = [os.environ['HTTP_PROXY']] if os.environ.get('HTTP_PROXY') else []
+    health_config = proxy_config.get('health_check', {})
+    proxy_pool.configure(urls, proxy_config.get('max_attempts', 2), health_config.get('url'),
+                         health_config.get('interval', 60), health_config.get('timeout', 5))
+    proxy_pool.start_health_checks()
+
+def setup_websub():
+    """按config.json的websub开启WebSub订阅，只在单进程模式下使用"""
+    websub_config = (load_config() or {}).get('websub', {})
+    if not websub_config.get('enabled'):
+        return
+    if not websub_config.get('callback_url'):
+        logger.warning("websub.callback_url 没有配置，不开启WebSub")
+        return
+    websub.configure(websub_config['callback_url'], websub_config.get('host', '0.0.0.0'),
+                     websub_config.get('port', 8090), websub_config.get('lease_seconds', 86400),
+                     websub_config.get('poll_interval', 3600))
+
+# 多进程模式下共享的状态数据库
+STATE_DB = 'state.db'
+# 发件箱消息的最大发送次数
+# 发件箱发送失败后的重试间隔，每次失败翻倍，最长OUTBOX_MAX_DELAY秒
+OUTBOX_RETRY_DELAY = 5
+OUTBOX_MAX_DELAY = 3600
+
+async def run_worker(index: int, count: int, env: str, metrics_address: Optional[tuple] = None):
+    """worker进程：处理一致性哈希分到本进程的RSS源，新文章写入发件箱"""
+    metrics_runner = None
+    if metrics_address:
+        # 每个worker使用独立的端口：主进程端口 + 1 + 序号
+        host, port = metrics_address
+        metrics_runner = await metrics.start_metrics_server(port + 1 + index, host)
+    setup_tracing(index)
+    setup_loop_monitor()
+    setup_recording()
+    setup_proxies(env)
+    store = StateStore(STATE_DB)
+    BaseRSSSource.use_store(store)
+    ring = HashRing(list(range(count)))
+    source_filter = lambda key: ring.get_node(key) == index
+    config = await setup_rss_sources(source_filter)
+    logger.info(f"worker {index}/{count} 负责 {len(config.get_sources())} 个RSS源: "
+                f"{[source.name for source in config.get_sources()]}")
+    
+    await dns_resolver.prefetch([urlparse(source.url).hostname for source in config.get_sources()])
+    dns_resolver.start_refresh()
+    
+    async def enqueue(job: ArticleJob) -> bool:
+        info = {'title': job.title, 'link': job.entry.link}
+        if store.enqueue(job.history_key, job.source.name, job.channel_ids, job.message, info):
+            logger.info("文章已写入发件箱 [%s]: %s", job.source.name, job.title)
+            return True
+        return False
+    
+    # 配置变更时只重新加载本进程负责的RSS源
+    watcher_task = asyncio.create_task(ConfigWatcher(CONFIG_FILE, config, source_filter).run())
+    try:
+        await process_rss_feeds(config, sink=enqueue)
+    finally:
+        watcher_task.cancel()
+        await dns_resolver.stop_refresh()
+        await BaseRSSSource.close_session()
+        store.close()
+        tracer.close()
+        await loop_monitor.stop()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+
+def worker_main(index: int, count: int, env: str, metrics_address: Optional[tuple] = None):
+    """worker进程入口"""
+    setup_logging((load_config() or {}).get('logging'))
+    asyncio.run(run_worker(index, count, env, metrics_address))
+
+def start_workers(count: int, env: str, metrics_address: Optional[tuple] = None) -> List[multiprocessing.Process]:
+    """启动worker进程"""
+    ctx = multiprocessing.get_context('spawn')
+    processes = []
+    for index in range(count):
+        process = ctx.Process(target=worker_main, args=(index, count, env, metrics_address), name=f"rss-worker-{index}", daemon=True)
+        process.start()
+        processes.append(process)
+        logger.info(f"已启动worker进程 {process.name} (pid={process.pid})")
+    return processes
+
+async def drain_outbox(store: StateStore):
+    """唯一持有Discord连接的进程：把发件箱中的消息发送出去"""
     while True:
         try:
-            round_count += 1
-            total_articles = 0
-            processed_articles = 0
-            expired_articles = 0
-            duplicate_articles = 0
-            
-            logger.info(f"开始第 {round_count} 轮RSS处理...")
+            messages = store.pending()
+            if not messages:
+                await asyncio.sleep(1)
+                continue
             
-            for source in config.get_sources():
+            for message in messages:
                 try:
-                    feed = await source.fetch_feed()
-                    if feed and hasattr(feed, 'entries'):
-                        total_articles += len(feed.entries)
-                        for entry in feed.entries:
-                            try:
-                                # 获取标题
-                                title = getattr(entry, 'title', 'No Title') if not isinstance(entry, dict) else entry.get('title', 'No Title')
-                                logging.info(f"处理来自 {source.name} 的文章: {title}")
-                                
-                                # 检查是否过期
-                                published_time = None
-                                if isinstance(entry, dict):
-                                    if entry.get('published_parsed'):
-                                        published_time = entry['published_parsed']
-                                    elif entry.get('updated_parsed'):
-                                        published_time = entry['updated_parsed']
-                                else:
-                                    if hasattr(entry, 'published_parsed'):
-                                        published_time = entry.published_parsed
-                                    elif hasattr(entry, 'updated_parsed'):
-                                        published_time = entry.updated_parsed
-                                
-                                if published_time:
-                                    now = datetime.now()
-                                    entry_time = datetime(*published_time[:6])
-                                    time_diff = now - entry_time
-                                    if time_diff.total_seconds() > 72 * 3600:
-                                        logging.info(f"跳过过期文章：{title}")
-                                        expired_articles += 1
-                                        continue
-                                
-                                # 检查是否重复
-                                entry_id = source.get_entry_id(entry)
-                                if entry_id in source.history:
-                                    logging.info(f"跳过重复文章 [{source.name}]: {title}")
-                                    duplicate_articles += 1
-                                    continue
-                                
-                                # 处理新文章
-                                parsed_entry = await source.parse_entry(entry)
-                                if parsed_entry:
-                                    success = True
-                                    for channel_id in source.channel_ids:
-                                        try:
-                                            await send_to_discord(int(channel_id), parsed_entry)
-                                            logging.info(f"已发送文章到频道 {channel_id}: {title}")
-                                        except Exception as e:
-                                            success = False
-                                            logging.error(f"发送文章到频道 {channel_id} 失败: {str(e)}")
-                                    
-                                    if success:
-                                        await source.mark_as_sent(entry)
-                                        processed_articles += 1
-                                        
-                            except Exception as e:
-                                logging.error(f"处理文章错误 [{source.name}] {title}: {str(e)}")
-                                continue
+                    await send_to_discord(int(message.channel_id), message.message)
+                    store.complete(message)
+                    logger.info(f"已发送文章到频道 {message.channel_id}: {message.info.get('title')}")
                 except Exception as e:
-                    logging.error(f"处理RSS源 {source.name} 时出错: {str(e)}")
-                    continue
-                    
-            # 输出本轮处理的统计信息
-            logger.info(f"第 {round_count} 轮RSS处理完成！统计信息：")
-            logger.info(f"- 总文章数：{total_articles}")
-            logger.info(f"- 新发送文章：{processed_articles}")
-            logger.info(f"- 过期文章：{expired_articles}")
-            logger.info(f"- 重复文章：{duplicate_articles}")
-            logger.info("等待5分钟后开始下一轮处理...")
-            
+                    metrics.SEND_ERRORS.inc()
+                    # 与单进程模式一样一直重试，不丢弃消息
+                    delay = store.retry(message, OUTBOX_RETRY_DELAY, OUTBOX_MAX_DELAY)
+                    logger.warning(f"发送文章到频道 {message.channel_id} 失败（第 {message.attempts + 1} 次），"
+                                   f"{delay:.0f} 秒后重试: {str(e)}")
         except Exception as e:
-            logging.error(f"RSS处理主循环错误: {str(e)}")
-        
-        # 等待一段时间再次获取
-        await asyncio.sleep(300)  # 5分钟
+            logger.error(f"发件箱处理错误: {str(e)}", exc_info=True)
+            await asyncio.sleep(5)
 
-async def main():
+async def main(args: argparse.Namespace):
     """主函数"""
-    global client
+    global client, discord_ready
+    
+    logger.info(f"当前环境: {args.env}")
+    startup_timer.mark('模块导入')
+    discord_ready = asyncio.Event()
+    
+    processes = []
+    store = None
+    tasks = []
+    metrics_runner = None
+    metrics_address = get_metrics_address(args)
+    if metrics_address:
+        metrics_runner = await metrics.start_metrics_server(metrics_address[1], metrics_address[0])
+    setup_tracing()
+    setup_loop_monitor()
+    setup_recording()
+    if args.workers > 1:
+        # 多进程模式：RSS源分散到worker进程，本进程只负责Discord连接和发件箱
+        store = StateStore(STATE_DB)
+        if store.history_count() == 0:
+            store.import_history(BaseRSSSource.load_history())
+        processes = start_workers(args.workers, args.env, metrics_address)
+        startup_timer.mark('启动worker进程')
+        feed_hosts = []
+        # 发件箱在Discord就绪前只会等待
+        tasks.append(asyncio.create_task(drain_outbox(store)))
+    else:
+        setup_proxies(args.env)
+        setup_websub()
+        # 设置RSS源
+        config = await setup_rss_sources()
+        startup_timer.mark('加载RSS源')
+        feed_hosts = [urlparse(source.url).hostname for source in config.get_sources()]
+        # 不等Discord登录，先开始第一轮抓取、解析和去重，发送阶段会等待连接就绪
+        tasks.append(asyncio.create_task(process_rss_feeds(config)))
+        # 监视配置文件，变更时不需要重启
+        tasks.append(asyncio.create_task(ConfigWatcher(CONFIG_FILE, config).run()))
     
-    # 首先解析Discord的域名
-    logger.info("开始解析Discord域名...")
-    resolved_hosts = await dns_resolver.resolve_discord_hosts()
+    # 并发解析Discord域名和所有RSS源的域名，抓取时不用等待冷DNS查询
+    logger.info("开始解析Discord和RSS源域名...")
+    resolved_hosts, resolved_feed_hosts = await asyncio.gather(
+        dns_resolver.resolve_discord_hosts(),
+        dns_resolver.prefetch(feed_hosts)
+    )
     logger.info(f"域名解析结果: {resolved_hosts}")
+    logger.info(f"RSS源域名解析结果: {resolved_feed_hosts}")
+    # 在TTL过期前后台刷新，请求不会等待DNS
+    dns_resolver.start_refresh()
+    startup_timer.mark('DNS解析')
+    
+    # discord.py较重，用到时才导入
+    import discord
+    from discord_http import install_http_client
+    install_http_client()
+    startup_timer.mark('导入discord')
     
     # 创建Discord客户端
     intents = discord.Intents.default()
@@ -433,14 +901,11 @@ async def main():
     
     @client.event
     async def on_ready():
-        """Bot就绪时的处理"""
+        """Bot就绪时的处理，断线重连后也会触发"""
         logger.info(f'Bot已登录为：{client.user}')
-        
-        # 设置RSS源
-        config = await setup_rss_sources()
-        
-        # 启动RSS处理
-        asyncio.create_task(process_rss_feeds(config))
+        if not discord_ready.is_set():
+            startup_timer.mark('Discord就绪')
+            discord_ready.set()
     
     try:
         # 运行Discord客户端
@@ -448,10 +913,28 @@ async def main():
     except Exception as e:
         logger.error(f"Discord客户端启动失败: {str(e)}", exc_info=True)
         raise
-
-# 创建翻译器
-translator = Translator(to_lang="zh", from_lang="en", provider="mymemory")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await dns_resolver.stop_refresh()
+        await BaseRSSSource.close_session()
+        for process in processes:
+            process.terminate()
+        if store is not None:
+            store.close()
+        tracer.close()
+        await loop_monitor.stop()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
 
 # 运行主函数
 if __name__ == "__main__":
-    asyncio.run(main())
+    setup_logging((load_config() or {}).get('logging'))
+    args = parse_args()
+    if args.replay is not None:
+        asyncio.run(replay_main(args))
+    elif args.once:
+        sys.exit(asyncio.run(once_main(args)))
+    else:
+        asyncio.run(main(args))
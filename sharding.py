@@ -0,0 +1,31 @@
+import bisect
+import hashlib
+from typing import Dict, List
+
+class HashRing:
+    """一致性哈希环，增减节点时只有少量key需要迁移"""
+
+    def __init__(self, nodes: List[int], replicas: int = 100):
+        self.replicas = replicas
+        self._ring: List[int] = []
+        self._nodes: Dict[int, int] = {}
+        for node in nodes:
+            self.add_node(node)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int(hashlib.md5(key.encode()).hexdigest()[:16], 16)
+
+    def add_node(self, node: int):
+        """添加节点（每个节点在环上有多个虚拟节点）"""
+        for i in range(self.replicas):
+            point = self._hash(f"{node}#{i}")
+            bisect.insort(self._ring, point)
+            self._nodes[point] = node
+
+    def get_node(self, key: str) -> int:
+        """获取key所属的节点"""
+        if not self._ring:
+            raise RuntimeError("哈希环中没有节点")
+        index = bisect.bisect(self._ring, self._hash(key)) % len(self._ring)
+        return self._nodes[self._ring[index]]
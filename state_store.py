@@ -0,0 +1,221 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import MutableMapping
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class OutboxMessage:
+    """待发送的消息"""
+    id: int
+    entry_id: str
+    source: str
+    channel_id: str
+    message: str
+    info: Dict
+    attempts: int
+
+class StateStore:
+    """基于SQLite的共享状态，多个worker进程共用去重历史和发件箱"""
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS history (
+            entry_id TEXT PRIMARY KEY,
+            title TEXT,
+            link TEXT,
+            timestamp REAL NOT NULL,
+            source TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history(timestamp);
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            entry_id TEXT NOT NULL,
+            source TEXT,
+            channel_id TEXT NOT NULL,
+            message TEXT NOT NULL,
+            info TEXT,
+            created REAL NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL DEFAULT 0,
+            UNIQUE(entry_id, channel_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_outbox_entry ON outbox(entry_id);
+        CREATE TABLE IF NOT EXISTS delivered (
+            entry_id TEXT NOT NULL,
+            channel_id TEXT NOT NULL,
+            timestamp REAL NOT NULL,
+            PRIMARY KEY(entry_id, channel_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_delivered_timestamp ON delivered(timestamp);
+    '''
+
+    def __init__(self, path: str = 'state.db'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        # WAL模式下读写互不阻塞，适合多进程并发访问
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(self.SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """旧版本的数据库没有next_attempt_at列"""
+        columns = [row[1] for row in self._conn.execute('PRAGMA table_info(outbox)')]
+        if 'next_attempt_at' not in columns:
+            self._conn.execute('ALTER TABLE outbox ADD COLUMN next_attempt_at REAL NOT NULL DEFAULT 0')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox(next_attempt_at)')
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    def _execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    # ---- 去重历史 ----
+
+    def history_count(self) -> int:
+        """历史记录条数"""
+        return self._execute('SELECT COUNT(*) FROM history').fetchone()[0]
+
+    def import_history(self, history: Dict[str, Dict]):
+        """从JSON历史记录导入"""
+        rows = [
+            (entry_id, info.get('title'), info.get('link'), info.get('timestamp', 0), info.get('source'))
+            for entry_id, info in history.items()
+        ]
+        with self._lock:
+            self._conn.execute('BEGIN')
+            self._conn.executemany('INSERT OR IGNORE INTO history VALUES (?, ?, ?, ?, ?)', rows)
+            self._conn.execute('COMMIT')
+        logger.info(f"已导入 {len(rows)} 条历史记录到 {self.path}")
+
+    def get_entry(self, entry_id: str) -> Optional[Dict]:
+        """获取一条历史记录"""
+        row = self._execute(
+            'SELECT title, link, timestamp, source FROM history WHERE entry_id = ?', (entry_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'title': row[0], 'link': row[1], 'timestamp': row[2], 'source': row[3]}
+
+    def has_entry(self, entry_id: str) -> bool:
+        """文章是否已发送或已在发件箱中"""
+        row = self._execute(
+            'SELECT 1 FROM history WHERE entry_id = ? UNION ALL SELECT 1 FROM outbox WHERE entry_id = ? LIMIT 1',
+            (entry_id, entry_id)
+        ).fetchone()
+        return row is not None
+
+    def mark_sent(self, entry_id: str, info: Dict):
+        """记录已发送的文章"""
+        self._execute(
+            'INSERT OR REPLACE INTO history VALUES (?, ?, ?, ?, ?)',
+            (entry_id, info.get('title'), info.get('link'), info.get('timestamp', time.time()), info.get('source'))
+        )
+
+    def remove_entry(self, entry_id: str):
+        """删除一条历史记录"""
+        self._execute('DELETE FROM history WHERE entry_id = ?', (entry_id,))
+
+    def iter_entry_ids(self) -> List[str]:
+        """所有历史记录的ID"""
+        return [row[0] for row in self._execute('SELECT entry_id FROM history').fetchall()]
+
+    def clean_history(self, cutoff: float) -> int:
+        """删除早于cutoff的历史记录和各频道的发送记录，返回删除的历史记录条数"""
+        self._execute('DELETE FROM delivered WHERE timestamp <= ?', (cutoff,))
+        return self._execute('DELETE FROM history WHERE timestamp <= ?', (cutoff,)).rowcount
+
+    # ---- 发件箱 ----
+
+    def enqueue(self, entry_id: str, source: str, channel_ids: List[str], message: str, info: Dict) -> bool:
+        """把消息放入发件箱，同一文章同一频道只会入队一次，已经发送到的频道不再入队"""
+        now = time.time()
+        info_json = json.dumps(info, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute('BEGIN')
+            inserted = 0
+            for channel_id in channel_ids:
+                inserted += self._conn.execute(
+                    'INSERT OR IGNORE INTO outbox (entry_id, source, channel_id, message, info, created) '
+                    'SELECT ?, ?, ?, ?, ?, ? '
+                    'WHERE NOT EXISTS (SELECT 1 FROM delivered WHERE entry_id = ? AND channel_id = ?)',
+                    (entry_id, source, str(channel_id), message, info_json, now, entry_id, str(channel_id))
+                ).rowcount
+            self._conn.execute('COMMIT')
+        return inserted > 0
+
+    def pending(self, limit: int = 50) -> List[OutboxMessage]:
+        """按入队顺序获取已到重试时间的待发送消息"""
+        rows = self._execute(
+            'SELECT id, entry_id, source, channel_id, message, info, attempts FROM outbox '
+            'WHERE next_attempt_at <= ? ORDER BY id LIMIT ?',
+            (time.time(), limit)
+        ).fetchall()
+        return [
+            OutboxMessage(id=row[0], entry_id=row[1], source=row[2], channel_id=row[3],
+                          message=row[4], info=json.loads(row[5] or '{}'), attempts=row[6])
+            for row in rows
+        ]
+
+    def complete(self, message: OutboxMessage):
+        """消息发送成功：记录这个频道已发送并删除发件箱记录，文章的所有频道都发完后写入历史"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN')
+            self._conn.execute('INSERT OR REPLACE INTO delivered VALUES (?, ?, ?)',
+                               (message.entry_id, message.channel_id, now))
+            self._conn.execute('DELETE FROM outbox WHERE id = ?', (message.id,))
+            remaining = self._conn.execute(
+                'SELECT COUNT(*) FROM outbox WHERE entry_id = ?', (message.entry_id,)
+            ).fetchone()[0]
+            if remaining == 0:
+                info = message.info
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO history VALUES (?, ?, ?, ?, ?)',
+                    (message.entry_id, info.get('title'), info.get('link'), now, message.source)
+                )
+            self._conn.execute('COMMIT')
+
+    def retry(self, message: OutboxMessage, base_delay: float, max_delay: float) -> float:
+        """记录一次发送失败，按失败次数指数退避安排下次发送，返回等待的秒数；消息不会被丢弃"""
+        delay = min(max_delay, base_delay * 2 ** message.attempts)
+        self._execute('UPDATE outbox SET attempts = attempts + 1, next_attempt_at = ? WHERE id = ?',
+                      (time.time() + delay, message.id))
+        return delay
+
+class StoreHistory(MutableMapping):
+    """把StateStore包装成字典接口，替代BaseRSSSource的共享历史记录"""
+
+    def __init__(self, store: StateStore):
+        self.store = store
+
+    def __contains__(self, entry_id) -> bool:
+        return self.store.has_entry(entry_id)
+
+    def __getitem__(self, entry_id: str) -> Dict:
+        info = self.store.get_entry(entry_id)
+        if info is None:
+            raise KeyError(entry_id)
+        return info
+
+    def __setitem__(self, entry_id: str, info: Dict):
+        self.store.mark_sent(entry_id, info)
+
+    def __delitem__(self, entry_id: str):
+        self.store.remove_entry(entry_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.iter_entry_ids())
+
+    def __len__(self) -> int:
+        return self.store.history_count()
@@ -0,0 +1,142 @@
+import contextvars
+import itertools
+import json
+import logging
+import os
+import random
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+class Trace:
+    """一次被采样的追踪（一次RSS抓取或一篇文章），在追踪文件中占一行"""
+    __slots__ = ('trace_id', 'name', 'parent_id')
+
+    def __init__(self, trace_id: int, name: str, parent_id: Optional[int] = None):
+        self.trace_id = trace_id
+        self.name = name
+        self.parent_id = parent_id
+
+# 当前协程所属的追踪，span不传trace时从这里取
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar('current_trace', default=None)
+
+class _NoopSpan:
+    """追踪关闭或未被采样时使用，不做任何事"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+class Span:
+    """一段计时，结束时写入一个Chrome trace event"""
+    __slots__ = ('tracer', 'trace', 'name', 'args', 'start', '_token')
+
+    def __init__(self, tracer: 'Tracer', trace: Trace, name: str, args: dict):
+        self.tracer = tracer
+        self.trace = trace
+        self.name = name
+        self.args = args
+        self.start = 0.0
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current_trace.set(self.trace)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        _current_trace.reset(self._token)
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer._write({
+            'name': self.name, 'ph': 'X', 'cat': 'rss',
+            'ts': round(self.start * 1e6), 'dur': round((end - self.start) * 1e6),
+            'pid': self.tracer.pid, 'tid': self.trace.trace_id, 'args': self.args,
+        })
+        return False
+
+    def set(self, **args):
+        """补充span的参数，例如响应状态码"""
+        self.args.update(args)
+
+class Tracer:
+    """按采样率记录各阶段的span，写成Chrome trace event格式（chrome://tracing 或 Perfetto 可直接打开）
+
+    文件以 "[" 开头，之后每行一个事件；trace viewer允许缺少结尾的 "]"，
+    所以进程被杀掉时已写入的事件仍然可用。追踪关闭时span()只做一次属性判断。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.sample_rate = 1.0
+        self.path: Optional[str] = None
+        self.pid = os.getpid()
+        self._file = None
+        self._ids = itertools.count(1)
+
+    def configure(self, path: str, sample_rate: float = 1.0):
+        """开启追踪"""
+        self.close()
+        self.path = path
+        self.sample_rate = sample_rate
+        self.pid = os.getpid()
+        self._file = open(path, 'w', encoding='utf-8')
+        self._file.write('[\n')
+        self.enabled = True
+        logger.info(f"追踪已开启，采样率 {sample_rate}，写入 {path}")
+
+    def close(self):
+        """关闭追踪文件"""
+        self.enabled = False
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, event: dict):
+        if self._file is None:
+            return
+        self._file.write(json.dumps(event, ensure_ascii=False, default=str))
+        self._file.write(',\n')
+
+    def _new_trace(self, name: str, parent_id: Optional[int] = None) -> Trace:
+        trace = Trace(next(self._ids), name, parent_id)
+        # 给这一行起个名字，方便在trace viewer中找到对应的源或文章
+        self._write({'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': trace.trace_id,
+                     'args': {'name': name}})
+        return trace
+
+    def start_trace(self, name: str) -> Optional[Trace]:
+        """按采样率决定是否追踪，不追踪时返回None"""
+        if not self.enabled or random.random() >= self.sample_rate:
+            return None
+        return self._new_trace(name)
+
+    def child_trace(self, parent: Optional[Trace], name: str) -> Optional[Trace]:
+        """从父追踪派生（例如从RSS抓取派生出每篇文章），父追踪未被采样时返回None"""
+        if parent is None or not self.enabled:
+            return None
+        return self._new_trace(name, parent.trace_id)
+
+    def span(self, name: str, trace: Optional[Trace] = None, **args):
+        """记录一段耗时，trace为None时使用当前上下文中的追踪"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        if trace is None:
+            trace = _current_trace.get()
+            if trace is None:
+                return _NOOP_SPAN
+        if trace.parent_id is not None and 'parent' not in args:
+            args['parent'] = trace.parent_id
+        return Span(self, trace, name, args)
+
+tracer = Tracer()
@@ -0,0 +1,291 @@
+import asyncio
+import hashlib
+import hmac
+import html
+import logging
+import re
+import secrets
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Optional, Tuple
+import metrics
+from proxy_pool import proxy_pool
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+WEBSUB_SUBSCRIPTIONS = metrics.registry.gauge('websub_subscriptions', 'WebSub订阅数', ['state'])
+WEBSUB_PUSHES = metrics.registry.counter('websub_pushes_total', '收到的WebSub推送', ['source', 'result'])
+
+# 只在RSS开头查找hub，频道级的<link>都在文章之前
+DISCOVERY_CHARS = 32 * 1024
+LINK_TAG = re.compile(r'<(?:atom:)?link\b[^>]*>', re.IGNORECASE)
+LINK_ATTR = re.compile(r'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+# X-Hub-Signature支持的算法
+SIGNATURE_ALGORITHMS = {'sha1': hashlib.sha1, 'sha256': hashlib.sha256,
+                        'sha384': hashlib.sha384, 'sha512': hashlib.sha512}
+
+def discover(content: str) -> Tuple[Optional[str], Optional[str]]:
+    """从RSS/Atom内容中查找 rel="hub" 和 rel="self" 的链接，返回 (hub, topic)"""
+    hub = topic = None
+    for tag in LINK_TAG.findall(content[:DISCOVERY_CHARS]):
+        attrs = {name.lower(): html.unescape(double or single)
+                 for name, double, single in LINK_ATTR.findall(tag)}
+        rels = attrs.get('rel', '').lower().split()
+        href = attrs.get('href')
+        if not href:
+            continue
+        if 'hub' in rels and hub is None:
+            hub = href
+        elif 'self' in rels and topic is None:
+            topic = href
+    return hub, topic
+
+@dataclass
+class Subscription:
+    key: str
+    hub: str
+    topic: str
+    secret: str
+    state: str = 'pending'       # pending/active/failed
+    expires_at: float = 0.0      # time.monotonic()
+    requested_at: float = 0.0
+    last_poll: float = 0.0
+    pushes: int = 0
+    lease_seconds: int = 0       # hub实际批准的租期
+
+class WebSubSubscriber:
+    """WebSub订阅者：向RSS中声明的hub订阅，在本地HTTP端点接收推送
+
+    回调地址为 <callback_url>/<源的键>。hub用GET验证订阅意图，验证通过后订阅生效；
+    推送用订阅时约定的secret做HMAC签名，签名不对的推送直接丢弃。
+    订阅生效的源只按poll_interval低频轮询，作为推送丢失时的兜底。
+    """
+    PENDING = 'pending'
+    ACTIVE = 'active'
+    FAILED = 'failed'
+    # 检查续订的间隔（秒）
+    RENEW_CHECK_INTERVAL = 60
+
+    def __init__(self):
+        self.enabled = False
+        self.callback_url = ''
+        self.host = '0.0.0.0'
+        self.port = 8090
+        self.lease_seconds = 86400
+        self.poll_interval = 3600.0
+        # 订阅请求发出后多久没有收到验证算失败，失败后多久重试
+        self.verify_timeout = 600.0
+        self.retry_interval = 3600.0
+        self.subscriptions: Dict[str, Subscription] = {}
+        self._on_push: Optional[Callable[[str, str], Awaitable[None]]] = None
+        self._runner: Optional['web.AppRunner'] = None
+        self._renew_task: Optional[asyncio.Task] = None
+        self._tasks: set = set()
+
+    def configure(self, callback_url: str, host: str = '0.0.0.0', port: int = 8090, lease_seconds: int = 86400,
+                  poll_interval: float = 3600):
+        self.enabled = True
+        self.callback_url = callback_url.rstrip('/')
+        self.host = host
+        self.port = port
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+
+    async def start(self, on_push: Callable[[str, str], Awaitable[None]]):
+        """启动回调端点和续订任务，on_push(源的键, RSS内容) 处理推送的内容"""
+        # 服务端只在启用WebSub时用到，不在启动时导入
+        from aiohttp import web
+        self._on_push = on_push
+        app = web.Application(client_max_size=10 * 1024 ** 2)
+        app.router.add_get('/websub/{key}', self.handle_verify)
+        app.router.add_post('/websub/{key}', self.handle_push)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self._renew_task = asyncio.create_task(self._renew_loop())
+        logger.info(f"WebSub回调端点已启动: {self.host}:{self.port}，回调地址 {self.callback_url}/<源>")
+
+    async def stop(self):
+        for task in [self._renew_task, *self._tasks]:
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(*(task for task in [self._renew_task, *self._tasks] if task is not None),
+                             return_exceptions=True)
+        self._renew_task = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def check_feed(self, key: str, url: str, content: str):
+        """获取到新内容时查找hub，找到且还没有订阅时在后台发起订阅"""
+        if not self.enabled:
+            return
+        subscription = self.subscriptions.get(key)
+        if subscription is not None and subscription.state != self.FAILED:
+            return
+        if subscription is not None and time.monotonic() - subscription.requested_at < self.retry_interval:
+            return
+        hub, topic = discover(content)
+        if hub is None:
+            return
+        subscription = self.subscriptions[key] = Subscription(key, hub, topic or url, secrets.token_hex(20))
+        self._spawn(self.subscribe(subscription))
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def subscribe(self, subscription: Subscription, mode: str = 'subscribe'):
+        """向hub发送订阅（或取消订阅）请求，hub随后会GET回调地址验证"""
+        if mode == 'subscribe':
+            # hub可能在返回之前就来验证
+            subscription.requested_at = time.monotonic()
+            if subscription.state == self.FAILED:
+                subscription.state = self.PENDING
+        data = {
+            'hub.callback': f"{self.callback_url}/{subscription.key}",
+            'hub.mode': mode,
+            'hub.topic': subscription.topic,
+            'hub.secret': subscription.secret,
+            'hub.lease_seconds': str(self.lease_seconds),
+        }
+        try:
+            async with proxy_pool.request('POST', subscription.hub, data=data) as response:
+                if response.status in (202, 204):
+                    logger.info(f"已向hub发送{mode}请求 [{subscription.key}]: {subscription.hub}")
+                    return
+                text = (await response.text())[:200]
+                logger.warning(f"hub拒绝了{mode}请求 [{subscription.key}]: HTTP {response.status} {text}")
+        except Exception as e:
+            logger.warning(f"向hub发送{mode}请求失败 [{subscription.key}]: {e!r}")
+        if mode == 'subscribe' and subscription.state == self.PENDING:
+            subscription.state = self.FAILED
+
+    async def unsubscribe(self, key: str):
+        """源被移除时取消订阅"""
+        subscription = self.subscriptions.pop(key, None)
+        if subscription is not None and subscription.state == self.ACTIVE:
+            await self.subscribe(subscription, 'unsubscribe')
+
+    async def handle_verify(self, request: 'web.Request') -> 'web.Response':
+        """hub验证订阅意图：主题和意图都对得上时原样返回challenge"""
+        from aiohttp import web
+        key = request.match_info['key']
+        params = request.query
+        mode = params.get('hub.mode')
+        topic = params.get('hub.topic')
+        subscription = self.subscriptions.get(key)
+        if mode == 'denied':
+            if subscription is not None and subscription.topic == topic:
+                subscription.state = self.FAILED
+            logger.warning(f"hub拒绝了订阅 [{key}]: {params.get('hub.reason', '')}")
+            return web.Response(text='')
+        if mode == 'subscribe' and subscription is not None and subscription.topic == topic:
+            try:
+                lease = int(params.get('hub.lease_seconds') or self.lease_seconds)
+            except ValueError:
+                lease = 0
+            if lease <= 0:
+                logger.warning(f"hub返回的租期不正确 [{key}]: {params.get('hub.lease_seconds')!r}")
+                return web.Response(status=400)
+            now = time.monotonic()
+            if subscription.state != self.ACTIVE:
+                # 订阅生效前刚刚轮询过，从现在开始计算低频轮询的间隔
+                subscription.last_poll = now
+            subscription.state = self.ACTIVE
+            subscription.expires_at = now + lease
+            subscription.lease_seconds = lease
+            logger.info(f"WebSub订阅已生效 [{key}]: {topic}，租期 {lease} 秒")
+            return web.Response(text=params.get('hub.challenge', ''))
+        if mode == 'unsubscribe' and (subscription is None or subscription.topic != topic):
+            # 已经不再需要的订阅
+            return web.Response(text=params.get('hub.challenge', ''))
+        return web.Response(status=404)
+
+    def verify_signature(self, subscription: Subscription, signature: str, body: bytes) -> bool:
+        algorithm, _, digest = signature.partition('=')
+        hash_func = SIGNATURE_ALGORITHMS.get(algorithm.lower())
+        if hash_func is None:
+            return False
+        expected = hmac.new(subscription.secret.encode(), body, hash_func).hexdigest()
+        return hmac.compare_digest(expected, digest.lower())
+
+    async def handle_push(self, request: 'web.Request') -> 'web.Response':
+        """接收推送：签名正确时交给流水线；签名不对也返回2xx，不向对方透露原因"""
+        from aiohttp import web
+        key = request.match_info['key']
+        subscription = self.subscriptions.get(key)
+        body = await request.read()
+        if subscription is None or subscription.state != self.ACTIVE:
+            WEBSUB_PUSHES.inc(source=key, result='unknown')
+            return web.Response(status=410 if subscription is None else 202)
+        if not self.verify_signature(subscription, request.headers.get('X-Hub-Signature', ''), body):
+            WEBSUB_PUSHES.inc(source=key, result='bad_signature')
+            logger.warning(f"WebSub推送签名不正确 [{key}]，已丢弃")
+            return web.Response(status=202)
+        WEBSUB_PUSHES.inc(source=key, result='ok')
+        subscription.pushes += 1
+        logger.debug("收到WebSub推送 [%s]: %d 字节", key, len(body))
+        content = body.decode(request.charset or 'utf-8', errors='replace')
+        # 先回复hub，再慢慢处理
+        self._spawn(self._on_push(key, content))
+        return web.Response(status=202)
+
+    def should_poll(self, key: str) -> bool:
+        """订阅生效的源只按poll_interval轮询，其他源每轮都轮询"""
+        subscription = self.subscriptions.get(key)
+        now = time.monotonic()
+        if subscription is not None and subscription.state == self.ACTIVE and now < subscription.expires_at:
+            if now - subscription.last_poll < self.poll_interval:
+                return False
+        if subscription is not None:
+            subscription.last_poll = now
+        return True
+
+    async def _renew_loop(self):
+        """hub批准的租期剩下不到十分之一时续订，过期或验证超时的订阅标记为失败，之后获取到内容时重试"""
+        while True:
+            await asyncio.sleep(self.RENEW_CHECK_INTERVAL)
+            now = time.monotonic()
+            for subscription in list(self.subscriptions.values()):
+                if subscription.state == self.ACTIVE:
+                    if now >= subscription.expires_at:
+                        logger.warning(f"WebSub订阅已过期 [{subscription.key}]，恢复轮询")
+                        subscription.state = self.FAILED
+                    elif self._should_renew(subscription, now):
+                        self._spawn(self.subscribe(subscription))
+                elif (subscription.state == self.PENDING
+                      and now - subscription.requested_at > self.verify_timeout):
+                    logger.warning(f"WebSub订阅没有收到验证 [{subscription.key}]")
+                    subscription.state = self.FAILED
+
+    def _should_renew(self, subscription: Subscription, now: float) -> bool:
+        """按hub批准的租期判断是否续订；租期很短时至少提前一个检查间隔，
+        续订请求发出后等待验证的时间也不超过租期的一半，避免在续订生效前过期"""
+        lease = subscription.lease_seconds
+        renew_before = max(lease / 10, self.RENEW_CHECK_INTERVAL)
+        wait = min(self.verify_timeout, lease / 2)
+        return subscription.expires_at - now < renew_before and now - subscription.requested_at > wait
+
+    def summary(self) -> List[str]:
+        now = time.monotonic()
+        lines = []
+        for subscription in self.subscriptions.values():
+            if subscription.state == self.ACTIVE:
+                lines.append(f"{subscription.key}: 已订阅，推送 {subscription.pushes} 次，"
+                             f"租期剩余 {max(0.0, subscription.expires_at - now):.0f} 秒")
+            else:
+                lines.append(f"{subscription.key}: {subscription.state}")
+        return lines
+
+    def collect_metrics(self):
+        WEBSUB_SUBSCRIPTIONS.clear()
+        for state in (self.PENDING, self.ACTIVE, self.FAILED):
+            WEBSUB_SUBSCRIPTIONS.set(sum(1 for s in self.subscriptions.values() if s.state == state), state=state)
+
+websub = WebSubSubscriber()
+metrics.registry.add_collector(websub.collect_metrics)